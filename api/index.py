@@ -1,3 +1,16 @@
-from .main import app
+import os
+import sys
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend')
+sys.path.insert(0, BACKEND_DIR)
+
+# The backend's data and model paths are relative to backend/
+os.chdir(BACKEND_DIR)
+
+# Serverless instances are short-lived: load models and data on first use
+# (or via POST /warmup) instead of in a thread at every cold start
+os.environ.setdefault("WARMUP", "off")
+
+from main import app
 
 # This file is required for Vercel serverless deployment
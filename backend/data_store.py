@@ -0,0 +1,152 @@
+"""
+Smart Factory Analytics - Sensor Data Store
+Process-wide in-memory cache of the sensor history shared by all API endpoints.
+"""
+
+import threading
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from feature_state import IncrementalFeatureEngine
+from sensor_storage import (
+    append_sensors, install_sensors, read_sensors, resolve_source, source_signature
+)
+
+# Sensor readings are stored as float32 to halve the memory footprint
+SENSOR_COLUMNS = ['temperature', 'vibration', 'pressure', 'speed', 'runtime_hours']
+
+SENSOR_DTYPES = {
+    'machine_id': 'category',
+    **{col: 'float32' for col in SENSOR_COLUMNS},
+    'is_failure': 'int8',
+}
+
+
+class SensorDataStore:
+    """Keep the parsed sensor history in memory and reload it only when it changes.
+
+    `path` is the sensor CSV; when a Parquet dataset exists next to it (see
+    `sensor_storage`) the dataset is used instead. The data is re-read when
+    its mtime or size differs from the last load, or after `invalidate()` is
+    called (e.g. by `/refresh_data`). The returned
+    DataFrame is shared between requests and must be treated as read-only.
+    Latest-row features are kept up to date by an `IncrementalFeatureEngine`
+    seeded on every reload. Readings added with `append()` are appended to
+    storage and merged into the in-memory history lazily, so ingest
+    cost does not grow with the size of the history.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.version = 0
+        self._source = None
+        self._df = None
+        self._pending = []
+        self._features = None
+        self._signature = None
+        self._lock = threading.Lock()
+
+    def _file_signature(self):
+        source = resolve_source(self.path)
+        return (source, *source_signature(source))
+
+    def _read(self, source):
+        df = read_sensors(source, dtype=SENSOR_DTYPES)
+        # Sorted categories keep machine ordering identical to the string column
+        categories = sorted(df['machine_id'].cat.categories)
+        df['machine_id'] = df['machine_id'].cat.set_categories(categories)
+        return df
+
+    def _reload(self, signature):
+        self._source = signature[0]
+        self._df = self._read(self._source)
+        self._pending = []
+        self._features = IncrementalFeatureEngine.from_history(self._df)
+        self._signature = signature
+        self.version += 1
+
+    def load(self):
+        """Read the file from disk unconditionally and return the new DataFrame."""
+        with self._lock:
+            self._reload(self._file_signature())
+            return self._df
+
+    def _reload_if_stale(self):
+        signature = self._file_signature()
+        if self._df is None or signature != self._signature:
+            self._reload(signature)
+
+    def _merge_pending(self):
+        if not self._pending:
+            return
+        frames = [self._df, *self._pending]
+        machine_ids = union_categoricals([f['machine_id'] for f in frames], sort_categories=True)
+        df = pd.concat(frames, ignore_index=True)
+        df['machine_id'] = machine_ids
+        self._df = df
+        self._pending = []
+
+    def get(self):
+        """Return the cached DataFrame, reloading it if the file changed on disk."""
+        with self._lock:
+            self._reload_if_stale()
+            self._merge_pending()
+            return self._df
+
+    def append(self, readings):
+        """Append new readings to the history, the feature state and the file.
+
+        `readings` must have the sensor CSV columns. Only the new rows are
+        touched: they are appended to storage, applied to the per-machine
+        feature state, and merged into the DataFrame on the next `get()`.
+        Raises `OutOfOrderReadings`, storing nothing, if a reading predates
+        its machine's newest stored one.
+        """
+        with self._lock:
+            self._reload_if_stale()
+            readings = readings[list(self._df.columns)]
+            # Late readings are rejected before anything is stored
+            self._features.check_order(readings)
+            # Stored as given; only the in-memory copy takes the narrower dtypes
+            append_sensors(readings, self._source)
+            readings = readings.astype(self._df.dtypes.to_dict() | {'machine_id': 'category'})
+            self._pending.append(readings)
+            self._features.update_many(readings)
+            # Our own write must not trigger a full reload
+            self._signature = self._file_signature()
+            self.version += 1
+
+    def latest_features(self):
+        """Return `(version, features)` for the latest reading of every machine.
+
+        The version identifies the data the features were computed from, so
+        callers can cache derived results per version.
+        """
+        with self._lock:
+            self._reload_if_stale()
+            return self.version, self._features.latest()
+
+    def replace(self, staged_path):
+        """Move a staged history into place and load it.
+
+        Readers block for the duration of the swap and then see the new
+        data; DataFrames already handed out are left untouched.
+        """
+        with self._lock:
+            install_sensors(staged_path, self.path)
+            self._reload(self._file_signature())
+            return self._df
+
+    def invalidate(self):
+        """Force the next `get()` to re-read the file."""
+        with self._lock:
+            self._signature = None
+
+    @property
+    def signature(self):
+        """`(source, mtime_ns, size)` of the data at the last load."""
+        return self._signature
+
+    @property
+    def loaded(self):
+        return self._df is not None
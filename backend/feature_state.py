@@ -0,0 +1,230 @@
+"""
+Smart Factory Analytics - Incremental Feature State
+Keeps a ring buffer of the most recent readings per machine so latest-row
+features can be updated in O(1) per reading instead of re-engineering the
+full history on every request.
+"""
+
+import numpy as np
+import pandas as pd
+
+from features import LAG_COLUMNS, ROLLING_COLUMNS, ROLLING_WINDOWS, rolling_feature_names
+
+# Raw columns carried through unchanged from the latest reading
+PASSTHROUGH_COLUMNS = ['runtime_hours', 'is_failure']
+
+
+class OutOfOrderReadings(Exception):
+    """Raised for readings older than the newest one already seen for their machine."""
+
+    def __init__(self, late):
+        machines = ', '.join(f"{machine_id} (last {last})" for machine_id, last in late.items())
+        super().__init__(f"Readings older than the newest one already stored for: {machines}")
+        self.late = late
+
+
+class IncrementalFeatureEngine:
+    """Per-machine ring buffers producing the same features as `features.feature_engineering()`.
+
+    Each machine keeps its last `window` lag/rolling readings in a fixed-size
+    buffer, `window` being the longest of the rolling `windows`, so an update
+    costs O(1) and `latest()` costs O(machines x window) regardless of how
+    much history has been seen. Once a machine has at least `window` readings
+    its features match the batch path to floating point tolerance; before
+    that, missing lag/rolling values are filled with 0.
+    """
+
+    def __init__(self, windows=None, dtypes=None):
+        self.windows = list(windows or ROLLING_WINDOWS)
+        # Ring buffer length: the longest window, and at least two readings for the lags
+        self.window = max(*self.windows, 2)
+        self.dtypes = dtypes or {}
+        self._machine_ids = []
+        self._index = {}
+        self._buffer = np.zeros((0, self.window, len(LAG_COLUMNS)))
+        self._count = np.zeros(0, dtype=np.int64)
+        self._timestamp = np.zeros(0, dtype='datetime64[ns]')
+        self._passthrough = np.zeros((0, len(PASSTHROUGH_COLUMNS)))
+        self._latest = None
+
+    @classmethod
+    def from_history(cls, df, windows=None):
+        """Seed the buffers from a sensor history DataFrame.
+
+        Only the last `window` readings of each machine are touched, so the
+        cost is one sort plus O(machines x window).
+        """
+        dtypes = {col: df[col].dtype for col in ['machine_id', 'timestamp', *LAG_COLUMNS, *PASSTHROUGH_COLUMNS]}
+        engine = cls(windows=windows, dtypes=dtypes)
+        window = engine.window
+        if df.empty:
+            return engine
+
+        df = df.sort_values(['machine_id', 'timestamp'])
+        counts = df.groupby('machine_id', observed=True).size()
+        tail = df.groupby('machine_id', observed=True).tail(window)
+
+        machine_ids = [str(m) for m in counts.index]
+        engine._grow(machine_ids)
+        rows = np.array([engine._index[m] for m in tail['machine_id'].astype(str)])
+        # Position of each row inside its machine's window (0 = oldest kept reading)
+        offsets = tail.groupby('machine_id', observed=True).cumcount().to_numpy()
+        kept = tail.groupby('machine_id', observed=True)['machine_id'].transform('size').to_numpy()
+        total = counts.loc[tail['machine_id']].to_numpy()
+        slots = (total - kept + offsets) % window
+
+        engine._buffer[rows, slots] = tail[LAG_COLUMNS].to_numpy(dtype=np.float64)
+        engine._count[:] = counts.to_numpy()
+
+        last = tail.groupby('machine_id', observed=True).tail(1)
+        last_rows = np.array([engine._index[m] for m in last['machine_id'].astype(str)])
+        engine._timestamp[last_rows] = last['timestamp'].to_numpy(dtype='datetime64[ns]')
+        engine._passthrough[last_rows] = last[PASSTHROUGH_COLUMNS].to_numpy(dtype=np.float64)
+        return engine
+
+    def _grow(self, machine_ids):
+        new_ids = [m for m in machine_ids if m not in self._index]
+        if not new_ids:
+            return
+        n = len(new_ids)
+        for machine_id in new_ids:
+            self._index[machine_id] = len(self._machine_ids)
+            self._machine_ids.append(machine_id)
+        self._buffer = np.concatenate([self._buffer, np.zeros((n, self.window, len(LAG_COLUMNS)))])
+        self._count = np.concatenate([self._count, np.zeros(n, dtype=np.int64)])
+        self._timestamp = np.concatenate([self._timestamp, np.zeros(n, dtype='datetime64[ns]')])
+        self._passthrough = np.concatenate([self._passthrough, np.zeros((n, len(PASSTHROUGH_COLUMNS)))])
+
+    def check_order(self, df):
+        """Raise `OutOfOrderReadings` if any reading in `df` predates its machine's newest one.
+
+        The ring buffers only take readings at the end, so a late reading
+        would be treated as the newest and skew its machine's features.
+        """
+        machine_ids = df['machine_id'].astype(str)
+        known = machine_ids.map(self._index)
+        seen = known.notna().to_numpy()
+        if not seen.any():
+            return
+        rows = known[seen].astype(np.int64).to_numpy()
+        timestamps = df['timestamp'].to_numpy(dtype='datetime64[ns]')[seen]
+        last = self._timestamp[rows]
+        late = (timestamps < last) & (self._count[rows] > 0)
+        if late.any():
+            raise OutOfOrderReadings({
+                machine_id: pd.Timestamp(self._timestamp[self._index[machine_id]])
+                for machine_id in dict.fromkeys(machine_ids[seen][late])
+            })
+
+    def update(self, machine_id, timestamp, values):
+        """Append one reading. `values` maps column name to value.
+
+        Raises `OutOfOrderReadings` if it predates the machine's newest reading.
+        """
+        machine_id = str(machine_id)
+        if machine_id not in self._index:
+            self._grow([machine_id])
+        row = self._index[machine_id]
+        if self._count[row] and np.datetime64(pd.Timestamp(timestamp), 'ns') < self._timestamp[row]:
+            raise OutOfOrderReadings({machine_id: pd.Timestamp(self._timestamp[row])})
+        slot = self._count[row] % self.window
+        self._buffer[row, slot] = [values[col] for col in LAG_COLUMNS]
+        self._passthrough[row] = [values[col] for col in PASSTHROUGH_COLUMNS]
+        self._timestamp[row] = np.datetime64(pd.Timestamp(timestamp), 'ns')
+        self._count[row] += 1
+        self._latest = None
+
+    def update_many(self, df):
+        """Append readings from a DataFrame, applied in timestamp order.
+
+        Raises `OutOfOrderReadings`, before applying any of them, if a reading
+        predates its machine's newest one.
+        """
+        self.check_order(df)
+        df = df.sort_values('timestamp', kind='stable')
+        machine_ids = df['machine_id'].astype(str).tolist()
+        timestamps = df['timestamp'].to_numpy(dtype='datetime64[ns]')
+        lag_values = df[LAG_COLUMNS].to_numpy(dtype=np.float64)
+        passthrough = df[PASSTHROUGH_COLUMNS].to_numpy(dtype=np.float64)
+        self._grow(list(dict.fromkeys(machine_ids)))
+        for machine_id, timestamp, lag, extra in zip(machine_ids, timestamps, lag_values, passthrough):
+            row = self._index[machine_id]
+            slot = self._count[row] % self.window
+            self._buffer[row, slot] = lag
+            self._passthrough[row] = extra
+            self._timestamp[row] = timestamp
+            self._count[row] += 1
+        self._latest = None
+
+    @property
+    def machine_ids(self):
+        return list(self._machine_ids)
+
+    def latest(self):
+        """Return one row of engineered features per machine, ordered by machine_id.
+
+        The frame has the same columns and dtypes as
+        `feature_engineering(df).groupby('machine_id').tail(1)`. It is cached
+        until the next update and must be treated as read-only.
+        """
+        if self._latest is None:
+            self._latest = self._compute_latest()
+        return self._latest
+
+    def _compute_latest(self):
+        order = np.argsort(self._machine_ids, kind='stable')
+        count = self._count[order]
+        buffer = self._buffer[order]
+        n = len(order)
+        idx = np.arange(n)
+
+        current = buffer[idx, (count - 1) % self.window]
+        previous = buffer[idx, (count - 2) % self.window]
+        previous[count < 2] = np.nan
+
+        machine_ids = [self._machine_ids[i] for i in order]
+        out = pd.DataFrame({'machine_id': machine_ids})
+        if isinstance(self.dtypes.get('machine_id'), pd.CategoricalDtype):
+            # Machines first seen after seeding are added to the categories
+            out['machine_id'] = pd.Categorical(machine_ids, categories=machine_ids)
+        out['timestamp'] = self._timestamp[order].astype(self.dtypes.get('timestamp', 'datetime64[ns]'))
+        for j, col in enumerate(LAG_COLUMNS):
+            out[col] = self._cast(col, current[:, j])
+        for j, col in enumerate(PASSTHROUGH_COLUMNS):
+            out[col] = self._cast(col, self._passthrough[order, j])
+
+        out['hour'] = out['timestamp'].dt.hour
+
+        for j, col in enumerate(LAG_COLUMNS):
+            out[f'{col}_lag1'] = self._cast(col, previous[:, j])
+            out[f'{col}_change'] = self._cast(col, current[:, j] - previous[:, j])
+
+        for window in self.windows:
+            # Slots of each machine's last `window` readings; rolling features
+            # need a full window, matching rolling(window) defaults
+            slots = (count[:, None] - window + np.arange(window)) % self.window
+            full = count >= window
+            recent = buffer[idx[:, None], slots]
+            for col in ROLLING_COLUMNS:
+                j = LAG_COLUMNS.index(col)
+                mean = np.full(n, np.nan)
+                std = np.full(n, np.nan)
+                if full.any():
+                    mean[full] = recent[full, :, j].mean(axis=1)
+                    std[full] = recent[full, :, j].std(axis=1, ddof=1)
+                mean_name, std_name = rolling_feature_names(col, window)
+                out[mean_name] = mean
+                out[std_name] = std
+
+        temperature = current[:, LAG_COLUMNS.index('temperature')]
+        vibration = current[:, LAG_COLUMNS.index('vibration')]
+        pressure = current[:, LAG_COLUMNS.index('pressure')]
+        speed = current[:, LAG_COLUMNS.index('speed')]
+        out['temp_vibration_interaction'] = self._cast('temperature', temperature * vibration)
+        out['pressure_speed_ratio'] = self._cast('pressure', pressure / (speed + 1))
+
+        return out.fillna(0)
+
+    def _cast(self, col, values):
+        dtype = self.dtypes.get(col)
+        return values.astype(dtype) if dtype is not None else values
@@ -0,0 +1,310 @@
+"""
+Smart Factory Analytics - Feature Engineering
+The engineered features shared by training, the report generator and the
+backend's incremental feature state. Lags, changes and rolling statistics
+are computed per machine without `groupby`: rows are ordered once so each
+machine is a contiguous segment, and every feature is an array operation
+over the whole column, masked where it would cross into the previous
+machine's segment.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Columns whose previous value and change are features
+LAG_COLUMNS = ['temperature', 'vibration', 'pressure', 'speed']
+
+# Columns with rolling mean/std features
+ROLLING_COLUMNS = ['temperature', 'vibration', 'pressure']
+
+# Rolling window lengths in samples (12 samples = 1 hour). The first window
+# gives `<col>_rolling_mean`/`_std`, the features the models use; each further
+# one adds `<col>_rolling_mean_<window>`/`_std_<window>`, e.g. [12, 48, 288]
+# for 1h/4h/24h. A window costs one O(rows) pass however long it is.
+ROLLING_WINDOWS = [12]
+ROLLING_WINDOW = ROLLING_WINDOWS[0]
+
+# Rows per chunk in the rolling engine (keeps its working set in cache)
+ROLLING_CHUNK = 8_192
+
+
+def rolling_feature_names(col, window):
+    """Names of the rolling mean and std features of `col` over `window` samples."""
+    suffix = '' if window == ROLLING_WINDOW else f'_{window}'
+    return f'{col}_rolling_mean{suffix}', f'{col}_rolling_std{suffix}'
+
+
+def segment_order(keys, within=None):
+    """Return `(order, position)` that lay each key's rows out contiguously.
+
+    `order` is a stable permutation grouping equal keys (None when they are
+    already contiguous, as in data sorted by machine); `position` is each
+    reordered row's index within its group, or -1 for missing keys, which
+    belong to no group. With `within` (e.g. timestamps), rows whose group
+    does not already have it non-decreasing are also sorted by it.
+    """
+    codes, uniques = pd.factorize(keys)
+    n = len(codes)
+    groups = len(uniques) + bool((codes < 0).any())
+    order = None
+    if n and np.count_nonzero(codes[1:] != codes[:-1]) + 1 != groups:
+        order = np.argsort(codes, kind='stable')
+    if within is not None and n:
+        within = np.asarray(within)
+        grouped_codes = codes if order is None else codes[order]
+        grouped_within = within if order is None else within[order]
+        same = grouped_codes[1:] == grouped_codes[:-1]
+        if (grouped_within[1:][same] < grouped_within[:-1][same]).any():
+            order = np.lexsort((within, codes))
+    if order is not None:
+        codes = codes[order]
+
+    starts = np.ones(n, dtype=bool)
+    starts[1:] = codes[1:] != codes[:-1]
+    index = np.arange(n)
+    position = index - np.maximum.accumulate(np.where(starts, index, 0))
+    position[codes < 0] = -1
+    return order, position
+
+
+def lag(values, position, periods=1):
+    """Value `periods` rows earlier in the same group (NaN at the group's start)."""
+    dtype = values.dtype if values.dtype.kind == 'f' else np.float64
+    out = np.empty(len(values), dtype=dtype)
+    out[:periods] = np.nan
+    out[periods:] = values[:len(values) - periods]
+    out[position < periods] = np.nan
+    return out
+
+
+def fill_backward(values):
+    """`bfill().fillna(0)` for one float array, in place: each NaN takes the next valid value, else 0."""
+    missing = np.flatnonzero(np.isnan(values))
+    if len(missing):
+        # NaNs come in short runs (the start of each group); a run is filled from the row after it
+        run_starts = np.ones(len(missing), dtype=bool)
+        run_starts[1:] = missing[1:] != missing[:-1] + 1
+        run_ends = missing[np.append(np.flatnonzero(run_starts[1:]), len(missing) - 1)]
+        source = run_ends[np.cumsum(run_starts) - 1] + 1
+        n = len(values)
+        values[missing] = np.where(source < n, values[np.minimum(source, n - 1)], 0)
+    return values
+
+
+def rolling_mean_std(values, position, window=ROLLING_WINDOW, offset=None):
+    """Rolling mean and sample std over the last `window` rows of each group.
+
+    `values` is one column or a columns x rows array, whose columns are all
+    done in the same pass; the results have the same shape. Rows with fewer
+    than `window` readings in their group are NaN, as with pandas'
+    `rolling(window)`, and so is any window holding a NaN.
+
+    The cost is O(rows) for any window length. Each group is cut into blocks
+    of `window` from its first reading, so every window is a prefix of one
+    block plus a suffix of the block before. Running sums within each block,
+    of deviations from the block's first reading and of their squares, give
+    each part's mean and sum of squared deviations; the two parts are merged
+    with the parallel variance formula (Chan et al.), which keeps the std
+    numerically stable (a few ulps from exact, where pandas' online updates
+    drift). Blocks never straddle two groups, so a group's results are the
+    same bits whichever other groups are in `values`.
+
+    `offset` optionally gives, per row, how many earlier readings of its
+    group are not in `values`; blocks then follow the group's full history,
+    and a window whose blocks are both in `values` gets the same bits as
+    when the group is computed from its first reading.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    single = values.ndim == 1
+    values = values.reshape(-1, values.shape[-1])
+    columns, n = values.shape
+    missing = np.isnan(values)
+    has_missing = missing.any()
+
+    # Lay each group out from a block boundary. Groups shorter than the
+    # window are all NaN and take no room (their rows point at slot 0)
+    group_start = np.asarray(position) <= 0
+    group_start[:1] = True
+    starts = np.flatnonzero(group_start)
+    lengths = np.diff(np.append(starts, n))
+    lead = 0 if offset is None else np.asarray(offset)[starts] % window
+    room = np.where(lengths >= window, -(-(lead + lengths) // window) * window, 0)
+    shift = np.cumsum(room) - room + lead - starts
+    aligned = not np.any(shift[room > 0]) and room.all()
+    if aligned:
+        # Already on block boundaries (e.g. groups of whole days): no copy
+        flat, slot = values, None
+    else:
+        slot = np.arange(n) + np.repeat(shift, lengths)
+        slot[np.repeat(room == 0, lengths)] = 0
+        flat = np.zeros((columns, max(room.sum(), window)))
+        kept = np.repeat(room > 0, lengths)
+        flat[:, slot[kept]] = values[:, kept]
+    size = flat.shape[1]
+    blocks = -(-size // window)
+    whole = size // window
+
+    # columns x offset in block x block, so running sums add up whole rows of blocks
+    data = np.empty((columns, window, blocks))
+    data.transpose(0, 2, 1)[:, :whole] = flat[:, :whole * window].reshape(columns, whole, window)
+    if blocks > whole:
+        data[:, :, -1] = 0
+        data[:, :size - whole * window, -1] = flat[:, whole * window:]
+    del flat
+    if has_missing:
+        # Summed as zeros, then the windows holding them are masked below
+        np.nan_to_num(data, copy=False)
+    mean = np.full((columns, blocks * window), np.nan)
+    std = np.full((columns, blocks * window), np.nan)
+    mean_blocks = mean.reshape(columns, blocks, window).transpose(0, 2, 1)
+    std_blocks = std.reshape(columns, blocks, window).transpose(0, 2, 1)
+
+    # Offsets 0..window-2 take `head` rows from their own block and `tail`
+    # rows from the end of the block before
+    head = np.arange(1, window, dtype=np.float64)[None, :, None]
+    tail = window - head
+    tail_weight = tail / window
+    cross_weight = head * tail / window
+
+    # A chunk of blocks at a time, plus the block before it for the tails
+    step = max(ROLLING_CHUNK // window, 256)
+    for start in range(0, blocks, step):
+        first = max(start - 1, 0)
+        block = data[:, :, first:start + step]
+        base = block[:, :1]
+        prefix = block - base
+        prefix_sq = prefix * prefix
+        # Running sums down each block, one offset at a time across all blocks
+        for k in range(1, window):
+            prefix[:, k] += prefix[:, k - 1]
+            prefix_sq[:, k] += prefix_sq[:, k - 1]
+        out_mean, out_std = mean_blocks[:, :, first:start + step], std_blocks[:, :, first:start + step]
+
+        # The last offset of each block: the window is the whole block
+        total, total_sq = prefix[:, -1:], prefix_sq[:, -1:]
+        out_mean[:, -1] = base[:, 0] + total[:, 0] / window
+        out_std[:, -1] = np.sqrt(np.maximum(total_sq[:, 0] - total[:, 0] * total[:, 0] / window, 0) / (window - 1))
+        if block.shape[2] < 2 or window < 2:
+            continue
+
+        # Every other offset: merge the head (this block) with the tail (the end of the block before)
+        head_sum, head_sq = prefix[:, :-1, 1:], prefix_sq[:, :-1, 1:]
+        tail_sum = total[:, :, :-1] - prefix[:, :-1, :-1]
+        tail_sq = total_sq[:, :, :-1] - prefix_sq[:, :-1, :-1]
+        head_mean = head_sum / head
+        delta = tail_sum / tail
+        delta += base[:, :, :-1] - base[:, :, 1:]
+        delta -= head_mean
+        # Sum of squared deviations: head part + tail part + the between-part term
+        m2 = head_sum * head_mean
+        np.subtract(head_sq, m2, out=m2)
+        tail_sum *= tail_sum
+        tail_sum /= tail
+        np.subtract(tail_sq, tail_sum, out=tail_sq)
+        m2 += tail_sq
+        np.multiply(delta, delta, out=tail_sq)
+        tail_sq *= cross_weight
+        m2 += tail_sq
+
+        delta *= tail_weight
+        delta += head_mean
+        delta += base[:, :, 1:]
+        out_mean[:, :-1, 1:] = delta
+        np.maximum(m2, 0, out=m2)
+        m2 /= window - 1
+        np.sqrt(m2, out=out_std[:, :-1, 1:])
+
+    del data
+    if slot is None:
+        mean, std = mean[:, :n], std[:, :n]
+    else:
+        mean, std = mean[:, slot], std[:, slot]
+    partial = np.flatnonzero(position < window - 1)
+    mean[:, partial] = np.nan
+    std[:, partial] = np.nan
+    if has_missing:
+        seen = np.cumsum(missing, axis=1)
+        seen[:, window:] -= seen[:, :-window].copy()
+        mean[seen > 0] = np.nan
+        std[seen > 0] = np.nan
+    if single:
+        return mean[0], std[0]
+    return mean, std
+
+
+def feature_engineering(df, windows=None, offsets=None):
+    """Create the engineered features for the ML models.
+
+    Per-machine features follow each machine's rows in timestamp order
+    (readings with equal timestamps keep their order in `df`), so the
+    features do not depend on how `df` is sorted. Rows keep their order;
+    NaNs are back-filled in machine and timestamp order, then zero-filled.
+    `windows` are the rolling window lengths (default `ROLLING_WINDOWS`). When `df` holds only the tail of some machines'
+    histories, `offsets` maps those machine ids to how many of their
+    readings come before it, so the rolling features of rows with two
+    windows of history in `df` match a run over the whole history bit for
+    bit (see `rolling_mean_std`).
+    """
+    windows = windows or ROLLING_WINDOWS
+    order, position = segment_order(df['machine_id'], df['timestamp'].to_numpy())
+    offset = None
+    if offsets:
+        offset = pd.Series(df['machine_id'].to_numpy(dtype=object)).map(offsets).fillna(0).to_numpy(np.int64)
+        if order is not None:
+            offset = offset[order]
+
+    def grouped(col):
+        values = df[col].to_numpy()
+        return values if order is None else values[order]
+
+    def restore(values):
+        if order is None:
+            return values
+        out = np.empty_like(values)
+        out[order] = values
+        return out
+
+    timestamps = df['timestamp'].dt
+    features = {
+        # Time-based features
+        'hour': timestamps.hour,
+        'day_of_week': timestamps.dayofweek,
+        'day_of_month': timestamps.day,
+    }
+
+    # Lag features (previous readings)
+    for col in LAG_COLUMNS:
+        values = grouped(col)
+        previous = lag(values, position)
+        features[f'{col}_lag1'] = previous
+        features[f'{col}_change'] = values - previous
+
+    # Rolling statistics: every rolling column in one pass per window length
+    rolling = np.vstack([grouped(col) for col in ROLLING_COLUMNS], dtype=np.float64)
+    for window in windows:
+        mean, std = rolling_mean_std(rolling, position, window, offset)
+        for j, col in enumerate(ROLLING_COLUMNS):
+            mean_name, std_name = rolling_feature_names(col, window)
+            features[mean_name] = mean[j]
+            features[std_name] = std[j]
+
+    # Interaction features
+    features['temp_vibration_interaction'] = df['temperature'] * df['vibration']
+    features['pressure_speed_ratio'] = df['pressure'] / (df['speed'] + 1)
+
+    # Fill NaN values created by lag/rolling operations: back-fill, then zero-fill.
+    # The kernel's own arrays (in machine order) are filled in place; other columns only if they have NaNs
+    filled = set()
+    for name, values in features.items():
+        if isinstance(values, np.ndarray):
+            features[name] = pd.Series(restore(fill_backward(values)), index=df.index, copy=False)
+            filled.add(name)
+    df = df.assign(**features)
+    for col in df.columns:
+        if col not in filled and df[col].hasnans:
+            if order is None:
+                df[col] = df[col].bfill().fillna(0)
+            else:
+                filled_col = df[col].iloc[order].bfill().fillna(0)
+                df[col] = filled_col.iloc[np.argsort(order)].set_axis(df.index)
+    return df
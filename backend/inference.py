@@ -0,0 +1,154 @@
+"""
+Smart Factory Analytics - Snapshot Inference
+Scores the latest reading of every machine with all three models once per
+data/model version and shares the result between the prediction endpoints.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from model_bundle import BUNDLE_FILE, MODEL_ARTIFACTS, bundle_artifacts, load_model_dir
+from pipeline import FusedPipeline
+
+
+class InferenceSnapshot:
+    """Model outputs for the latest reading of every machine."""
+
+    def __init__(self, latest, failure_probability, predicted_yield, cluster, key):
+        self.latest = latest
+        self.failure_probability = failure_probability
+        self.predicted_yield = predicted_yield
+        self.cluster = cluster
+        self.key = key
+        self.computed_at = datetime.now()
+        self.etag = '"' + hashlib.blake2b(repr(key).encode(), digest_size=8).hexdigest() + '"'
+
+
+def run_inference(latest, models):
+    """Run the failure, yield and anomaly models over the latest feature rows."""
+    if 'pipeline' in models:
+        return models['pipeline'].predict(latest)
+
+    X_failure = latest[models['failure_features']]
+    X_failure_scaled = models['failure_scaler'].transform(X_failure)
+    failure_probability = models['failure_model'].predict_proba(X_failure_scaled)[:, 1]
+
+    X_yield = latest[models['yield_features']]
+    X_yield_scaled = models['yield_scaler'].transform(X_yield)
+    predicted_yield = models['yield_model'].predict(X_yield_scaled)
+
+    X_anomaly = latest[models['anomaly_features']]
+    X_anomaly_scaled = models['anomaly_scaler'].transform(X_anomaly)
+    cluster = models['anomaly_model'].predict(X_anomaly_scaled)
+
+    return failure_probability, predicted_yield, cluster
+
+
+def read_models(model_dir, timings=None):
+    """Load the artifacts `run_inference` needs from `model_dir` into a new dict.
+
+    With a fused pipeline in the bundle the separate estimators and scalers
+    are not loaded at all. If `timings` is a dict, it receives the load time
+    of each artifact in seconds.
+    """
+    bundle_path = os.path.join(model_dir, BUNDLE_FILE)
+    if os.path.exists(bundle_path) and 'pipeline' in bundle_artifacts(bundle_path):
+        names = ['pipeline', 'failure_features', 'yield_features', 'anomaly_features']
+    else:
+        names = MODEL_ARTIFACTS
+    models = load_model_dir(model_dir, names, timings)
+    if 'pipeline' in models:
+        t0 = time.perf_counter()
+        models['pipeline'] = FusedPipeline(models['pipeline'])
+        if timings is not None:
+            timings['pipeline'] += time.perf_counter() - t0
+    return models
+
+
+# Models loaded once per process-pool worker by `_load_worker_models`
+_worker_models = None
+
+
+def _load_worker_models(model_dir):
+    global _worker_models
+    _worker_models = read_models(model_dir)
+
+
+def _score_in_worker(latest):
+    return run_inference(latest, _worker_models)
+
+
+class ProcessScorer:
+    """Run `run_inference` in worker processes that hold their own model copies.
+
+    Only the latest feature rows cross the process boundary; each worker
+    loads the models from `model_dir` when it starts. Call `reload()` after
+    new models are installed in `model_dir`, or `reload(new_dir)` to switch
+    directories; tasks already running finish on the old workers.
+    """
+
+    def __init__(self, model_dir, workers=2):
+        self.model_dir = model_dir
+        self.workers = workers
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def reload(self, model_dir=None):
+        if model_dir is not None:
+            self.model_dir = model_dir
+        pool = ProcessPoolExecutor(
+            max_workers=self.workers, initializer=_load_worker_models, initargs=(self.model_dir,)
+        )
+        with self._lock:
+            old, self._pool = self._pool, pool
+        if old is not None:
+            old.shutdown(wait=False)
+
+    def __call__(self, latest, models):
+        with self._lock:
+            if self._pool is None:
+                raise RuntimeError("Process scorer has no models loaded")
+            pool = self._pool
+        return pool.submit(_score_in_worker, latest).result()
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+class SnapshotCache:
+    """Cache the inference snapshot until the data or the models change.
+
+    The cache key combines the data store version, the data file signature and
+    a caller-supplied models version, so the snapshot (and its ETag) is
+    recomputed exactly when one of them moves. `scorer` computes the model
+    outputs (`run_inference` in-thread, or a `ProcessScorer`).
+    """
+
+    def __init__(self, data_store, scorer=run_inference):
+        self.data_store = data_store
+        self.scorer = scorer
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    def get(self, models, models_version):
+        """Return the snapshot for the current data and models, computing it if needed."""
+        with self._lock:
+            data_version, latest = self.data_store.latest_features()
+            key = (data_version, self.data_store.signature, models_version)
+            if self._snapshot is None or self._snapshot.key != key:
+                failure_probability, predicted_yield, cluster = self.scorer(latest, models)
+                self._snapshot = InferenceSnapshot(
+                    latest, failure_probability, predicted_yield, cluster, key
+                )
+            return self._snapshot
+
+    def clear(self):
+        with self._lock:
+            self._snapshot = None
@@ -0,0 +1,57 @@
+"""
+Smart Factory Analytics - Sensor Ingestion
+Bulk parsing and validation of live sensor readings for the `/ingest` endpoint.
+"""
+
+from datetime import datetime
+from typing import List, Optional
+
+import pandas as pd
+from pydantic import BaseModel, Field, TypeAdapter
+
+from data_store import SENSOR_COLUMNS
+
+
+class SensorData(BaseModel):
+    machine_id: str
+    temperature: float
+    vibration: float
+    pressure: float
+    speed: float
+    runtime_hours: float
+    timestamp: Optional[datetime] = None
+    # Stored as int8 and used as a label, so only 0 and 1 are valid
+    is_failure: int = Field(default=0, ge=0, le=1)
+
+
+# One adapter validates a whole batch in a single pydantic-core call
+_batch_adapter = TypeAdapter(List[SensorData])
+
+
+def parse_readings(body, content_type=""):
+    """Validate a JSON array or NDJSON body and return the readings as a DataFrame.
+
+    Readings without a timestamp are stamped with the current local time;
+    timezone-aware timestamps are converted to local time. Timestamps are
+    floored to whole seconds, the resolution of the sensor CSV. Raises
+    `pydantic.ValidationError` if any reading is invalid.
+    """
+    if "ndjson" in content_type or not body.lstrip().startswith(b"["):
+        lines = [line for line in body.splitlines() if line.strip()]
+        body = b"[" + b",".join(lines) + b"]"
+    readings = _batch_adapter.validate_json(body)
+
+    now = datetime.now()
+    timestamps = [
+        now if r.timestamp is None
+        else r.timestamp.astimezone().replace(tzinfo=None) if r.timestamp.tzinfo
+        else r.timestamp
+        for r in readings
+    ]
+    # Dtypes are aligned with the history by SensorDataStore.append()
+    return pd.DataFrame({
+        'machine_id': [r.machine_id for r in readings],
+        'timestamp': pd.to_datetime(timestamps).floor('s'),
+        **{col: [getattr(r, col) for r in readings] for col in SENSOR_COLUMNS},
+        'is_failure': [r.is_failure for r in readings],
+    })
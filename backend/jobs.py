@@ -0,0 +1,111 @@
+"""
+Smart Factory Analytics - Background Jobs
+Runs long operations (such as `/refresh_data`) on worker threads so the API
+keeps serving requests, and keeps their progress for `GET /jobs/{id}`.
+"""
+
+import threading
+import traceback
+import uuid
+from datetime import datetime
+
+# Finished jobs kept for polling before the oldest are dropped
+MAX_FINISHED_JOBS = 50
+
+
+class JobConflict(Exception):
+    """Raised when a job of the same kind is already queued or running."""
+
+    def __init__(self, job):
+        super().__init__(f"A {job['kind']} job is already running")
+        self.job = job
+
+
+class JobManager:
+    """Start background jobs and track their status.
+
+    At most one job per `kind` is active at a time; `submit()` raises
+    `JobConflict` carrying the active job otherwise. A job's `target` is
+    called as `target(job_id, set_stage)` on a daemon thread and reports
+    progress by calling `set_stage(name)` as it enters each of `stages`.
+    Its return value is stored as the job `result`; an exception marks the
+    job failed with the message as `error`.
+    """
+
+    def __init__(self):
+        self._jobs = {}
+        self._active = {}
+        self._lock = threading.Lock()
+
+    def submit(self, kind, target, stages):
+        with self._lock:
+            active_id = self._active.get(kind)
+            if active_id is not None:
+                raise JobConflict(dict(self._jobs[active_id]))
+
+            job_id = uuid.uuid4().hex[:12]
+            self._jobs[job_id] = {
+                "job_id": job_id,
+                "kind": kind,
+                "status": "queued",
+                "stage": None,
+                "stages": list(stages),
+                "progress": 0.0,
+                "created_at": datetime.now().isoformat(),
+                "started_at": None,
+                "finished_at": None,
+                "error": None,
+                "result": None
+            }
+            self._active[kind] = job_id
+            self._prune()
+            job = dict(self._jobs[job_id])
+
+        threading.Thread(
+            target=self._run, args=(job_id, target), name=f"job-{kind}-{job_id}", daemon=True
+        ).start()
+        return job
+
+    def get(self, job_id):
+        """Return a snapshot of the job, or None if it is unknown."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def active(self, kind):
+        """Return the queued or running job of `kind`, if any."""
+        with self._lock:
+            job_id = self._active.get(kind)
+            return dict(self._jobs[job_id]) if job_id else None
+
+    def _update(self, job_id, **fields):
+        with self._lock:
+            self._jobs[job_id].update(fields)
+
+    def _run(self, job_id, target):
+        job = self._jobs[job_id]
+        stages = job["stages"]
+
+        def set_stage(name):
+            done = stages.index(name) if name in stages else 0
+            self._update(job_id, stage=name, progress=round(done / len(stages), 2))
+
+        self._update(job_id, status="running", started_at=datetime.now().isoformat())
+        try:
+            result = target(job_id, set_stage)
+            self._update(job_id, status="succeeded", progress=1.0, result=result)
+        except Exception as e:
+            traceback.print_exc()
+            self._update(job_id, status="failed", error=str(e))
+        finally:
+            with self._lock:
+                self._jobs[job_id]["finished_at"] = datetime.now().isoformat()
+                self._active.pop(job["kind"], None)
+
+    def _prune(self):
+        finished = [
+            job_id for job_id, job in self._jobs.items()
+            if job["status"] in ("succeeded", "failed")
+        ]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job_id]
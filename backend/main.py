@@ -3,17 +3,26 @@ Smart Factory Analytics - FastAPI Backend
 Provides ML-powered endpoints for predictive maintenance and analytics.
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
 from typing import List, Dict, Any
-import pandas as pd
-import numpy as np
-import joblib
 import os
+import sys
+import shutil
+import threading
+import time
 from datetime import datetime
 import subprocess
 
+# Make sibling modules importable when run as `backend.main` from the repo root
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Only modules without pandas/scikit-learn are imported here; see `ml()`
+from jobs import JobConflict, JobManager
+from model_registry import ModelRegistry, UnknownVersion, new_version_id
+from worker_pool import PoolSaturated, WorkerPool
+
 # Initialize FastAPI
 app = FastAPI(
     title="Smart Factory Analytics API",
@@ -33,75 +42,260 @@ app.add_middleware(
 # Paths
 DATA_PATH = "../data/factory_sensors.csv"
 MODEL_DIR = "ml/"
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Inference execution, configurable through the environment:
+#   INFERENCE_POOL     "thread" scores in the request worker threads,
+#                      "process" in a separate process pool
+#   INFERENCE_WORKERS  threads (and processes) doing blocking work
+#   INFERENCE_QUEUE    requests allowed to wait for a thread before 503s
+#   RETRY_AFTER        seconds suggested to clients in Retry-After
+INFERENCE_POOL = os.environ.get("INFERENCE_POOL", "thread")
+INFERENCE_WORKERS = int(os.environ.get("INFERENCE_WORKERS", "4"))
+INFERENCE_QUEUE = int(os.environ.get("INFERENCE_QUEUE", "16"))
+RETRY_AFTER = int(os.environ.get("RETRY_AFTER", "1"))
+
+# WARMUP=background loads the models and data and scores them in a thread at
+# startup, so the first ML request is fast; WARMUP=off leaves everything to
+# first use (serverless cold starts). POST /warmup does the same on demand.
+WARMUP = os.environ.get("WARMUP", "background")
+
+# Seconds between checks of the registry's active version
+MODEL_POLL_SECONDS = float(os.environ.get("MODEL_POLL_SECONDS", "2"))
 
-# Global model storage
+# Versioned models: MODEL_DIR/versions/<version> plus the CURRENT pointer
+registry = ModelRegistry(MODEL_DIR)
+
+# Global model storage; swapped as a whole so readers never see a mix
 models = {}
+models_version = 0
+models_version_id = None
+models_lock = threading.Lock()
 
-def load_models():
-    """Load all trained models."""
-    global models
-    try:
-        models = {
-            'failure_model': joblib.load(f"{MODEL_DIR}failure_model.pkl"),
-            'failure_scaler': joblib.load(f"{MODEL_DIR}failure_scaler.pkl"),
-            'failure_features': joblib.load(f"{MODEL_DIR}failure_features.pkl"),
-            'yield_model': joblib.load(f"{MODEL_DIR}yield_model.pkl"),
-            'yield_scaler': joblib.load(f"{MODEL_DIR}yield_scaler.pkl"),
-            'yield_features': joblib.load(f"{MODEL_DIR}yield_features.pkl"),
-            'anomaly_model': joblib.load(f"{MODEL_DIR}anomaly_model.pkl"),
-            'anomaly_scaler': joblib.load(f"{MODEL_DIR}anomaly_scaler.pkl"),
-            'anomaly_features': joblib.load(f"{MODEL_DIR}anomaly_features.pkl"),
-        }
-        return True
-    except Exception as e:
-        print(f"Error loading models: {e}")
-        return False
+# Serializes loading and activating versions; versions that failed to load are not retried
+swap_lock = threading.Lock()
+failed_versions = set()
+watcher_stop = threading.Event()
 
-# Load models on startup
-@app.on_event("startup")
-async def startup_event():
-    """Load models when API starts."""
-    success = load_models()
-    if success:
+# Blocking pandas/scikit-learn work runs here instead of on the event loop
+worker_pool = WorkerPool(INFERENCE_WORKERS, INFERENCE_QUEUE, RETRY_AFTER)
+
+# Background jobs (data refresh)
+jobs = JobManager()
+
+class MLBackend:
+    """Sensor history, scorer and snapshot cache shared by the ML endpoints.
+    
+    Creating it imports pandas, NumPy and the inference code, so it is only
+    built by the first request (or warm-up) that needs it.
+    """
+    
+    def __init__(self):
+        from data_store import SensorDataStore
+        from inference import ProcessScorer, SnapshotCache
+        # Shared in-memory sensor history
+        self.data_store = SensorDataStore(DATA_PATH)
+        self.scorer = ProcessScorer(MODEL_DIR, INFERENCE_WORKERS) if INFERENCE_POOL == "process" else None
+        # Model outputs for the latest readings, recomputed once per data/model version
+        self.snapshot_cache = (
+            SnapshotCache(self.data_store, self.scorer) if self.scorer else SnapshotCache(self.data_store)
+        )
+
+ml_backend = None
+ml_backend_lock = threading.Lock()
+
+def ml():
+    """Return the shared `MLBackend`, creating it on first use."""
+    global ml_backend
+    if ml_backend is None:
+        with ml_backend_lock:
+            if ml_backend is None:
+                ml_backend = MLBackend()
+    return ml_backend
+
+def install_models(new_models, version_id=None, model_dir=MODEL_DIR):
+    """Make `new_models` current; requests already running keep the old dict."""
+    global models, models_version, models_version_id
+    scorer = ml().scorer
+    with models_lock:
+        if scorer:
+            # Workers load the same files from model_dir
+            scorer.reload(model_dir)
+        models = new_models
+        models_version += 1
+        models_version_id = version_id
+
+def current_models():
+    """Return `(models, version)` as a consistent pair."""
+    with models_lock:
+        return models, models_version
+
+def load_models(if_changed=False):
+    """Load the registry's active version and report how long each artifact took.
+    
+    Without an active version the unversioned models in MODEL_DIR are
+    loaded. With `if_changed`, nothing happens unless the active version
+    differs from the one being served.
+    """
+    from inference import read_models
+    with swap_lock:
+        version = registry.current()
+        if if_changed and ((models_version and version == models_version_id) or version in failed_versions):
+            return True
+        model_dir = registry.version_dir(version) if version else MODEL_DIR
+        try:
+            timings = {}
+            started = time.perf_counter()
+            install_models(read_models(model_dir, timings), version, model_dir)
+            total = time.perf_counter() - started
+            print(f"⏱️  Model cold start ({version or 'unversioned'}): {total * 1000:.1f} ms")
+            for name, seconds in timings.items():
+                print(f"   {name:<20} {seconds * 1000:8.1f} ms")
+            return True
+        except Exception as e:
+            failed_versions.add(version)
+            print(f"Error loading models: {e}")
+            return False
+
+def ensure_models():
+    """Load the models on first use; returns whether any are loaded."""
+    if not current_models()[0]:
+        load_models(if_changed=True)
+    return bool(current_models()[0])
+
+def activate_version(version):
+    """Serve `version` and make it the registry's active one; returns the previous one.
+    
+    The version is loaded before the pointer moves, so a version that cannot
+    be loaded never becomes active. Rolling back is just activating an
+    older version.
+    """
+    from inference import read_models
+    with swap_lock:
+        if not registry.exists(version):
+            raise UnknownVersion(version)
+        model_dir = registry.version_dir(version)
+        new_models = read_models(model_dir) if version != models_version_id else None
+        previous = registry.activate(version)
+        if new_models is not None:
+            install_models(new_models, version, model_dir)
+        return previous
+
+def watch_registry():
+    """Hot-swap the models whenever the registry's active version changes.
+    
+    Models that have not been loaded yet are left to their first use.
+    """
+    while not watcher_stop.wait(MODEL_POLL_SECONDS):
+        if current_models()[1]:
+            load_models(if_changed=True)
+
+def warm_up():
+    """Import the ML stack, load the models and data and score the snapshot.
+    
+    Returns the seconds each step took. Anything already loaded is reused,
+    so calling this again is cheap.
+    """
+    timings = {}
+    started = time.perf_counter()
+    backend = ml()
+    timings["imports"] = time.perf_counter() - started
+    
+    stage_start = time.perf_counter()
+    models_loaded = ensure_models()
+    timings["models"] = time.perf_counter() - stage_start
+    if models_loaded:
         print("✅ Models loaded successfully")
     else:
         print("⚠️  Warning: Models not found. Run train_models.py first.")
-
-def feature_engineering(df):
-    """Create features for predictions."""
-    df = df.sort_values(['machine_id', 'timestamp']).reset_index(drop=True)
     
-    # Time-based features
-    df['hour'] = pd.to_datetime(df['timestamp']).dt.hour
+    samples = None
+    stage_start = time.perf_counter()
+    try:
+        samples = len(backend.data_store.get())
+        print(f"✅ Sensor data loaded ({samples:,} samples)")
+    except FileNotFoundError:
+        print("⚠️  Warning: Sensor data not found. Run simulate_sensor_data.py first.")
+    timings["data"] = time.perf_counter() - stage_start
+    
+    if models_loaded and samples:
+        stage_start = time.perf_counter()
+        backend.snapshot_cache.get(*current_models())
+        timings["inference"] = time.perf_counter() - stage_start
     
-    # Lag features
-    for col in ['temperature', 'vibration', 'pressure', 'speed']:
-        df[f'{col}_lag1'] = df.groupby('machine_id')[col].shift(1)
-        df[f'{col}_change'] = df.groupby('machine_id')[col].diff()
+    return {
+        "models_loaded": models_loaded,
+        "samples": samples,
+        "seconds": {step: round(seconds, 3) for step, seconds in timings.items()}
+    }
+
+def warm_up_in_background():
+    try:
+        result = warm_up()
+        print(f"🔥 Warm-up finished: {result['seconds']}")
+    except Exception as e:
+        print(f"⚠️  Warm-up failed: {e}")
+
+@app.on_event("startup")
+async def startup_event():
+    """Start the registry watcher and, unless WARMUP=off, a background warm-up.
     
-    # Rolling statistics
-    for col in ['temperature', 'vibration', 'pressure']:
-        df[f'{col}_rolling_mean'] = df.groupby('machine_id')[col].rolling(12).mean().reset_index(0, drop=True)
-        df[f'{col}_rolling_std'] = df.groupby('machine_id')[col].rolling(12).std().reset_index(0, drop=True)
+    Nothing heavy runs here, so `/` and `/health` answer right away; the ML
+    endpoints load what they need on first use.
+    """
+    threading.Thread(target=watch_registry, name="model-registry-watcher", daemon=True).start()
+    if WARMUP == "background":
+        threading.Thread(target=warm_up_in_background, name="warm-up", daemon=True).start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the registry watcher and the worker pools."""
+    watcher_stop.set()
+    worker_pool.shutdown()
+    if ml_backend is not None and ml_backend.scorer:
+        ml_backend.scorer.shutdown()
+
+async def offload(fn, *args):
+    """Run blocking work on the worker pool; answer 503 when its queue is full."""
+    try:
+        return await worker_pool.run(fn, *args)
+    except PoolSaturated as e:
+        raise HTTPException(
+            status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)}
+        )
+
+def get_snapshot(request: Request, response: Response):
+    """Return the shared inference snapshot and tag the response with its ETag.
     
-    # Interaction features
-    df['temp_vibration_interaction'] = df['temperature'] * df['vibration']
-    df['pressure_speed_ratio'] = df['pressure'] / (df['speed'] + 1)
+    Returns None when the client already holds the current snapshot
+    (If-None-Match), in which case the caller should answer 304.
+    """
+    snapshot = ml().snapshot_cache.get(*current_models())
+    response.headers["ETag"] = snapshot.etag
+    if request.headers.get("if-none-match") == snapshot.etag:
+        return None
+    return snapshot
+
+def not_modified(response: Response):
+    """Build an empty 304 response carrying the current ETag."""
+    return Response(status_code=304, headers={"ETag": response.headers["ETag"]})
+
+def prediction_payload(kind, request: Request, response: Response):
+    """Build the `kind` prediction payload from the shared snapshot (runs on the worker pool)."""
+    from responses import RESPONSE_BUILDERS
+    if not ensure_models():
+        raise HTTPException(status_code=503, detail="Models not loaded")
     
-    # Fill NaN
-    df = df.fillna(method='bfill').fillna(0)
+    snapshot = get_snapshot(request, response)
+    if snapshot is None:
+        return not_modified(response)
     
-    return df
+    return {
+        "timestamp": datetime.now().isoformat(),
+        **RESPONSE_BUILDERS[kind](snapshot)
+    }
 
 # Pydantic models
-class SensorData(BaseModel):
-    machine_id: str
-    temperature: float
-    vibration: float
-    pressure: float
-    speed: float
-    runtime_hours: float
-
 class FailurePrediction(BaseModel):
     machine_id: str
     failure_probability: float
@@ -141,314 +335,256 @@ async def health_check():
     }
 
 @app.get("/predict_failure")
-async def predict_failure():
+async def predict_failure(request: Request, response: Response):
     """Predict failure probability for all machines."""
     try:
-        if not models:
-            raise HTTPException(status_code=503, detail="Models not loaded")
-        
-        # Load data
-        df = pd.read_csv(DATA_PATH)
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
-        df = feature_engineering(df)
-        
-        # Get latest reading per machine
-        latest = df.groupby('machine_id').tail(1).reset_index(drop=True)
-        
-        # Prepare features
-        X = latest[models['failure_features']]
-        X_scaled = models['failure_scaler'].transform(X)
-        
-        # Predict
-        probabilities = models['failure_model'].predict_proba(X_scaled)[:, 1]
-        
-        # Build response
-        predictions = []
-        for idx, row in latest.iterrows():
-            prob = float(probabilities[idx])
-            
-            if prob > 0.7:
-                risk = "High"
-                rec = "URGENT: Schedule immediate maintenance"
-            elif prob > 0.4:
-                risk = "Medium"
-                rec = "WARNING: Plan maintenance within 48 hours"
-            else:
-                risk = "Low"
-                rec = "NORMAL: Continue regular monitoring"
-            
-            predictions.append({
-                "machine_id": row['machine_id'],
-                "failure_probability": round(prob, 4),
-                "risk_level": risk,
-                "recommendation": rec,
-                "temperature": round(row['temperature'], 2),
-                "vibration": round(row['vibration'], 3),
-                "pressure": round(row['pressure'], 2),
-                "runtime_hours": round(row['runtime_hours'], 2)
-            })
-        
-        return {
-            "timestamp": datetime.now().isoformat(),
-            "total_machines": len(predictions),
-            "high_risk": sum(1 for p in predictions if p['risk_level'] == 'High'),
-            "medium_risk": sum(1 for p in predictions if p['risk_level'] == 'Medium'),
-            "low_risk": sum(1 for p in predictions if p['risk_level'] == 'Low'),
-            "predictions": predictions
-        }
+        # Shared predictions for the latest reading per machine
+        return await offload(prediction_payload, "failure", request, response)
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/predict_yield")
-async def predict_yield():
+async def predict_yield(request: Request, response: Response):
     """Predict yield for all machines."""
     try:
-        if not models:
-            raise HTTPException(status_code=503, detail="Models not loaded")
-        
-        # Load data
-        df = pd.read_csv(DATA_PATH)
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
-        df = feature_engineering(df)
-        
-        # Get latest reading per machine
-        latest = df.groupby('machine_id').tail(1).reset_index(drop=True)
-        
-        # Prepare features
-        X = latest[models['yield_features']]
-        X_scaled = models['yield_scaler'].transform(X)
-        
-        # Predict
-        yields = models['yield_model'].predict(X_scaled)
-        
-        # Build response
-        predictions = []
-        for idx, row in latest.iterrows():
-            yield_val = float(yields[idx])
-            efficiency = np.clip(yield_val, 0, 100)
-            
-            if efficiency >= 85:
-                level = "Excellent"
-            elif efficiency >= 70:
-                level = "Good"
-            else:
-                level = "Poor"
-            
-            predictions.append({
-                "machine_id": row['machine_id'],
-                "predicted_yield": round(yield_val, 2),
-                "efficiency_percentage": round(efficiency, 2),
-                "performance_level": level,
-                "temperature": round(row['temperature'], 2),
-                "pressure": round(row['pressure'], 2),
-                "speed": round(row['speed'], 2)
-            })
-        
-        return {
-            "timestamp": datetime.now().isoformat(),
-            "total_machines": len(predictions),
-            "average_efficiency": round(np.mean([p['efficiency_percentage'] for p in predictions]), 2),
-            "predictions": predictions
-        }
+        # Shared predictions for the latest reading per machine
+        return await offload(prediction_payload, "yield", request, response)
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/detect_anomaly")
-async def detect_anomaly():
+async def detect_anomaly(request: Request, response: Response):
     """Detect anomalies across all machines."""
     try:
-        if not models:
-            raise HTTPException(status_code=503, detail="Models not loaded")
-        
-        # Load data
-        df = pd.read_csv(DATA_PATH)
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
-        df = feature_engineering(df)
-        
-        # Get latest reading per machine
-        latest = df.groupby('machine_id').tail(1).reset_index(drop=True)
-        
-        # Prepare features
-        X = latest[models['anomaly_features']]
-        X_scaled = models['anomaly_scaler'].transform(X)
-        
-        # Predict clusters
-        clusters = models['anomaly_model'].predict(X_scaled)
-        
-        # Cluster names
-        cluster_names = {
-            0: 'Normal Operation',
-            1: 'Elevated Vibration',
-            2: 'High Temperature',
-            3: 'Critical Conditions'
-        }
-        
-        # Build response
-        results = []
-        for idx, row in latest.iterrows():
-            cluster = int(clusters[idx])
-            is_anomalous = cluster >= 2  # Clusters 2 and 3 are anomalous
-            
-            results.append({
-                "machine_id": row['machine_id'],
-                "cluster": cluster,
-                "cluster_name": cluster_names.get(cluster, f'Cluster {cluster}'),
-                "is_anomalous": is_anomalous,
-                "temperature": round(row['temperature'], 2),
-                "vibration": round(row['vibration'], 3),
-                "pressure": round(row['pressure'], 2),
-                "speed": round(row['speed'], 2)
-            })
-        
-        return {
-            "timestamp": datetime.now().isoformat(),
-            "total_machines": len(results),
-            "anomalous_machines": sum(1 for r in results if r['is_anomalous']),
-            "cluster_distribution": {
-                name: sum(1 for r in results if r['cluster'] == cluster)
-                for cluster, name in cluster_names.items()
-            },
-            "results": results
-        }
+        # Shared predictions for the latest reading per machine
+        return await offload(prediction_payload, "anomaly", request, response)
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/machine_health")
-async def get_machine_health():
+async def get_machine_health(request: Request, response: Response):
     """Get comprehensive health status for all machines."""
     try:
-        if not models:
-            raise HTTPException(status_code=503, detail="Models not loaded")
-        
-        # Load data
-        df = pd.read_csv(DATA_PATH)
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
-        df = feature_engineering(df)
-        
-        # Get latest reading per machine
-        latest = df.groupby('machine_id').tail(1).reset_index(drop=True)
-        
-        # Get predictions from all models
-        X_failure = latest[models['failure_features']]
-        X_failure_scaled = models['failure_scaler'].transform(X_failure)
-        failure_probs = models['failure_model'].predict_proba(X_failure_scaled)[:, 1]
-        
-        X_yield = latest[models['yield_features']]
-        X_yield_scaled = models['yield_scaler'].transform(X_yield)
-        yields = models['yield_model'].predict(X_yield_scaled)
-        
-        X_anomaly = latest[models['anomaly_features']]
-        X_anomaly_scaled = models['anomaly_scaler'].transform(X_anomaly)
-        clusters = models['anomaly_model'].predict(X_anomaly_scaled)
-        
-        # Build comprehensive health report
-        health_data = []
-        for idx, row in latest.iterrows():
-            failure_prob = float(failure_probs[idx])
-            yield_val = float(yields[idx])
-            cluster = int(clusters[idx])
-            
-            # Calculate health score
-            health_score = (
-                (1 - failure_prob) * 50 +  # 50% weight
-                (np.clip(yield_val, 0, 100) / 100) * 50  # 50% weight
-            ) * 100
-            
-            if health_score >= 75:
-                status = "Good"
-            elif health_score >= 50:
-                status = "Fair"
-            else:
-                status = "Critical"
-            
-            health_data.append({
-                "machine_id": row['machine_id'],
-                "health_score": round(health_score, 2),
-                "health_status": status,
-                "failure_probability": round(failure_prob, 4),
-                "yield_efficiency": round(np.clip(yield_val, 0, 100), 2),
-                "cluster": cluster,
-                "is_anomalous": cluster >= 2,
-                "temperature": round(row['temperature'], 2),
-                "vibration": round(row['vibration'], 3),
-                "pressure": round(row['pressure'], 2),
-                "speed": round(row['speed'], 2),
-                "runtime_hours": round(row['runtime_hours'], 2),
-                "last_update": row['timestamp'].isoformat()
-            })
-        
-        return {
-            "timestamp": datetime.now().isoformat(),
-            "total_machines": len(health_data),
-            "average_health_score": round(np.mean([h['health_score'] for h in health_data]), 2),
-            "good_health": sum(1 for h in health_data if h['health_status'] == 'Good'),
-            "fair_health": sum(1 for h in health_data if h['health_status'] == 'Fair'),
-            "critical_health": sum(1 for h in health_data if h['health_status'] == 'Critical'),
-            "machines": health_data
-        }
+        # Shared predictions from all models for the latest reading per machine
+        return await offload(prediction_payload, "health", request, response)
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/refresh_data")
-async def refresh_data():
-    """Regenerate sensor data and retrain models."""
+def ingest_batch(body, content_type):
+    """Validate and store a batch of readings (runs on the worker pool)."""
+    from feature_state import OutOfOrderReadings
+    from ingest import parse_readings
+    readings = parse_readings(body, content_type)
+    if len(readings):
+        try:
+            ml().data_store.append(readings)
+        except OutOfOrderReadings as e:
+            raise HTTPException(status_code=422, detail=str(e))
+    
+    return {
+        "status": "success",
+        "ingested": len(readings),
+        "machines": int(readings['machine_id'].nunique()),
+        "timestamp": datetime.now().isoformat()
+    }
+
+@app.post("/ingest")
+async def ingest_readings(request: Request):
+    """Ingest a batch of live sensor readings (JSON array or NDJSON body)."""
+    body = await request.body()
+    try:
+        return await offload(ingest_batch, body, request.headers.get("content-type", ""))
+    
+    except HTTPException:
+        raise
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_input=False))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+REFRESH_STAGES = ["simulate", "train", "swap", "reports"]
+
+def run_script(*args):
+    """Run a repo script from the repo root, raising with its stderr on failure."""
+    result = subprocess.run(
+        [sys.executable, *args], cwd=ROOT_DIR, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        detail = result.stderr.strip().splitlines()[-1:] or [f"exit code {result.returncode}"]
+        raise RuntimeError(f"{args[0]} failed: {detail[0]}")
+
+def refresh_pipeline(job_id, set_stage):
+    """Regenerate data and retrain into a new registry version, then swap both in.
+    
+    Until the swap, requests are served from the current data and models.
+    If simulation or training fails nothing is replaced.
+    """
+    from inference import read_models
+    staging = os.path.join(ROOT_DIR, "data", f".refresh-{job_id}")
+    staged_data = os.path.join(staging, "factory_sensors.csv")
+    version = new_version_id()
     try:
         # Run simulation script
-        subprocess.run(["python", "../simulate_sensor_data.py"], check=True)
-        
-        # Retrain models
-        subprocess.run(["python", "ml/train_models.py"], check=True)
-        
-        # Reload models
-        load_models()
-        
-        # Generate reports
-        subprocess.run(["python", "../generate_reports.py"], check=True)
-        
+        set_stage("simulate")
+        run_script("simulate_sensor_data.py", "--output", staged_data)
+        
+        # Retrain models into a new, not yet active registry version
+        set_stage("train")
+        run_script("backend/ml/train_models.py", "--data", staged_data,
+                   "--model-dir", os.path.abspath(MODEL_DIR), "--version", version, "--no-activate")
+        
+        # Load the new models before touching anything that is being served
+        set_stage("swap")
+        model_dir = registry.version_dir(version)
+        with swap_lock:
+            new_models = read_models(model_dir)
+            df = ml().data_store.replace(staged_data)
+            registry.activate(version)
+            install_models(new_models, version, model_dir)
+        
+        # Generate reports (from scratch: the history was regenerated)
+        set_stage("reports")
+        run_script("generate_reports.py", "--full")
+        
+        return {"samples": len(df), "model_version": version, "models_version": current_models()[1]}
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+@app.post("/refresh_data", status_code=202)
+async def refresh_data():
+    """Start regenerating sensor data and retraining models in the background."""
+    try:
+        job = jobs.submit("refresh", refresh_pipeline, REFRESH_STAGES)
+    except JobConflict as e:
+        raise HTTPException(
+            status_code=409,
+            detail={"message": str(e), "job_id": e.job["job_id"], "status_url": f"/jobs/{e.job['job_id']}"}
+        )
+    
+    return {
+        "status": "accepted",
+        "job_id": job["job_id"],
+        "status_url": f"/jobs/{job['job_id']}",
+        "timestamp": datetime.now().isoformat()
+    }
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Get the status and progress of a background job."""
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
+def current_serving_version():
+    with models_lock:
+        return models_version_id
+
+def list_model_versions():
+    """Manifests of every registered version, newest first (runs on the worker pool)."""
+    active = registry.current()
+    versions = [
+        {**manifest, "active": manifest["version"] == active}
+        for manifest in reversed(registry.versions())
+    ]
+    return {
+        "active_version": active,
+        "serving_version": current_serving_version(),
+        "versions": versions,
+        "timestamp": datetime.now().isoformat()
+    }
+
+@app.get("/models")
+async def get_models():
+    """List the registered model versions and which one is active."""
+    try:
+        return await offload(list_model_versions)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/models/{version}/activate")
+async def activate_model_version(version: str):
+    """Switch the served models to `version`, e.g. to roll back; no retraining."""
+    try:
+        previous = await offload(activate_version, version)
         return {
-            "status": "success",
-            "message": "Data refreshed, models retrained, and reports generated",
+            "status": "activated",
+            "version": version,
+            "previous_version": previous,
             "timestamp": datetime.now().isoformat()
         }
-    
+
+    except UnknownVersion as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/warmup")
+async def warmup():
+    """Load the models and sensor data and score the snapshot ahead of the first ML request."""
+    try:
+        result = await offload(warm_up)
+        return {**result, "timestamp": datetime.now().isoformat()}
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+def compute_statistics():
+    """Aggregate the sensor history (runs on the worker pool)."""
+    df = ml().data_store.get()
+    
+    total_samples = len(df)
+    total_machines = df['machine_id'].nunique()
+    total_failures = df['is_failure'].sum()
+    failure_rate = (total_failures / total_samples) * 100
+    
+    date_range = df['timestamp']
+    
+    return {
+        "total_samples": int(total_samples),
+        "total_machines": int(total_machines),
+        "total_failures": int(total_failures),
+        "failure_rate_percentage": round(failure_rate, 2),
+        "date_range": {
+            "start": date_range.min().isoformat(),
+            "end": date_range.max().isoformat()
+        },
+        "average_metrics": {
+            "temperature": round(float(df['temperature'].mean()), 2),
+            "vibration": round(float(df['vibration'].mean()), 3),
+            "pressure": round(float(df['pressure'].mean()), 2),
+            "speed": round(float(df['speed'].mean()), 2),
+            "runtime_hours": round(float(df['runtime_hours'].mean()), 2)
+        }
+    }
+
 @app.get("/statistics")
 async def get_statistics():
     """Get overall factory statistics."""
     try:
-        df = pd.read_csv(DATA_PATH)
-        
-        total_samples = len(df)
-        total_machines = df['machine_id'].nunique()
-        total_failures = df['is_failure'].sum()
-        failure_rate = (total_failures / total_samples) * 100
-        
-        date_range = pd.to_datetime(df['timestamp'])
-        
-        return {
-            "total_samples": int(total_samples),
-            "total_machines": int(total_machines),
-            "total_failures": int(total_failures),
-            "failure_rate_percentage": round(failure_rate, 2),
-            "date_range": {
-                "start": date_range.min().isoformat(),
-                "end": date_range.max().isoformat()
-            },
-            "average_metrics": {
-                "temperature": round(df['temperature'].mean(), 2),
-                "vibration": round(df['vibration'].mean(), 3),
-                "pressure": round(df['pressure'].mean(), 2),
-                "speed": round(df['speed'].mean(), 2),
-                "runtime_hours": round(df['runtime_hours'].mean(), 2)
-            }
-        }
+        return await offload(compute_statistics)
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
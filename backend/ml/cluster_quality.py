@@ -0,0 +1,66 @@
+"""
+Smart Factory Analytics - Cluster Quality
+Scalable quality scores for the anomaly clustering. The exact silhouette is
+O(n²) in time and memory, so by default it is estimated on a stratified
+sample; Davies-Bouldin and Calinski-Harabasz are O(n·k) and always use
+every row.
+"""
+
+import numpy as np
+from sklearn.metrics import calinski_harabasz_score, davies_bouldin_score, silhouette_score
+
+# Evaluation modes:
+#   sampled - silhouette on a stratified sample + Davies-Bouldin + Calinski-Harabasz
+#   full    - exact silhouette on every row (small datasets only) + the linear scores
+#   fast    - Davies-Bouldin + Calinski-Harabasz only
+EVAL_MODES = ['sampled', 'full', 'fast']
+SILHOUETTE_SAMPLE_SIZE = 10000
+
+
+def stratified_sample(labels, sample_size, random_state=42):
+    """Pick about `sample_size` row indices with each cluster in proportion to its size.
+
+    Every cluster with at least two rows keeps at least two, so small
+    clusters still contribute to the silhouette.
+    """
+    labels = np.asarray(labels)
+    n = len(labels)
+    if sample_size >= n:
+        return np.arange(n)
+
+    rng = np.random.default_rng(random_state)
+    clusters, counts = np.unique(labels, return_counts=True)
+    quotas = np.maximum(np.minimum(counts, 2), np.round(counts * sample_size / n).astype(int))
+
+    # One argsort groups rows by cluster; each cluster is then sampled in place
+    order = np.argsort(labels, kind='stable')
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    picks = [
+        order[start + rng.choice(count, size=quota, replace=False)]
+        for start, count, quota in zip(starts, counts, quotas)
+    ]
+    return np.sort(np.concatenate(picks))
+
+
+def evaluate_clusters(X, labels, mode='sampled', sample_size=SILHOUETTE_SAMPLE_SIZE, random_state=42):
+    """Return a dict of cluster quality scores for `X` labelled with `labels`.
+
+    Keys: `silhouette` (None in fast mode), `silhouette_rows` (rows it was
+    computed on), `davies_bouldin` (lower is better) and
+    `calinski_harabasz` (higher is better).
+    """
+    if mode not in EVAL_MODES:
+        raise ValueError(f"Unknown cluster evaluation mode '{mode}' (choose from {EVAL_MODES})")
+
+    X = np.asarray(X)
+    labels = np.asarray(labels)
+    scores = {"silhouette": None, "silhouette_rows": 0}
+
+    if mode != 'fast':
+        index = np.arange(len(labels)) if mode == 'full' else stratified_sample(labels, sample_size, random_state)
+        scores["silhouette"] = float(silhouette_score(X[index], labels[index]))
+        scores["silhouette_rows"] = len(index)
+
+    scores["davies_bouldin"] = float(davies_bouldin_score(X, labels))
+    scores["calinski_harabasz"] = float(calinski_harabasz_score(X, labels))
+    return scores
@@ -6,24 +6,77 @@ Trains predictive maintenance, yield optimization, and anomaly detection models.
 import pandas as pd
 import numpy as np
 import joblib
+import argparse
+import json
 import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
-from sklearn.cluster import KMeans
+from sklearn.ensemble import (
+    RandomForestClassifier, RandomForestRegressor,
+    HistGradientBoostingClassifier, HistGradientBoostingRegressor
+)
+from sklearn.cluster import KMeans, MiniBatchKMeans
 from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import (
-    classification_report, confusion_matrix, accuracy_score,
-    mean_absolute_error, mean_squared_error, r2_score,
-    silhouette_score
+    classification_report, confusion_matrix, accuracy_score, roc_auc_score,
+    mean_absolute_error, mean_squared_error, r2_score
 )
+from threadpoolctl import threadpool_limits
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from sensor_storage import list_machines, read_sensors, resolve_source
+from cluster_quality import EVAL_MODES, SILHOUETTE_SAMPLE_SIZE, evaluate_clusters
+from features import ROLLING_WINDOWS, feature_engineering
+from model_bundle import BUNDLE_FILE, MODEL_ARTIFACTS, load_model_dir, write_bundle
+from model_registry import ModelRegistry, data_fingerprint
+from pipeline import build_pipeline
+
 # Paths
 DATA_PATH = "data/factory_sensors.csv"
-MODEL_DIR = "backend/ml/"
-os.makedirs(MODEL_DIR, exist_ok=True)
+REGISTRY_DIR = "backend/ml/"
+os.makedirs(REGISTRY_DIR, exist_ok=True)
+
+# Feature sets
+FAILURE_FEATURES = [
+    'temperature', 'vibration', 'pressure', 'speed', 'runtime_hours',
+    'temperature_change', 'vibration_change', 'pressure_change',
+    'temperature_rolling_mean', 'vibration_rolling_mean', 'pressure_rolling_mean',
+    'temperature_rolling_std', 'vibration_rolling_std', 'pressure_rolling_std',
+    'temp_vibration_interaction', 'pressure_speed_ratio', 'hour'
+]
+
+YIELD_FEATURES = [
+    'temperature', 'vibration', 'pressure', 'speed', 'runtime_hours',
+    'temperature_change', 'vibration_change', 'pressure_change',
+    'temperature_rolling_mean', 'vibration_rolling_mean', 'pressure_rolling_mean',
+    'temp_vibration_interaction', 'pressure_speed_ratio'
+]
+
+ANOMALY_FEATURES = [
+    'temperature', 'vibration', 'pressure', 'speed',
+    'temperature_change', 'vibration_change', 'pressure_change',
+    'temperature_rolling_std', 'vibration_rolling_std', 'pressure_rolling_std'
+]
+
+# Estimators available for the failure and yield models
+ESTIMATORS = ['random_forest', 'hist_gradient_boosting']
+
+# Streaming anomaly trainer: rows per chunk, rows per partial_fit step,
+# passes over the data and rows kept for quality scoring
+STREAM_CHUNK_ROWS = 100_000
+STREAM_BATCH_SIZE = 4096
+STREAM_EPOCHS = 2
+STREAM_EVAL_ROWS = 100_000
+MACHINES_PER_CHUNK = 8
+
+# Relative core demand of each trainer when splitting the core budget
+TRAINER_WEIGHTS = {'failure': 2, 'yield': 2, 'anomaly': 1}
 
 # Suppress warnings
 import warnings
@@ -32,56 +85,88 @@ warnings.filterwarnings('ignore')
 def load_and_preprocess_data():
     """Load and preprocess sensor data."""
     print("📂 Loading sensor data...")
-    df = pd.read_csv(DATA_PATH)
-    df['timestamp'] = pd.to_datetime(df['timestamp'])
-    df = df.sort_values(['machine_id', 'timestamp']).reset_index(drop=True)
+    # Sorted by machine_id and timestamp, with parsed timestamps
+    df = read_sensors(resolve_source(DATA_PATH))
     
     print(f"✅ Loaded {len(df):,} samples from {df['machine_id'].nunique()} machines")
     return df
 
-def feature_engineering(df):
-    """Create advanced features for ML models."""
-    print("🔧 Engineering features...")
-    
-    # Time-based features
-    df['hour'] = df['timestamp'].dt.hour
-    df['day_of_week'] = df['timestamp'].dt.dayofweek
-    df['day_of_month'] = df['timestamp'].dt.day
-    
-    # Lag features (previous readings)
-    for col in ['temperature', 'vibration', 'pressure', 'speed']:
-        df[f'{col}_lag1'] = df.groupby('machine_id')[col].shift(1)
-        df[f'{col}_change'] = df.groupby('machine_id')[col].diff()
-    
-    # Rolling statistics (12 samples = 1 hour)
-    for col in ['temperature', 'vibration', 'pressure']:
-        df[f'{col}_rolling_mean'] = df.groupby('machine_id')[col].rolling(12).mean().reset_index(0, drop=True)
-        df[f'{col}_rolling_std'] = df.groupby('machine_id')[col].rolling(12).std().reset_index(0, drop=True)
-    
-    # Interaction features
-    df['temp_vibration_interaction'] = df['temperature'] * df['vibration']
-    df['pressure_speed_ratio'] = df['pressure'] / (df['speed'] + 1)
-    
-    # Fill NaN values created by lag/rolling operations
-    df = df.fillna(method='bfill').fillna(0)
+def make_estimator(task, estimator='random_forest', n_jobs=-1):
+    """Build the failure classifier or yield regressor.
+    
+    `random_forest` is the original 200-tree forest. `hist_gradient_boosting`
+    bins every feature into at most 255 buckets and grows shallow boosted
+    trees, which fits faster, pickles far smaller and predicts single rows
+    with less overhead. It uses OpenMP threads instead of `n_jobs`.
+    """
+    if estimator not in ESTIMATORS:
+        raise ValueError(f"Unknown estimator '{estimator}' (choose from {ESTIMATORS})")
+    
+    if estimator == 'hist_gradient_boosting':
+        if task == 'failure':
+            return HistGradientBoostingClassifier(
+                max_iter=200,
+                learning_rate=0.1,
+                max_leaf_nodes=31,
+                min_samples_leaf=20,
+                class_weight='balanced',
+                random_state=42
+            )
+        return HistGradientBoostingRegressor(
+            max_iter=200,
+            learning_rate=0.1,
+            max_leaf_nodes=31,
+            min_samples_leaf=20,
+            random_state=42
+        )
+    
+    if task == 'failure':
+        return RandomForestClassifier(
+            n_estimators=200,
+            max_depth=15,
+            min_samples_split=10,
+            min_samples_leaf=5,
+            class_weight='balanced',
+            random_state=42,
+            n_jobs=n_jobs
+        )
+    return RandomForestRegressor(
+        n_estimators=200,
+        max_depth=15,
+        min_samples_split=10,
+        min_samples_leaf=5,
+        random_state=42,
+        n_jobs=n_jobs
+    )
+
+def estimator_label(estimator):
+    return estimator.replace('_', ' ').title()
+
+def print_feature_importance(model, feature_cols):
+    """Print the top features for models that expose impurity importances."""
+    if not hasattr(model, 'feature_importances_'):
+        return
+    feature_importance = pd.DataFrame({
+        'feature': feature_cols,
+        'importance': model.feature_importances_
+    }).sort_values('importance', ascending=False)
     
-    print(f"✅ Created {df.shape[1]} features")
-    return df
+    print("\n🔝 Top 10 Important Features:")
+    print(feature_importance.head(10).to_string(index=False))
+
+def save_metrics(name, metrics, model_dir):
+    """Save a trainer's evaluation metrics next to its model for the registry manifest."""
+    with open(os.path.join(model_dir, f"{name}_metrics.json"), 'w') as f:
+        json.dump(metrics, f, indent=2)
 
-def train_failure_prediction_model(df):
-    """Train Random Forest Classifier for failure prediction."""
+def train_failure_prediction_model(df, model_dir, n_jobs=-1, estimator='random_forest'):
+    """Train the failure prediction classifier (Random Forest by default) and save it to `model_dir`."""
     print("\n" + "="*80)
     print("🎯 TRAINING FAILURE PREDICTION MODEL")
     print("="*80)
     
     # Feature selection
-    feature_cols = [
-        'temperature', 'vibration', 'pressure', 'speed', 'runtime_hours',
-        'temperature_change', 'vibration_change', 'pressure_change',
-        'temperature_rolling_mean', 'vibration_rolling_mean', 'pressure_rolling_mean',
-        'temperature_rolling_std', 'vibration_rolling_std', 'pressure_rolling_std',
-        'temp_vibration_interaction', 'pressure_speed_ratio', 'hour'
-    ]
+    feature_cols = list(FAILURE_FEATURES)
     
     X = df[feature_cols]
     y = df['is_failure']
@@ -100,16 +185,8 @@ def train_failure_prediction_model(df):
     X_test_scaled = scaler.transform(X_test)
     
     # Train model
-    print("🔄 Training Random Forest Classifier...")
-    model = RandomForestClassifier(
-        n_estimators=200,
-        max_depth=15,
-        min_samples_split=10,
-        min_samples_leaf=5,
-        class_weight='balanced',
-        random_state=42,
-        n_jobs=-1
-    )
+    print(f"🔄 Training {estimator_label(estimator)} Classifier...")
+    model = make_estimator('failure', estimator, n_jobs)
     model.fit(X_train_scaled, y_train)
     
     # Predictions
@@ -123,24 +200,23 @@ def train_failure_prediction_model(df):
     print(classification_report(y_test, y_pred, target_names=['No Failure', 'Failure']))
     
     # Feature importance
-    feature_importance = pd.DataFrame({
-        'feature': feature_cols,
-        'importance': model.feature_importances_
-    }).sort_values('importance', ascending=False)
-    
-    print("\n🔝 Top 10 Important Features:")
-    print(feature_importance.head(10).to_string(index=False))
+    print_feature_importance(model, feature_cols)
     
     # Save model and scaler
-    joblib.dump(model, f"{MODEL_DIR}failure_model.pkl")
-    joblib.dump(scaler, f"{MODEL_DIR}failure_scaler.pkl")
-    joblib.dump(feature_cols, f"{MODEL_DIR}failure_features.pkl")
-    
-    print(f"\n💾 Model saved to {MODEL_DIR}failure_model.pkl")
+    joblib.dump(model, os.path.join(model_dir, "failure_model.pkl"))
+    joblib.dump(scaler, os.path.join(model_dir, "failure_scaler.pkl"))
+    joblib.dump(feature_cols, os.path.join(model_dir, "failure_features.pkl"))
+    save_metrics('failure', {
+        'accuracy': float(accuracy),
+        'roc_auc': float(roc_auc_score(y_test, y_pred_proba)),
+        'test_samples': len(y_test),
+    }, model_dir)
+    
+    print(f"\n💾 Model saved to {os.path.join(model_dir, 'failure_model.pkl')}")
     return model, scaler, feature_cols
 
-def train_yield_prediction_model(df):
-    """Train Random Forest Regressor for yield optimization."""
+def train_yield_prediction_model(df, model_dir, n_jobs=-1, estimator='random_forest'):
+    """Train the yield regressor (Random Forest by default) and save it to `model_dir`."""
     print("\n" + "="*80)
     print("📈 TRAINING YIELD PREDICTION MODEL")
     print("="*80)
@@ -157,12 +233,7 @@ def train_yield_prediction_model(df):
     df['yield'] = df['yield'].clip(0, 100)
     
     # Feature selection
-    feature_cols = [
-        'temperature', 'vibration', 'pressure', 'speed', 'runtime_hours',
-        'temperature_change', 'vibration_change', 'pressure_change',
-        'temperature_rolling_mean', 'vibration_rolling_mean', 'pressure_rolling_mean',
-        'temp_vibration_interaction', 'pressure_speed_ratio'
-    ]
+    feature_cols = list(YIELD_FEATURES)
     
     X = df[feature_cols]
     y = df['yield']
@@ -181,15 +252,8 @@ def train_yield_prediction_model(df):
     X_test_scaled = scaler.transform(X_test)
     
     # Train model
-    print("🔄 Training Random Forest Regressor...")
-    model = RandomForestRegressor(
-        n_estimators=200,
-        max_depth=15,
-        min_samples_split=10,
-        min_samples_leaf=5,
-        random_state=42,
-        n_jobs=-1
-    )
+    print(f"🔄 Training {estimator_label(estimator)} Regressor...")
+    model = make_estimator('yield', estimator, n_jobs)
     model.fit(X_train_scaled, y_train)
     
     # Predictions
@@ -206,34 +270,26 @@ def train_yield_prediction_model(df):
     print(f"   R²:   {r2:.4f}")
     
     # Feature importance
-    feature_importance = pd.DataFrame({
-        'feature': feature_cols,
-        'importance': model.feature_importances_
-    }).sort_values('importance', ascending=False)
-    
-    print("\n🔝 Top 10 Important Features:")
-    print(feature_importance.head(10).to_string(index=False))
+    print_feature_importance(model, feature_cols)
     
     # Save model and scaler
-    joblib.dump(model, f"{MODEL_DIR}yield_model.pkl")
-    joblib.dump(scaler, f"{MODEL_DIR}yield_scaler.pkl")
-    joblib.dump(feature_cols, f"{MODEL_DIR}yield_features.pkl")
+    joblib.dump(model, os.path.join(model_dir, "yield_model.pkl"))
+    joblib.dump(scaler, os.path.join(model_dir, "yield_scaler.pkl"))
+    joblib.dump(feature_cols, os.path.join(model_dir, "yield_features.pkl"))
+    save_metrics('yield', {'mae': float(mae), 'rmse': float(rmse), 'r2': float(r2), 'test_samples': len(y_test)},
+                 model_dir)
     
-    print(f"\n💾 Model saved to {MODEL_DIR}yield_model.pkl")
+    print(f"\n💾 Model saved to {os.path.join(model_dir, 'yield_model.pkl')}")
     return model, scaler, feature_cols
 
-def train_anomaly_detection_model(df):
-    """Train K-Means clustering for anomaly detection."""
+def train_anomaly_detection_model(df, model_dir, cluster_eval='sampled', sample_size=SILHOUETTE_SAMPLE_SIZE):
+    """Train K-Means clustering for anomaly detection and save it to `model_dir`."""
     print("\n" + "="*80)
     print("🔍 TRAINING ANOMALY DETECTION MODEL")
     print("="*80)
     
     # Feature selection
-    feature_cols = [
-        'temperature', 'vibration', 'pressure', 'speed',
-        'temperature_change', 'vibration_change', 'pressure_change',
-        'temperature_rolling_std', 'vibration_rolling_std', 'pressure_rolling_std'
-    ]
+    feature_cols = list(ANOMALY_FEATURES)
     
     X = df[feature_cols]
     
@@ -249,9 +305,12 @@ def train_anomaly_detection_model(df):
     model = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
     clusters = model.fit_predict(X_scaled)
     
-    # Evaluation
-    silhouette = silhouette_score(X_scaled, clusters)
-    print(f"\n✅ Silhouette Score: {silhouette:.4f}")
+    # Evaluation (the exact silhouette is O(n²), so it is sampled by default)
+    scores = evaluate_clusters(X_scaled, clusters, cluster_eval, sample_size)
+    if scores['silhouette'] is not None:
+        print(f"\n✅ Silhouette Score: {scores['silhouette']:.4f} ({scores['silhouette_rows']:,} rows)")
+    print(f"✅ Davies-Bouldin Index: {scores['davies_bouldin']:.4f}")
+    print(f"✅ Calinski-Harabasz Index: {scores['calinski_harabasz']:,.1f}")
     
     # Cluster statistics
     df['cluster'] = clusters
@@ -260,46 +319,451 @@ def train_anomaly_detection_model(df):
         'temperature': 'mean',
         'vibration': 'mean',
         'pressure': 'mean',
-        'is_failure': 'mean',
-        'machine_id': 'count'
-    }).rename(columns={'machine_id': 'count'})
+        'is_failure': 'mean'
+    })
+    cluster_stats['count'] = df.groupby('cluster').size()
     cluster_stats['failure_rate_%'] = cluster_stats['is_failure'] * 100
     print(cluster_stats)
     
     # Save model and scaler
-    joblib.dump(model, f"{MODEL_DIR}anomaly_model.pkl")
-    joblib.dump(scaler, f"{MODEL_DIR}anomaly_scaler.pkl")
-    joblib.dump(feature_cols, f"{MODEL_DIR}anomaly_features.pkl")
+    joblib.dump(model, os.path.join(model_dir, "anomaly_model.pkl"))
+    joblib.dump(scaler, os.path.join(model_dir, "anomaly_scaler.pkl"))
+    joblib.dump(feature_cols, os.path.join(model_dir, "anomaly_features.pkl"))
+    save_metrics('anomaly', scores, model_dir)
+    
+    print(f"\n💾 Model saved to {os.path.join(model_dir, 'anomaly_model.pkl')}")
+    return model, scaler, feature_cols
+
+def frame_chunks(df, chunk_rows=STREAM_CHUNK_ROWS):
+    """Return a callable that re-iterates `df` in row chunks (one pass per call)."""
+    return lambda: (df.iloc[start:start + chunk_rows] for start in range(0, len(df), chunk_rows))
+
+def storage_chunks(machines_per_chunk=MACHINES_PER_CHUNK, since=None):
+    """Return a callable that streams engineered features a few machines at a time.
+    
+    Features are computed per machine, so every chunk matches the rows of a
+    full `feature_engineering()` run. Readings before `since` only serve as
+    warm-up history for the lag/rolling features and are dropped.
+    """
+    source = resolve_source(DATA_PATH)
+    machine_ids = list_machines(source)
+    # Enough history for the longest rolling window
+    warmup = pd.Timedelta(minutes=5 * max(ROLLING_WINDOWS))
+    
+    def chunks():
+        for start in range(0, len(machine_ids), machines_per_chunk):
+            group = machine_ids[start:start + machines_per_chunk]
+            df = read_sensors(
+                source, machine_ids=group,
+                start=None if since is None else pd.Timestamp(since) - warmup
+            )
+            df = feature_engineering(df)
+            if since is not None:
+                df = df[df['timestamp'] >= pd.Timestamp(since)]
+            if len(df):
+                yield df
+    return chunks
+
+def train_anomaly_detection_streaming(chunks, model_dir, model=None, scaler=None, cluster_eval='sampled',
+                                      sample_size=SILHOUETTE_SAMPLE_SIZE, epochs=STREAM_EPOCHS):
+    """Train (or update) a MiniBatchKMeans anomaly model from feature chunks.
+    
+    `chunks()` must yield DataFrames with the engineered features and is
+    called once per pass, so memory stays at one chunk however long the
+    history is. Without a `scaler` one is fitted in a first pass with
+    `partial_fit`; with an existing `model` and `scaler` (incremental update)
+    the scaler is kept fixed so the cluster space does not move. The result
+    is saved to `model_dir` under the same `anomaly_*` names as the
+    full-batch model.
+    """
+    print("\n" + "="*80)
+    print("🔍 TRAINING ANOMALY DETECTION MODEL (STREAMING)")
+    print("="*80)
+    
+    feature_cols = list(ANOMALY_FEATURES)
+    rng = np.random.default_rng(42)
+    
+    # Pass 1: scaling statistics
+    if scaler is None:
+        scaler = StandardScaler()
+        for chunk in chunks():
+            scaler.partial_fit(chunk[feature_cols])
+    total_rows = int(scaler.n_samples_seen_) if model is None else None
+    
+    # Passes 2..: mini-batch k-means
+    print("🔄 Training Mini-Batch K-Means Clustering...")
+    if model is None:
+        n_clusters = 4  # Normal, Warning, Critical, Failure
+        model = MiniBatchKMeans(n_clusters=n_clusters, random_state=42, batch_size=STREAM_BATCH_SIZE, n_init=3)
+    for epoch in range(epochs):
+        for chunk in chunks():
+            X_scaled = scaler.transform(chunk[feature_cols])
+            for start in range(0, len(X_scaled), STREAM_BATCH_SIZE):
+                batch = X_scaled[start:start + STREAM_BATCH_SIZE]
+                if len(batch) >= model.n_clusters:
+                    model.partial_fit(batch)
+    
+    # Final pass: cluster statistics plus a random sample for quality scores
+    sums = np.zeros((model.n_clusters, 4))
+    counts = np.zeros(model.n_clusters, dtype=np.int64)
+    samples, sample_labels = [], []
+    seen = 0
+    for chunk in chunks():
+        X_scaled = scaler.transform(chunk[feature_cols])
+        clusters = model.predict(X_scaled)
+        counts += np.bincount(clusters, minlength=model.n_clusters)
+        raw = chunk[['temperature', 'vibration', 'pressure', 'is_failure']].to_numpy(dtype=np.float64)
+        for j in range(raw.shape[1]):
+            sums[:, j] += np.bincount(clusters, weights=raw[:, j], minlength=model.n_clusters)
+        
+        fraction = STREAM_EVAL_ROWS / total_rows if total_rows else 1.0
+        keep = rng.random(len(X_scaled)) < fraction
+        samples.append(X_scaled[keep])
+        sample_labels.append(clusters[keep])
+        seen += len(X_scaled)
+    
+    print(f"📊 Total samples: {seen:,}")
+    
+    # Evaluation on the retained sample
+    X_sample = np.concatenate(samples)[:STREAM_EVAL_ROWS]
+    labels_sample = np.concatenate(sample_labels)[:STREAM_EVAL_ROWS]
+    scores = evaluate_clusters(
+        X_sample, labels_sample, 'sampled' if cluster_eval == 'full' else cluster_eval, sample_size
+    )
+    if scores['silhouette'] is not None:
+        print(f"\n✅ Silhouette Score: {scores['silhouette']:.4f} ({scores['silhouette_rows']:,} rows)")
+    print(f"✅ Davies-Bouldin Index: {scores['davies_bouldin']:.4f} ({len(X_sample):,} rows)")
+    print(f"✅ Calinski-Harabasz Index: {scores['calinski_harabasz']:,.1f}")
+    
+    # Cluster statistics
+    print("\n📊 Cluster Distribution:")
+    means = sums / np.maximum(counts, 1)[:, None]
+    cluster_stats = pd.DataFrame(
+        means, columns=['temperature', 'vibration', 'pressure', 'is_failure'],
+        index=pd.Index(range(model.n_clusters), name='cluster')
+    )
+    cluster_stats['count'] = counts
+    cluster_stats['failure_rate_%'] = cluster_stats['is_failure'] * 100
+    print(cluster_stats[cluster_stats['count'] > 0])
+    
+    # Save model and scaler
+    joblib.dump(model, os.path.join(model_dir, "anomaly_model.pkl"))
+    joblib.dump(scaler, os.path.join(model_dir, "anomaly_scaler.pkl"))
+    joblib.dump(feature_cols, os.path.join(model_dir, "anomaly_features.pkl"))
+    save_metrics('anomaly', scores, model_dir)
     
-    print(f"\n💾 Model saved to {MODEL_DIR}anomaly_model.pkl")
+    print(f"\n💾 Model saved to {os.path.join(model_dir, 'anomaly_model.pkl')}")
     return model, scaler, feature_cols
 
-def main():
-    """Main training pipeline."""
+def train_anomaly_on_frame(df, model_dir, trainer='kmeans', **options):
+    """Anomaly stage of `train_all()`: full-batch KMeans or streaming over row chunks."""
+    if trainer == 'minibatch':
+        return train_anomaly_detection_streaming(frame_chunks(df), model_dir, **options)
+    return train_anomaly_detection_model(df, model_dir, **options)
+
+def stream_anomaly_model(since=None, cluster_eval='sampled', sample_size=SILHOUETTE_SAMPLE_SIZE,
+                         version=None, activate=True, registry_dir=REGISTRY_DIR):
+    """Train the anomaly model straight from storage, a few machines at a time.
+    
+    A Mini-Batch K-Means model in the active registry version is refined with
+    one pass over the readings (from `since` on, if given); otherwise a new
+    one is trained. The result is published as a new version that keeps the
+    failure and yield models of the active one, in the registry at
+    `registry_dir`.
+    """
+    registry = ModelRegistry(registry_dir)
+    parent = registry.current()
+    base_dir = registry.current_dir()
+    model_dir = registry.staging_dir()
+    try:
+        try:
+            saved = load_model_dir(base_dir, ['anomaly_model', 'anomaly_scaler'], writable=True)
+        except FileNotFoundError:
+            saved = {}
+        model = saved.get('anomaly_model')
+        if isinstance(model, MiniBatchKMeans):
+            print(f"♻️  Updating the existing Mini-Batch K-Means model from {base_dir}")
+            train_anomaly_detection_streaming(
+                storage_chunks(since=since), model_dir, model, saved['anomaly_scaler'], cluster_eval, sample_size,
+                epochs=1
+            )
+        else:
+            train_anomaly_detection_streaming(storage_chunks(since=since), model_dir, None, None, cluster_eval,
+                                              sample_size)
+        artifacts = export_bundle(model_dir, base_dir)
+        return publish_version(registry, model_dir, artifacts, parent, {
+            'trained': ['anomaly'],
+            'since': since.isoformat() if since is not None else None,
+        }, version, activate)
+    except BaseException:
+        registry.discard(model_dir)
+        raise
+
+def allocate_cores(total, weights):
+    """Split `total` cores across trainers in proportion to `weights`, at least one each."""
+    names = list(weights)
+    if total <= len(names):
+        return {name: 1 for name in names}
+    scale = sum(weights.values())
+    cores = {name: max(1, total * weights[name] // scale) for name in names}
+    # Hand leftover cores to the heaviest trainers first
+    for name in sorted(names, key=weights.get, reverse=True)[:total - sum(cores.values())]:
+        cores[name] += 1
+    return cores
+
+def build_feature_matrix(df, path):
+    """Write every column the trainers need to a read-only memory-mapped matrix.
+    
+    The matrix is column-major, so a DataFrame over it is a zero-copy view
+    and every trainer process maps the same pages instead of unpickling its
+    own copy of the features.
+    """
+    columns = list(dict.fromkeys(FAILURE_FEATURES + YIELD_FEATURES + ANOMALY_FEATURES + ['is_failure']))
+    matrix = np.lib.format.open_memmap(
+        path, mode='w+', dtype=np.float64, shape=(len(df), len(columns)), fortran_order=True
+    )
+    for i, col in enumerate(columns):
+        matrix[:, i] = df[col].to_numpy(dtype=np.float64)
+    matrix.flush()
+    del matrix
+    return columns
+
+def open_feature_matrix(path, columns):
+    """Map the feature matrix read-only and wrap it in a DataFrame without copying."""
+    matrix = np.load(path, mmap_mode='r')
+    df = pd.DataFrame(matrix, columns=columns, copy=False)
+    df['is_failure'] = df['is_failure'].astype(int)
+    return df
+
+TRAINERS = {
+    'failure': train_failure_prediction_model,
+    'yield': train_yield_prediction_model,
+    'anomaly': train_anomaly_on_frame,
+}
+
+def run_trainer(name, matrix_path, columns, cores, model_dir, options=None):
+    """Train one model on the shared feature matrix within `cores` threads, saving it to `model_dir`."""
+    started = time.perf_counter()
+    df = open_feature_matrix(matrix_path, columns)
+    options = dict(options or {})
+    if name != 'anomaly':
+        options['n_jobs'] = cores
+    with threadpool_limits(limits=cores):
+        TRAINERS[name](df, model_dir, **options)
+    return name, time.perf_counter() - started
+
+def train_all(df, model_dir, cores=None, trainer_options=None):
+    """Train the three models concurrently on a shared core budget, saving them to `model_dir`.
+    
+    `trainer_options` maps a trainer name ('failure', 'yield', 'anomaly') to
+    extra keyword arguments for it. Returns the wall time of each trainer.
+    With a budget of one core the trainers run one after another in this
+    process.
+    """
+    trainer_options = trainer_options or {}
+    cores = cores or os.cpu_count() or 1
+    budget = allocate_cores(cores, TRAINER_WEIGHTS)
+    timings = {}
+    
+    with tempfile.TemporaryDirectory(prefix='features-') as tmp:
+        matrix_path = os.path.join(tmp, 'features.npy')
+        started = time.perf_counter()
+        columns = build_feature_matrix(df, matrix_path)
+        timings['feature_matrix'] = time.perf_counter() - started
+        
+        if cores == 1:
+            for name in TRAINERS:
+                _, timings[f"train_{name}"] = run_trainer(
+                    name, matrix_path, columns, 1, model_dir, trainer_options.get(name)
+                )
+        else:
+            print(f"⚙️  Training on {cores} cores: " + ", ".join(f"{n}={c}" for n, c in budget.items()))
+            with ProcessPoolExecutor(max_workers=min(len(TRAINERS), cores)) as pool:
+                futures = [
+                    pool.submit(
+                        run_trainer, name, matrix_path, columns, budget[name], model_dir,
+                        trainer_options.get(name)
+                    )
+                    for name in TRAINERS
+                ]
+                for future in futures:
+                    name, seconds = future.result()
+                    timings[f"train_{name}"] = seconds
+    
+    return timings, budget
+
+def export_bundle(model_dir, base_dir=None):
+    """Collect the trained models in `model_dir` into `models.bundle`, with the fused pipeline.
+    
+    Each trainer saves its model, scaler and feature list as `.pkl` files;
+    they are bundled and then removed. Artifacts no trainer produced in this
+    run are carried over from the models in `base_dir`. The pipeline (see
+    backend/pipeline.py) is built whenever all three models are present, so
+    the backend scores all of them from one feature matrix. Returns the
+    bundled artifacts.
+    """
+    fresh = [name for name in MODEL_ARTIFACTS if os.path.exists(os.path.join(model_dir, f"{name}.pkl"))]
+    carried = [name for name in MODEL_ARTIFACTS if name not in fresh]
+    artifacts = {}
+    if base_dir and carried:
+        try:
+            artifacts = load_model_dir(base_dir, carried)
+        except FileNotFoundError:
+            pass
+    for name in fresh:
+        artifacts[name] = joblib.load(os.path.join(model_dir, f"{name}.pkl"))
+    if all(name in artifacts for name in MODEL_ARTIFACTS):
+        artifacts['pipeline'] = build_pipeline(artifacts)
+    
+    bundle_path = os.path.join(model_dir, BUNDLE_FILE)
+    write_bundle(artifacts, bundle_path)
+    print(f"📦 Model bundle saved ({os.path.getsize(bundle_path) / 1024 / 1024:.1f} MB, "
+          f"{len(artifacts)} artifacts)")
+    for name in fresh:
+        os.remove(os.path.join(model_dir, f"{name}.pkl"))
+    return artifacts
+
+def collect_metrics(model_dir, base_metrics=None):
+    """Gather the metrics files the trainers wrote to `model_dir`, over `base_metrics`."""
+    metrics = dict(base_metrics or {})
+    for name in TRAINERS:
+        path = os.path.join(model_dir, f"{name}_metrics.json")
+        if os.path.exists(path):
+            with open(path) as f:
+                metrics[name] = json.load(f)
+            os.remove(path)
+    return metrics
+
+def publish_version(registry, model_dir, artifacts, parent, details, version=None, activate=True):
+    """Publish `model_dir` as a new registry version, activating it unless told not to.
+    
+    The manifest records the training data hash, the features, estimator and
+    metrics of each model, plus `details` of the run. Models carried over
+    from `parent` keep the metrics recorded there.
+    """
+    source = resolve_source(DATA_PATH)
+    manifest = {
+        'parent': parent,
+        'data': {'source': os.path.abspath(source), 'hash': data_fingerprint(source)},
+        'features': {
+            name: list(artifacts[f"{name}_features"]) for name in TRAINERS if f"{name}_features" in artifacts
+        },
+        'estimators': {
+            name: type(artifacts[f"{name}_model"]).__name__ for name in TRAINERS if f"{name}_model" in artifacts
+        },
+        'metrics': collect_metrics(model_dir, registry.manifest(parent)['metrics'] if parent else None),
+        **details,
+    }
+    version = registry.publish(model_dir, manifest, version)
+    print(f"📁 Published model version {version} in {registry.root}")
+    if activate:
+        registry.activate(version)
+        print(f"✅ Version {version} is now active")
+    return version
+
+def print_timings(timings):
+    print("\n⏱️  Stage timings:")
+    for stage, seconds in timings.items():
+        print(f"   {stage:<16} {seconds:8.2f}s")
+
+def main(cores=None, trainer_options=None, version=None, activate=True, registry_dir=REGISTRY_DIR):
+    """Main training pipeline; publishes a new version in the registry at `registry_dir`."""
     print("="*80)
     print("🏭 SMART FACTORY ANALYTICS - ML MODEL TRAINING")
     print("="*80)
     print(f"⏰ Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
     
-    # Load and preprocess
-    df = load_and_preprocess_data()
-    df = feature_engineering(df)
-    
-    # Train all models
-    failure_model, failure_scaler, failure_features = train_failure_prediction_model(df)
-    yield_model, yield_scaler, yield_features = train_yield_prediction_model(df)
-    anomaly_model, anomaly_scaler, anomaly_features = train_anomaly_detection_model(df)
+    started = time.perf_counter()
+    timings = {}
+    
+    # The trainers write into a staging folder that becomes the new version
+    registry = ModelRegistry(registry_dir)
+    model_dir = registry.staging_dir()
+    try:
+        # Load and preprocess
+        stage_start = time.perf_counter()
+        df = load_and_preprocess_data()
+        timings['load'] = time.perf_counter() - stage_start
+        
+        stage_start = time.perf_counter()
+        print("🔧 Engineering features...")
+        df = feature_engineering(df)
+        print(f"✅ Created {df.shape[1]} features")
+        timings['features'] = time.perf_counter() - stage_start
+        
+        # Train all models
+        stage_start = time.perf_counter()
+        train_timings, budget = train_all(df, model_dir, cores, trainer_options)
+        timings.update(train_timings)
+        timings['train'] = time.perf_counter() - stage_start
+        
+        # Bundle the models, with the fused pipeline the backend scores with
+        stage_start = time.perf_counter()
+        artifacts = export_bundle(model_dir)
+        timings['export'] = time.perf_counter() - stage_start
+        timings['total'] = time.perf_counter() - started
+        
+        version = publish_version(registry, model_dir, artifacts, None, {
+            'trained': list(TRAINERS),
+            'samples': len(df),
+            'cores': budget,
+            'timings': {stage: round(seconds, 3) for stage, seconds in timings.items()},
+        }, version, activate)
+    except BaseException:
+        registry.discard(model_dir)
+        raise
     
     print("\n" + "="*80)
     print("🎉 ALL MODELS TRAINED SUCCESSFULLY!")
     print("="*80)
-    print(f"📁 Models saved in: {MODEL_DIR}")
+    print_timings(timings)
+    print(f"📁 Model version: {version} (manifest in {registry.version_dir(version)})")
     print(f"⏰ Completed at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("\n🎯 Next steps:")
     print("   1. Run: python generate_reports.py (to generate Power BI reports)")
     print("   2. Start backend: cd backend && uvicorn main:app --reload")
     print("   3. Start frontend: cd frontend && npm run dev")
     print("="*80)
+    return version
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Train the Smart Factory ML models.")
+    parser.add_argument('--data', default=DATA_PATH, help='Sensor CSV (or dataset) to train on')
+    parser.add_argument('--model-dir', default=REGISTRY_DIR, help='Model registry to publish the new version in')
+    parser.add_argument('--version', default=None, help='Id for the new model version (default: timestamp-based)')
+    parser.add_argument('--no-activate', action='store_true',
+                        help='Publish the new version without making it the active one')
+    parser.add_argument('--cores', type=int, default=None,
+                        help='Core budget shared by the trainers (default: all cores)')
+    parser.add_argument('--cluster-eval', choices=EVAL_MODES, default='sampled',
+                        help='Cluster quality scores: sampled silhouette, exact (O(n²)) or linear-time only')
+    parser.add_argument('--silhouette-sample-size', type=int, default=SILHOUETTE_SAMPLE_SIZE,
+                        help='Rows in the stratified silhouette sample')
+    parser.add_argument('--estimator', choices=ESTIMATORS, default='random_forest',
+                        help='Estimator for the failure and yield models')
+    parser.add_argument('--anomaly-trainer', choices=['kmeans', 'minibatch'], default='kmeans',
+                        help='Full-batch KMeans or streaming Mini-Batch K-Means (partial_fit over chunks)')
+    parser.add_argument('--stream-anomaly', action='store_true',
+                        help='Only train the anomaly model, streaming from storage; refines a saved '
+                             'Mini-Batch K-Means model instead of starting over')
+    parser.add_argument('--since', type=pd.Timestamp, default=None,
+                        help='With --stream-anomaly: only use readings from this time on')
+    return parser.parse_args()
 
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    DATA_PATH = args.data
+    os.makedirs(args.model_dir, exist_ok=True)
+    if args.stream_anomaly:
+        stream_anomaly_model(args.since, args.cluster_eval, args.silhouette_sample_size,
+                             args.version, not args.no_activate, args.model_dir)
+    else:
+        main(args.cores, {
+            'failure': {'estimator': args.estimator},
+            'yield': {'estimator': args.estimator},
+            'anomaly': {
+                'trainer': args.anomaly_trainer,
+                'cluster_eval': args.cluster_eval,
+                'sample_size': args.silhouette_sample_size
+            }
+        }, args.version, not args.no_activate, args.model_dir)
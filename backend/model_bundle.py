@@ -0,0 +1,136 @@
+"""
+Smart Factory Analytics - Model Bundle
+Stores every trained artifact in one file, `models.bundle`, instead of a
+pickle per model, scaler and feature list. Each artifact is pickled with its
+NumPy arrays kept out-of-band; the arrays are written raw and, on load, read
+straight from a read-only memory map. Processes that load the same bundle
+therefore share those pages, and artifacts can be loaded one at a time.
+
+Layout: MAGIC, a uint32 format version and the uint64 offset of the JSON
+index, then the 64-byte aligned pickles and array buffers, then the index
+with the offset and length of each.
+"""
+
+import json
+import mmap
+import os
+import pickle
+import struct
+import time
+from datetime import datetime
+
+BUNDLE_FILE = 'models.bundle'
+BUNDLE_FORMAT = 1
+MAGIC = b'SFABNDL\0'
+HEADER = struct.Struct('<8sIQ')
+ALIGNMENT = 64
+
+# Artifacts written by train_models.py; before the bundle each was its own `<name>.pkl`
+MODEL_ARTIFACTS = [
+    'failure_model', 'failure_scaler', 'failure_features',
+    'yield_model', 'yield_scaler', 'yield_features',
+    'anomaly_model', 'anomaly_scaler', 'anomaly_features',
+]
+
+
+def _padding(offset):
+    return -offset % ALIGNMENT
+
+
+def write_bundle(artifacts, path):
+    """Write a dict of named artifacts to `path` as a model bundle."""
+    index = {'format': BUNDLE_FORMAT, 'created_at': datetime.now().isoformat(), 'artifacts': {}}
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(b'\0' * (HEADER.size + _padding(HEADER.size)))
+
+        def add(data):
+            span = [f.tell(), len(data)]
+            f.write(data)
+            f.write(b'\0' * _padding(len(data)))
+            return span
+
+        for name, artifact in artifacts.items():
+            buffers = []
+            data = pickle.dumps(artifact, protocol=5, buffer_callback=buffers.append)
+            index['artifacts'][name] = {
+                'pickle': add(data),
+                'buffers': [add(buffer.raw()) for buffer in buffers],
+            }
+
+        index_offset = f.tell()
+        f.write(json.dumps(index).encode())
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, BUNDLE_FORMAT, index_offset))
+    os.replace(tmp_path, path)
+
+
+def _read_index(f, path):
+    magic, version, index_offset = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a model bundle")
+    if version != BUNDLE_FORMAT:
+        raise ValueError(f"Unsupported model bundle format {version} in {path} (expected {BUNDLE_FORMAT})")
+    f.seek(index_offset)
+    return json.loads(f.read())
+
+
+def read_bundle(path, names=None, timings=None, writable=False):
+    """Load artifacts from the bundle at `path` into a dict.
+
+    `names` limits loading to those artifacts (default: all of them). If
+    `timings` is a dict, the seconds spent on each artifact are stored in it.
+    Arrays are read-only views of the memory-mapped file unless `writable`
+    is set, which reads the file into memory instead (e.g. to keep training
+    a loaded model).
+    """
+    started = time.perf_counter()
+    with open(path, 'rb') as f:
+        index = _read_index(f, path)
+        f.seek(0)
+        if writable:
+            view = memoryview(bytearray(f.read()))
+        else:
+            view = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+    if timings is not None:
+        timings['open'] = time.perf_counter() - started
+
+    artifacts = {}
+    for name, entry in index['artifacts'].items():
+        if names is not None and name not in names:
+            continue
+        t0 = time.perf_counter()
+        start, length = entry['pickle']
+        buffers = [view[offset:offset + size] for offset, size in entry['buffers']]
+        artifacts[name] = pickle.loads(view[start:start + length], buffers=buffers)
+        if timings is not None:
+            timings[name] = time.perf_counter() - t0
+    return artifacts
+
+
+def bundle_artifacts(path):
+    """Names of the artifacts stored in the bundle at `path`."""
+    with open(path, 'rb') as f:
+        return list(_read_index(f, path)['artifacts'])
+
+
+def load_model_dir(model_dir, names=None, timings=None, writable=False):
+    """Load artifacts from `model_dir`'s bundle, or from the legacy pickles.
+
+    Model directories trained before the bundle existed hold one joblib
+    pickle per artifact; those are read file by file.
+    """
+    path = os.path.join(model_dir, BUNDLE_FILE)
+    if os.path.exists(path):
+        return read_bundle(path, names, timings, writable)
+
+    import joblib
+    artifacts = {}
+    for name in MODEL_ARTIFACTS:
+        if names is not None and name not in names:
+            continue
+        t0 = time.perf_counter()
+        artifacts[name] = joblib.load(os.path.join(model_dir, f"{name}.pkl"))
+        if timings is not None:
+            timings[name] = time.perf_counter() - t0
+    return artifacts
@@ -0,0 +1,154 @@
+"""
+Smart Factory Analytics - Model Registry
+Every training run is published as an immutable version folder holding its
+model bundle and a `manifest.json` (features, estimators, training data
+hash, metrics, timings). A `CURRENT` file names the active version and is
+replaced atomically, so activating a version, or rolling back to an older
+one, is a single rename with no retraining.
+
+Layout under the registry root (backend/ml/ by default):
+
+    CURRENT
+    versions/<version>/models.bundle
+    versions/<version>/manifest.json
+"""
+
+import hashlib
+import json
+import os
+import secrets
+import shutil
+import stat
+from datetime import datetime
+
+from model_bundle import BUNDLE_FILE
+
+MANIFEST_FILE = 'manifest.json'
+CURRENT_FILE = 'CURRENT'
+VERSIONS_DIR = 'versions'
+
+
+class UnknownVersion(Exception):
+    """Raised for a version that is not in the registry."""
+
+    def __init__(self, version):
+        super().__init__(f"Unknown model version '{version}'")
+        self.version = version
+
+
+def new_version_id():
+    """Time-ordered, unique version id, e.g. `20240105-142233-9f3a1c`."""
+    return f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{secrets.token_hex(3)}"
+
+
+def data_fingerprint(path):
+    """BLAKE2b hash of a data file, or of every file in a dataset directory."""
+    digest = hashlib.blake2b(digest_size=16)
+    if os.path.isdir(path):
+        files = sorted(
+            os.path.relpath(os.path.join(root, name), path)
+            for root, _, names in os.walk(path) for name in names
+        )
+    else:
+        files = [None]
+    for name in files:
+        file_path = path if name is None else os.path.join(path, name)
+        if name is not None:
+            digest.update(name.encode())
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+class ModelRegistry:
+    """Version folders and the active-version pointer under `root`."""
+
+    def __init__(self, root):
+        self.root = root
+        self.versions_dir = os.path.join(root, VERSIONS_DIR)
+
+    def version_dir(self, version):
+        return os.path.join(self.versions_dir, version)
+
+    def exists(self, version):
+        # Version ids are plain folder names; anything path-like is not a version
+        if not version or version.startswith('.') or os.path.basename(version) != version:
+            return False
+        return os.path.exists(os.path.join(self.version_dir(version), MANIFEST_FILE))
+
+    def current(self):
+        """The active version id, or None if no version has been activated."""
+        try:
+            with open(os.path.join(self.root, CURRENT_FILE)) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def current_dir(self):
+        """Directory to load models from: the active version, else `root` itself.
+
+        Model directories from before the registry keep their bundle (or
+        pickles) directly in `root`.
+        """
+        version = self.current()
+        return self.version_dir(version) if version else self.root
+
+    def manifest(self, version):
+        if not self.exists(version):
+            raise UnknownVersion(version)
+        with open(os.path.join(self.version_dir(version), MANIFEST_FILE)) as f:
+            return json.load(f)
+
+    def versions(self):
+        """Manifests of every published version, oldest first."""
+        if not os.path.isdir(self.versions_dir):
+            return []
+        manifests = [self.manifest(version) for version in os.listdir(self.versions_dir) if self.exists(version)]
+        return sorted(manifests, key=lambda manifest: manifest['created_at'])
+
+    def staging_dir(self):
+        """A new empty directory on the registry's filesystem to train into."""
+        path = os.path.join(self.root, f".staging-{new_version_id()}")
+        os.makedirs(path)
+        return path
+
+    def publish(self, staging_dir, manifest, version=None):
+        """Turn `staging_dir` into a new, read-only version folder and return its id.
+
+        `staging_dir` must hold the model bundle. The manifest is written
+        next to it with `version`, `created_at` and bundle details filled in.
+        """
+        version = version or new_version_id()
+        if os.path.exists(self.version_dir(version)):
+            raise ValueError(f"Model version '{version}' already exists")
+        bundle_path = os.path.join(staging_dir, BUNDLE_FILE)
+        manifest = {
+            'version': version,
+            'created_at': datetime.now().isoformat(),
+            **manifest,
+            'bundle': {'file': BUNDLE_FILE, 'bytes': os.path.getsize(bundle_path)},
+        }
+        with open(os.path.join(staging_dir, MANIFEST_FILE), 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+        read_only = stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH
+        for name in os.listdir(staging_dir):
+            os.chmod(os.path.join(staging_dir, name), read_only)
+        os.makedirs(self.versions_dir, exist_ok=True)
+        os.rename(staging_dir, self.version_dir(version))
+        return version
+
+    def discard(self, staging_dir):
+        shutil.rmtree(staging_dir, ignore_errors=True)
+
+    def activate(self, version):
+        """Atomically point `CURRENT` at `version`; returns the previous version."""
+        if not self.exists(version):
+            raise UnknownVersion(version)
+        previous = self.current()
+        tmp_path = os.path.join(self.root, f".{CURRENT_FILE}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w') as f:
+            f.write(version + '\n')
+        os.replace(tmp_path, os.path.join(self.root, CURRENT_FILE))
+        return previous
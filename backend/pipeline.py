@@ -0,0 +1,139 @@
+"""
+Smart Factory Analytics - Fused Inference Pipeline
+One artifact that scores all three models from a single feature matrix.
+Feature selection becomes column indices into that matrix, the
+StandardScaler of each Random Forest is folded into its split thresholds,
+and the other estimators keep their scaling as a plain (x - mean) / scale.
+"""
+
+import numpy as np
+
+from forest import LEAF, FlatForest, flatten_forest
+
+SIGN_BIT = np.uint64(1 << 63)
+
+
+def _ordered_keys(values):
+    """Map float64 values to uint64 keys with the same ordering."""
+    bits = values.view(np.uint64)
+    return np.where(bits & SIGN_BIT, ~bits, bits | SIGN_BIT)
+
+
+def _from_keys(keys):
+    bits = np.where(keys & SIGN_BIT, keys ^ SIGN_BIT, ~keys)
+    return bits.view(np.float64)
+
+
+def fold_thresholds(threshold, mean, scale):
+    """Raw-space thresholds `x*` with `x <= x*` iff `float32((x - mean) / scale) <= threshold`.
+
+    That is the comparison a tree makes on standardized input (scikit-learn
+    casts its input to float32). The map from `x` to the standardized
+    float32 is monotonic, so the largest passing float64 is found exactly by
+    bisecting over the ordered bit patterns, for every node at once.
+    """
+    def passes(x):
+        with np.errstate(over='ignore', invalid='ignore'):
+            return ((x - mean) / scale).astype(np.float32) <= threshold
+
+    lo = _ordered_keys(np.full(len(threshold), -np.finfo(np.float64).max))
+    hi = _ordered_keys(np.full(len(threshold), np.finfo(np.float64).max))
+    # Invariant: passes(lo) and not passes(hi)
+    while True:
+        open_ = hi - lo > 1
+        if not open_.any():
+            break
+        mid = lo + (hi - lo) // np.uint64(2)
+        ok = passes(_from_keys(mid))
+        lo = np.where(open_ & ok, mid, lo)
+        hi = np.where(open_ & ~ok, mid, hi)
+    return _from_keys(lo)
+
+
+def _is_forest(model):
+    return hasattr(model, 'estimators_') and hasattr(model.estimators_[0], 'tree_')
+
+
+def _fold_forest(model, scaler, column_index):
+    """Flatten `model` with its splits moved from scaled to raw feature space."""
+    arrays = flatten_forest(model)
+    # flatten_forest keeps float32 thresholds; re-read the exact float64 ones
+    threshold = np.concatenate([np.where(e.tree_.children_left == -1, 0.0, e.tree_.threshold)
+                                for e in model.estimators_])
+    split = arrays['feature'] != LEAF
+    feature = arrays['feature'].astype(np.intp)
+
+    raw_threshold = np.zeros(len(threshold))
+    raw_threshold[split] = fold_thresholds(
+        threshold[split], scaler.mean_[feature[split]], scaler.scale_[feature[split]]
+    )
+    arrays['threshold'] = raw_threshold
+    arrays['feature'] = np.where(split, column_index[np.maximum(feature, 0)], LEAF).astype(np.int16)
+    return arrays
+
+
+def build_pipeline(models):
+    """Build the fused pipeline artifact from a dict of loaded models.
+
+    `models` holds the `<name>_model`, `<name>_scaler` and `<name>_features`
+    entries written by train_models.py. Returns a dict of plain arrays and
+    estimators that `FusedPipeline` can score with.
+    """
+    columns = list(dict.fromkeys(
+        models['failure_features'] + models['yield_features'] + models['anomaly_features']
+    ))
+    artifact = {'columns': columns}
+    for name in ['failure', 'yield', 'anomaly']:
+        model, scaler = models[f'{name}_model'], models[f'{name}_scaler']
+        column_index = np.array([columns.index(c) for c in models[f'{name}_features']])
+        if name != 'anomaly' and _is_forest(model):
+            artifact[name] = {'kind': 'forest', 'forest': _fold_forest(model, scaler, column_index)}
+        else:
+            artifact[name] = {
+                'kind': 'estimator',
+                'columns': column_index,
+                'mean': scaler.mean_,
+                'scale': scaler.scale_,
+                'estimator': model,
+            }
+    return artifact
+
+
+class FusedPipeline:
+    """Score the latest feature rows with all three models from one matrix.
+
+    Every split goes the same way as in the unfused scaler and model, so
+    clusters match exactly and failure probabilities and yields to within
+    floating-point rounding (1e-12).
+    """
+
+    def __init__(self, artifact):
+        self.columns = artifact['columns']
+        self.stages = {}
+        for name in ['failure', 'yield', 'anomaly']:
+            stage = dict(artifact[name])
+            if stage['kind'] == 'forest':
+                stage['forest'] = FlatForest(stage['forest'])
+            self.stages[name] = stage
+
+    def feature_matrix(self, latest):
+        """The shared C-contiguous float64 matrix of every model input column."""
+        return np.ascontiguousarray(latest[self.columns].to_numpy(dtype=np.float64))
+
+    def _run(self, name, X, method):
+        stage = self.stages[name]
+        if stage['kind'] == 'forest':
+            return getattr(stage['forest'], method)(X)
+        # Same operations as StandardScaler.transform
+        X_scaled = X[:, stage['columns']]
+        X_scaled -= stage['mean']
+        X_scaled /= stage['scale']
+        return getattr(stage['estimator'], method)(X_scaled)
+
+    def predict(self, latest):
+        """Return `(failure_probability, predicted_yield, cluster)`."""
+        X = self.feature_matrix(latest)
+        failure_probability = self._run('failure', X, 'predict_proba')[:, 1]
+        predicted_yield = self._run('yield', X, 'predict')
+        cluster = self._run('anomaly', X, 'predict')
+        return failure_probability, predicted_yield, cluster
@@ -0,0 +1,379 @@
+"""
+Smart Factory Analytics - Sensor Storage
+Data-access layer for the sensor history. The primary format is a Parquet
+dataset partitioned by machine_id and day; CSV is kept as an import/export
+format and as a fallback when no dataset exists yet.
+
+Usage:
+    python backend/sensor_storage.py import data/factory_sensors.csv
+    python backend/sensor_storage.py export data/factory_sensors.csv
+"""
+
+import argparse
+import hashlib
+import os
+import shutil
+import uuid
+from urllib.parse import unquote
+
+import pandas as pd
+
+PARTITION_COLUMNS = ['machine_id', 'date']
+
+# Sensor value columns, stored as float64 (and is_failure as int64) whatever
+# dtypes the writer holds them in
+VALUE_COLUMNS = ['temperature', 'vibration', 'pressure', 'speed', 'runtime_hours']
+
+# Timestamps in the CSV, as the simulator writes them
+CSV_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Filtered CSV reads parse this many rows at a time, so only matching rows are held
+CSV_CHUNK_ROWS = 1_000_000
+
+# Touched after every write so readers can detect changes with a single stat()
+MARKER_FILE = '_last_write'
+
+# Written when a dataset is created; appends and compaction keep it
+DATASET_ID_FILE = '_dataset_id'
+
+# An append that leaves a partition with more data files than this merges them into one
+COMPACT_FILES = 16
+
+
+def dataset_path_for(csv_path):
+    """Return the dataset directory that sits next to a CSV path."""
+    root, ext = os.path.splitext(csv_path)
+    return root if ext == '.csv' else csv_path
+
+
+def is_dataset(source):
+    return os.path.isdir(source)
+
+
+def resolve_source(path):
+    """Prefer the Parquet dataset for `path`, falling back to the CSV file."""
+    dataset = dataset_path_for(path)
+    if os.path.isdir(dataset):
+        return dataset
+    return path
+
+
+def source_signature(source):
+    """Return `(mtime_ns, size)` identifying the current contents of `source`."""
+    if is_dataset(source):
+        stat = os.stat(os.path.join(source, MARKER_FILE))
+    else:
+        stat = os.stat(source)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _partition_schema():
+    import pyarrow as pa
+    return pa.schema([('machine_id', pa.string()), ('date', pa.string())])
+
+
+def _file_schema():
+    """Schema of the data files: the sensor columns without the partition keys."""
+    import pyarrow as pa
+    return pa.schema([
+        ('timestamp', pa.timestamp('us')),
+        *[(col, pa.float64()) for col in VALUE_COLUMNS],
+        ('is_failure', pa.int64()),
+    ])
+
+
+def _partitioning():
+    import pyarrow.dataset as ds
+    return ds.partitioning(_partition_schema(), flavor='hive')
+
+
+def _read_dataset(source, columns, start, end, machine_ids):
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    # An explicit schema, so files written with narrower types are cast rather than inferred from
+    schema = pa.schema([*_partition_schema(), *_file_schema()])
+    dataset = ds.dataset(source, format='parquet', partitioning=_partitioning(), schema=schema)
+    ts_type = dataset.schema.field('timestamp').type
+
+    # Day partitions prune whole files; the timestamp filter trims the edges
+    conditions = []
+    if start is not None:
+        start = pd.Timestamp(start)
+        conditions.append(ds.field('date') >= start.strftime('%Y-%m-%d'))
+        conditions.append(ds.field('timestamp') >= pa.scalar(start.to_pydatetime(), type=ts_type))
+    if end is not None:
+        end = pd.Timestamp(end)
+        conditions.append(ds.field('date') <= end.strftime('%Y-%m-%d'))
+        conditions.append(ds.field('timestamp') < pa.scalar(end.to_pydatetime(), type=ts_type))
+    if machine_ids is not None:
+        conditions.append(ds.field('machine_id').isin([str(m) for m in machine_ids]))
+
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+
+    # Keep the CSV column order, with the machine_id partition key first
+    names = ['machine_id', *(f for f in dataset.schema.names if f not in PARTITION_COLUMNS)]
+    table = dataset.to_table(columns=columns or names, filter=expression)
+    return table.to_pandas()
+
+
+def _read_csv(source, columns, start, end, machine_ids):
+    usecols = None
+    if columns is not None:
+        # Filter columns must be parsed even if they are not returned
+        usecols = list(dict.fromkeys([*columns, *(['timestamp'] if start is not None or end is not None else []),
+                                      *(['machine_id'] if machine_ids is not None else [])]))
+
+    def select(df):
+        if 'timestamp' in df.columns:
+            # ISO8601 also accepts fractional seconds, which older appends may have written
+            df['timestamp'] = pd.to_datetime(df['timestamp'], format='ISO8601')
+        if start is not None:
+            df = df[df['timestamp'] >= pd.Timestamp(start)]
+        if end is not None:
+            df = df[df['timestamp'] < pd.Timestamp(end)]
+        if machine_ids is not None:
+            df = df[df['machine_id'].isin([str(m) for m in machine_ids])]
+        if columns is not None:
+            df = df[columns]
+        return df
+
+    if start is None and end is None and machine_ids is None:
+        df = select(pd.read_csv(source, usecols=usecols))
+    else:
+        parts = [select(chunk) for chunk in pd.read_csv(source, usecols=usecols, chunksize=CSV_CHUNK_ROWS)]
+        df = pd.concat(parts) if parts else select(pd.read_csv(source, usecols=usecols))
+    return df.reset_index(drop=True)
+
+
+def read_sensors(source, columns=None, start=None, end=None, machine_ids=None, dtype=None):
+    """Read sensor readings from a Parquet dataset or CSV file.
+
+    `columns` projects the result, `start`/`end` select the half-open
+    timestamp range [start, end) and `machine_ids` restricts machines. On a
+    dataset the filters are pushed down to partition and row-group level;
+    on CSV they are applied after parsing. Rows come back sorted by
+    machine_id and timestamp, with `timestamp` parsed as datetime64.
+    """
+    if is_dataset(source):
+        df = _read_dataset(source, columns, start, end, machine_ids)
+    else:
+        df = _read_csv(source, columns, start, end, machine_ids)
+
+    if 'machine_id' in df.columns and 'timestamp' in df.columns:
+        df = df.sort_values(['machine_id', 'timestamp'], kind='stable').reset_index(drop=True)
+    if dtype:
+        df = df.astype({col: t for col, t in dtype.items() if col in df.columns})
+    return df
+
+
+def list_machines(source):
+    """Return the sorted machine ids in `source` without loading the readings.
+
+    A dataset lists its machine_id partitions; a CSV is scanned in chunks,
+    parsing only the machine_id column.
+    """
+    if is_dataset(source):
+        prefix = 'machine_id='
+        return sorted(unquote(name[len(prefix):]) for name in os.listdir(source) if name.startswith(prefix))
+    machine_ids = set()
+    for chunk in pd.read_csv(source, usecols=['machine_id'], chunksize=CSV_CHUNK_ROWS):
+        machine_ids.update(chunk['machine_id'].astype(str).unique())
+    return sorted(machine_ids)
+
+
+def _dataset_files(dataset):
+    return sorted(
+        os.path.relpath(os.path.join(root, name), dataset)
+        for root, _, names in os.walk(dataset) for name in names
+        if name.endswith('.parquet') and not name.startswith('.')
+    )
+
+
+def _dataset_id(dataset):
+    try:
+        with open(os.path.join(dataset, DATASET_ID_FILE)) as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def _edge_hash(path, size, span=1 << 20):
+    """Hash of the first and last `span` bytes of the first `size` bytes of `path`."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        digest.update(f.read(min(span, size)))
+        f.seek(max(size - span, 0))
+        digest.update(f.read(size - max(size - span, 0)))
+    return digest.hexdigest()
+
+
+def history_checkpoint(source):
+    """Describe the readings in `source` now, for a later `only_appended()` check.
+
+    Appends add bytes to the end of a CSV, so a CSV is described by its size
+    and a hash of its first and last megabyte. A dataset is described by
+    its id, which only a rewrite changes (compaction merges files but keeps
+    the readings); one written before ids existed, by its data files.
+    """
+    if is_dataset(source):
+        dataset_id = _dataset_id(source)
+        return {'dataset': dataset_id} if dataset_id else {'files': _dataset_files(source)}
+    size = os.path.getsize(source)
+    return {'size': size, 'hash': _edge_hash(source, size)}
+
+
+def only_appended(source, checkpoint):
+    """Whether `source` still holds what it held at `checkpoint`, plus any appended readings.
+
+    False once the history has been rewritten, e.g. regenerated or
+    re-imported. Readings appended with timestamps older than the newest
+    ones already present are not detected.
+    """
+    if is_dataset(source):
+        if 'dataset' in checkpoint:
+            return checkpoint['dataset'] == _dataset_id(source)
+        return 'files' in checkpoint and set(checkpoint['files']) <= set(_dataset_files(source))
+    return ('size' in checkpoint and os.path.getsize(source) >= checkpoint['size']
+            and _edge_hash(source, checkpoint['size']) == checkpoint['hash'])
+
+
+def _with_date(df):
+    day = pd.Categorical(df['timestamp'].dt.floor('D'))
+    labels = day.categories.strftime('%Y-%m-%d')
+    return df.assign(
+        machine_id=df['machine_id'].astype(str),
+        date=pd.Categorical.from_codes(day.codes, categories=labels)
+    )
+
+
+def _touch_marker(dataset):
+    with open(os.path.join(dataset, MARKER_FILE), 'w') as f:
+        f.write(uuid.uuid4().hex)
+
+
+def _compact_partition(directory):
+    """Merge the data files of one partition directory into one, if it has more than COMPACT_FILES.
+
+    The merged file is written under a hidden name and renamed into place
+    before the files it replaces are removed, so a reader in another
+    process that lists the partition in between may see those readings
+    twice, or miss a file, and should read again.
+    """
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+
+    names = sorted(name for name in os.listdir(directory) if name.endswith('.parquet') and not name.startswith('.'))
+    if len(names) <= COMPACT_FILES:
+        return
+    paths = [os.path.join(directory, name) for name in names]
+    table = ds.dataset(paths, format='parquet', schema=_file_schema()).to_table().sort_by('timestamp')
+    staged = os.path.join(directory, f".compact-{uuid.uuid4().hex}.parquet")
+    pq.write_table(table, staged)
+    os.replace(staged, os.path.join(directory, f"part-{uuid.uuid4().hex}-0.parquet"))
+    for path in paths:
+        os.remove(path)
+
+
+def create_dataset(dataset, replace=True):
+    """Create `dataset` with a new dataset id, removing any existing one unless `replace=False`.
+
+    Writers that append to one dataset concurrently should create it first,
+    so they do not race to write its id.
+    """
+    if replace and os.path.isdir(dataset):
+        shutil.rmtree(dataset)
+    os.makedirs(dataset, exist_ok=True)
+    with open(os.path.join(dataset, DATASET_ID_FILE), 'w') as f:
+        f.write(uuid.uuid4().hex)
+
+
+def write_sensors(df, dataset, append=False):
+    """Write readings to a Parquet dataset partitioned by machine_id and day.
+
+    With `append=False` any existing dataset is replaced. Appends add new
+    files to the affected partitions and never rewrite existing readings;
+    a partition left with more than COMPACT_FILES files has them merged.
+    Values are stored as float64/int64 whatever dtypes `df` holds.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    if not append or _dataset_id(dataset) is None:
+        create_dataset(dataset, replace=not append)
+
+    # The day is written from its category codes rather than one string per row
+    schema = pa.schema([('machine_id', pa.string()), *_file_schema(), ('date', pa.dictionary(pa.int32(), pa.string()))])
+    table = pa.Table.from_pandas(_with_date(df), schema=schema, preserve_index=False)
+    written = []
+    pq.write_to_dataset(
+        table,
+        dataset,
+        partition_cols=PARTITION_COLUMNS,
+        basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+        existing_data_behavior='overwrite_or_ignore',
+        file_visitor=lambda written_file: written.append(written_file.path),
+    )
+    if append:
+        for directory in sorted({os.path.dirname(path) for path in written}):
+            _compact_partition(directory)
+    _touch_marker(dataset)
+
+
+def append_sensors(df, source):
+    """Append readings to `source`, whichever format it is stored in."""
+    if is_dataset(source):
+        write_sensors(df, source, append=True)
+    else:
+        df.to_csv(source, mode='a', header=False, index=False, date_format=CSV_DATE_FORMAT)
+
+
+def install_sensors(staged_path, path):
+    """Move a staged CSV (and its dataset, if any) over the history at `path`.
+
+    The CSV is replaced atomically. A staged dataset is swapped in with two
+    renames; the old dataset is deleted only after the new one is in place.
+    """
+    staged_dataset = dataset_path_for(staged_path)
+    dataset = dataset_path_for(path)
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    if os.path.isdir(staged_dataset):
+        retired = f"{dataset}.old-{uuid.uuid4().hex[:8]}"
+        if os.path.isdir(dataset):
+            os.rename(dataset, retired)
+        os.rename(staged_dataset, dataset)
+        shutil.rmtree(retired, ignore_errors=True)
+    os.replace(staged_path, path)
+
+
+def import_csv(csv_path, dataset=None):
+    """Convert a sensor CSV into a partitioned Parquet dataset."""
+    dataset = dataset or dataset_path_for(csv_path)
+    write_sensors(read_sensors(csv_path), dataset)
+    return dataset
+
+
+def export_csv(dataset, csv_path):
+    """Write a Parquet dataset back out as a single CSV file."""
+    df = read_sensors(dataset)
+    df.to_csv(csv_path, index=False, date_format=CSV_DATE_FORMAT)
+    return csv_path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import/export the sensor history.")
+    parser.add_argument('command', choices=['import', 'export'])
+    parser.add_argument('csv_path', help='CSV file to import from or export to')
+    parser.add_argument('--dataset', help='Dataset directory (default: CSV path without .csv)')
+    args = parser.parse_args()
+
+    dataset = args.dataset or dataset_path_for(args.csv_path)
+    if args.command == 'import':
+        import_csv(args.csv_path, dataset)
+        print(f"✅ Imported {args.csv_path} into {dataset}")
+    else:
+        export_csv(dataset, args.csv_path)
+        print(f"✅ Exported {dataset} to {args.csv_path}")
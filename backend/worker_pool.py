@@ -0,0 +1,67 @@
+"""
+Smart Factory Analytics - Worker Pool
+Runs blocking pandas/scikit-learn work off the asyncio event loop, with a
+bounded backlog so overload turns into fast 503s instead of a growing queue.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class PoolSaturated(Exception):
+    """Raised when the pool already has `workers + max_queue` tasks admitted."""
+
+    def __init__(self, retry_after):
+        super().__init__("Server busy, retry later")
+        self.retry_after = retry_after
+
+
+class WorkerPool:
+    """Thread pool with admission control for request handlers.
+
+    Up to `workers` tasks run at once and up to `max_queue` more wait for a
+    thread. Beyond that `run()` raises `PoolSaturated` immediately, carrying
+    the `retry_after` hint (seconds) for the Retry-After header.
+    """
+
+    def __init__(self, workers=4, max_queue=16, retry_after=1):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="inference")
+        self._admitted = 0
+        self._lock = threading.Lock()
+
+    @property
+    def capacity(self):
+        return self.workers + self.max_queue
+
+    def _admit(self):
+        with self._lock:
+            if self._admitted >= self.capacity:
+                raise PoolSaturated(self.retry_after)
+            self._admitted += 1
+
+    def _release(self, _future=None):
+        with self._lock:
+            self._admitted -= 1
+
+    async def run(self, fn, *args):
+        """Run `fn(*args)` on the pool and await its result."""
+        self._admit()
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._release()
+            raise
+        # Released when the task finishes, even if the awaiting request is cancelled
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def stats(self):
+        with self._lock:
+            return {"workers": self.workers, "max_queue": self.max_queue, "admitted": self._admitted}
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,81 @@
+"""
+Smart Factory Analytics - Cluster Quality Benchmark
+Shows how the anomaly model's quality scores scale with row count: the
+exact silhouette (O(n²), skipped above --exact-limit rows), the stratified
+sampled silhouette at several sample sizes, and the linear-time
+Davies-Bouldin and Calinski-Harabasz indices.
+
+Usage: python benchmarks/cluster_quality_benchmark.py [--rows 10000 100000 1000000 10000000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from sklearn.datasets import make_blobs
+from sklearn.metrics import calinski_harabasz_score, davies_bouldin_score, silhouette_score
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend', 'ml'))
+
+from cluster_quality import stratified_sample
+
+ROW_COUNTS = [10_000, 100_000, 1_000_000]
+SAMPLE_SIZES = [2_000, 10_000, 20_000]
+EXACT_LIMIT = 20_000
+NUM_FEATURES = 10  # Same width as the anomaly feature set
+NUM_CLUSTERS = 4
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    value = fn(*args)
+    return value, time.perf_counter() - t0
+
+
+def run(row_counts, exact_limit):
+    print("=" * 80)
+    print("🔍 CLUSTER QUALITY BENCHMARK")
+    print("=" * 80)
+
+    for n in row_counts:
+        # Unequal cluster sizes, like normal operation vs. rare critical states
+        weights = np.array([0.7, 0.2, 0.08, 0.02])
+        X, labels = make_blobs(n_samples=(weights * n).astype(int), n_features=NUM_FEATURES,
+                               cluster_std=2.5, random_state=42)
+        n = len(labels)
+        print(f"\n📊 {n:,} rows")
+
+        exact = None
+        if n <= exact_limit:
+            exact, seconds = timed(silhouette_score, X, labels)
+            print(f"   silhouette (exact)            {exact:8.4f}  {seconds:8.3f}s")
+        else:
+            print(f"   silhouette (exact)            skipped (O(n²) over {exact_limit:,} rows)")
+
+        for size in SAMPLE_SIZES:
+            if size >= n:
+                continue
+            t0 = time.perf_counter()
+            index = stratified_sample(labels, size)
+            score = silhouette_score(X[index], labels[index])
+            seconds = time.perf_counter() - t0
+            error = f"  Δ {score - exact:+.4f}" if exact is not None else ""
+            print(f"   silhouette (sample {size:>6,})   {score:8.4f}  {seconds:8.3f}s{error}")
+
+        score, seconds = timed(davies_bouldin_score, X, labels)
+        print(f"   davies-bouldin                {score:8.4f}  {seconds:8.3f}s")
+        score, seconds = timed(calinski_harabasz_score, X, labels)
+        print(f"   calinski-harabasz       {score:14,.1f}  {seconds:8.3f}s")
+
+    print("\n" + "=" * 80)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=ROW_COUNTS, help='Row counts to test')
+    parser.add_argument('--exact-limit', type=int, default=EXACT_LIMIT,
+                        help='Largest row count to compute the exact silhouette for')
+    args = parser.parse_args()
+    run(args.rows, args.exact_limit)
@@ -0,0 +1,106 @@
+"""
+Smart Factory Analytics - Cold Start Benchmark
+Cold start of the serverless entry point (api/index.py), each case in a
+fresh interpreter: an import-time profile of `import index` (the slowest
+top-level modules, from `python -X importtime`), then the time to import
+the app and answer the first `/health` and the first ML request, and which
+heavy libraries each of those had to load.
+
+Usage: python benchmarks/cold_start_benchmark.py [--top 15]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+API_DIR = os.path.join(ROOT_DIR, 'api')
+REPEATS = 3
+HEAVY_MODULES = ['numpy', 'pandas', 'scipy', 'sklearn', 'joblib']
+
+# Runs in a fresh interpreter so every import counts
+CLIENT = """
+import json, sys, time, warnings
+warnings.simplefilter('ignore')
+sys.path.insert(0, {api!r})
+started = time.perf_counter()
+import index
+imported = time.perf_counter() - started
+from fastapi.testclient import TestClient
+client = TestClient(index.app)
+t0 = time.perf_counter()
+status = client.get({path!r}).status_code
+first_request = time.perf_counter() - t0
+print(json.dumps({{
+    'import': imported, 'first_request': first_request, 'status': status,
+    'loaded': [name for name in {heavy!r} if name in sys.modules],
+}}))
+"""
+
+CASES = [
+    ('GET /health', '/health'),
+    ('GET /predict_failure', '/predict_failure'),
+]
+
+
+def import_profile(top):
+    """Seconds for `import index` and, per top-level package, its first (outermost) import."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import sys; sys.path.insert(0, {API_DIR!r}); import index'],
+        capture_output=True, text=True, check=True, env={**os.environ, 'WARMUP': 'off'}
+    )
+    total = 0.0
+    packages = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        seconds = int(cumulative) / 1e6
+        nested = name.startswith('  ')
+        name = name.strip()
+        if name == 'index':
+            total = seconds
+        elif nested and name != 'main':
+            # Cumulative times include nested imports, so a package's outermost import covers it
+            package = name.split('.')[0]
+            packages[package] = max(packages.get(package, 0.0), seconds)
+    return total, sorted(((s, n) for n, s in packages.items()), reverse=True)[:top]
+
+
+def first_request(path):
+    code = CLIENT.format(api=API_DIR, path=path, heavy=HEAVY_MODULES)
+    runs = [json.loads(subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                                      env={**os.environ, 'WARMUP': 'off'}).stdout.splitlines()[-1])
+            for _ in range(REPEATS)]
+    return min(runs, key=lambda run: run['import'] + run['first_request'])
+
+
+def run(top):
+    print("=" * 80)
+    print("❄️  COLD START BENCHMARK: api/index.py")
+    print("=" * 80)
+
+    total, modules = import_profile(top)
+    print(f"\n📊 Import profile of `import index`: {total:.2f}s (cumulative, nested imports included)")
+    for seconds, name in modules:
+        print(f"   {name:<40} {seconds * 1000:8.1f} ms  {seconds / total:6.1%}")
+
+    print(f"\n   {'case':<22} {'import s':>9} {'request s':>10} {'total s':>8}   heavy modules loaded")
+    for label, path in CASES:
+        result = first_request(path)
+        print(f"   {label:<22} {result['import']:9.2f} {result['first_request']:10.2f} "
+              f"{result['import'] + result['first_request']:8.2f}   "
+              f"{', '.join(result['loaded']) or '-'} (HTTP {result['status']})")
+
+    print("\n   /health never imports the ML stack; the first ML request pays for it once.")
+    print("   POST /warmup (or WARMUP=background) moves that cost off the request path.")
+    print("\n" + "=" * 80)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--top', type=int, default=15, help='Modules to list in the import profile')
+    args = parser.parse_args()
+    run(args.top)
@@ -0,0 +1,112 @@
+"""
+Smart Factory Analytics - Estimator Benchmark
+Side-by-side comparison of the Random Forest and Histogram Gradient Boosting
+backends for the failure and yield models: fit time, predict latency at
+batch sizes 1/12/10k, pickled size on disk and test accuracy.
+
+Usage: python benchmarks/estimator_benchmark.py [--data data/factory_sensors.csv]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import joblib
+import numpy as np
+from sklearn.metrics import accuracy_score, mean_absolute_error, r2_score, roc_auc_score
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend', 'ml'))
+
+import train_models
+from train_models import ESTIMATORS, FAILURE_FEATURES, YIELD_FEATURES, feature_engineering, make_estimator
+
+DATA_PATH = "data/factory_sensors.csv"
+BATCH_SIZES = [1, 12, 10_000]
+REPEATS = 20
+
+
+def yield_target(df):
+    """Same synthetic yield target as `train_yield_prediction_model`."""
+    return (
+        100 -
+        ((df['temperature'] - 70).abs() * 0.5) -
+        (df['vibration'] * 10) -
+        ((df['pressure'] - 100).abs() * 0.2) -
+        (df['is_failure'] * 50)
+    ).clip(0, 100)
+
+
+def predict_latency(predict, X, batch_size):
+    """Median seconds per call of `predict` on a batch of `batch_size` rows."""
+    rows = X[np.arange(batch_size) % len(X)]
+    repeats = REPEATS if batch_size < 1000 else 5
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        predict(rows)
+        times.append(time.perf_counter() - t0)
+    return float(np.median(times))
+
+
+def disk_size(model):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'model.pkl')
+        joblib.dump(model, path)
+        return os.path.getsize(path)
+
+
+def benchmark_task(task, X, y):
+    stratify = y if task == 'failure' else None
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=stratify)
+    scaler = StandardScaler()
+    X_train = scaler.fit_transform(X_train)
+    X_test = scaler.transform(X_test)
+
+    print(f"\n📊 {task} model ({len(X_train):,} training rows)")
+    header = "   estimator                 fit s   " + "".join(f"{f'predict@{b}':>14}" for b in BATCH_SIZES)
+    print(header + "      size      quality")
+
+    for estimator in ESTIMATORS:
+        model = make_estimator(task, estimator)
+        t0 = time.perf_counter()
+        model.fit(X_train, y_train)
+        fit_seconds = time.perf_counter() - t0
+
+        predict = model.predict_proba if task == 'failure' else model.predict
+        latencies = [predict_latency(predict, X_test, b) for b in BATCH_SIZES]
+
+        if task == 'failure':
+            quality = (f"acc {accuracy_score(y_test, model.predict(X_test)) * 100:.2f}%  "
+                       f"auc {roc_auc_score(y_test, predict(X_test)[:, 1]):.4f}")
+        else:
+            y_pred = model.predict(X_test)
+            quality = f"mae {mean_absolute_error(y_test, y_pred):.3f}  r2 {r2_score(y_test, y_pred):.4f}"
+
+        print(f"   {estimator:<24} {fit_seconds:6.2f}   "
+              + "".join(f"{seconds * 1000:>11.2f} ms" for seconds in latencies)
+              + f"  {disk_size(model) / 1024 / 1024:7.2f} MB   {quality}")
+
+
+def run(data_path):
+    print("=" * 80)
+    print("🌲 ESTIMATOR BENCHMARK: RANDOM FOREST vs HIST GRADIENT BOOSTING")
+    print("=" * 80)
+
+    train_models.DATA_PATH = data_path
+    df = feature_engineering(train_models.load_and_preprocess_data())
+
+    benchmark_task('failure', df[FAILURE_FEATURES], df['is_failure'])
+    benchmark_task('yield', df[YIELD_FEATURES], yield_target(df))
+
+    print("\n" + "=" * 80)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--data', default=DATA_PATH, help='Sensor CSV (or dataset) to benchmark on')
+    args = parser.parse_args()
+    run(args.data)
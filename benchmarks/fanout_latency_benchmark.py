@@ -0,0 +1,84 @@
+"""
+Smart Factory Analytics - Dashboard Fan-out Latency Benchmark
+Replays the dashboard's request pattern against a running API: each round
+ingests one reading (so the inference snapshot must be recomputed) and then
+fires every dashboard endpoint at once. Reports per-endpoint p50/p99 latency
+and how many requests were shed with 503.
+
+Start the API first, e.g. `cd backend && INFERENCE_WORKERS=4 uvicorn main:app`.
+
+Usage: python benchmarks/fanout_latency_benchmark.py [--url http://localhost:8000] [--rounds 50]
+"""
+
+import argparse
+import json
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+API_URL = "http://localhost:8000"
+ENDPOINTS = ['/health', '/statistics', '/predict_failure', '/predict_yield',
+             '/detect_anomaly', '/machine_health']
+
+
+def timed_request(url, data=None):
+    """Return `(status, seconds)` for one request."""
+    headers = {'Content-Type': 'application/json'} if data else {}
+    request = urllib.request.Request(url, data=data, headers=headers)
+    t0 = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    return status, time.perf_counter() - t0
+
+
+def make_reading(i):
+    return json.dumps([{
+        'machine_id': 'M001',
+        'timestamp': datetime.now().isoformat(),
+        'temperature': 72.0, 'vibration': 1.0, 'pressure': 100.0,
+        'speed': 1500.0, 'runtime_hours': 10000 + i / 12,
+    }]).encode()
+
+
+def run(url, rounds, fanout):
+    print("=" * 80)
+    print("🌐 DASHBOARD FAN-OUT LATENCY BENCHMARK")
+    print("=" * 80)
+
+    latencies = {path: [] for path in ENDPOINTS}
+    shed = {path: 0 for path in ENDPOINTS}
+    paths = ENDPOINTS * fanout
+
+    with ThreadPoolExecutor(max_workers=len(paths)) as pool:
+        for i in range(rounds):
+            timed_request(f"{url}/ingest", make_reading(i))
+            results = pool.map(lambda path: (path, *timed_request(url + path)), paths)
+            for path, status, seconds in results:
+                if status == 503:
+                    shed[path] += 1
+                else:
+                    latencies[path].append(seconds)
+
+    for path in ENDPOINTS:
+        values = np.array(latencies[path]) * 1000
+        p50, p99 = (np.percentile(values, [50, 99]) if len(values) else (float('nan'),) * 2)
+        print(f"   {path:<18} p50 {p50:8.1f} ms   p99 {p99:8.1f} ms   503s {shed[path]:>4}")
+
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--url', default=API_URL, help='Base URL of the running API')
+    parser.add_argument('--rounds', type=int, default=50, help='Dashboard refreshes to simulate')
+    parser.add_argument('--fanout', type=int, default=1, help='Concurrent dashboards per round')
+    args = parser.parse_args()
+    run(args.url.rstrip('/'), args.rounds, args.fanout)
@@ -0,0 +1,87 @@
+"""
+Smart Factory Analytics - Flattened Forest Benchmark
+Compares scikit-learn's `predict_proba`/`predict` with the flattened-array
+evaluator in backend/forest.py for the saved failure and yield forests:
+parity, per-call latency by batch size, artifact size and load time.
+
+Usage: python benchmarks/forest_inference_benchmark.py [--model-dir backend/ml/]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import joblib
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+
+from forest import FlatForest, save_forest
+from model_bundle import load_model_dir
+from model_registry import ModelRegistry
+
+MODEL_DIR = "backend/ml/"
+BATCH_SIZES = [1, 12, 100, 300, 1000]
+
+
+def median_ms(fn, X, repeats):
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn(X)
+        times.append(time.perf_counter() - t0)
+    return float(np.median(times)) * 1000
+
+
+def run(model_dir):
+    print("=" * 80)
+    print("🌲 FLATTENED FOREST INFERENCE BENCHMARK")
+    print("=" * 80)
+
+    rng = np.random.default_rng(42)
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in ['failure', 'yield']:
+            model = load_model_dir(ModelRegistry(model_dir).current_dir(), [f"{name}_model"])[f"{name}_model"]
+            if not hasattr(model, 'estimators_'):
+                print(f"\n⚠️  {name} model is not a Random Forest, skipping")
+                continue
+            pickle_path = os.path.join(tmp, f"{name}_model.pkl")
+            joblib.dump(model, pickle_path)
+            t0 = time.perf_counter()
+            joblib.load(pickle_path)
+            pickle_load = time.perf_counter() - t0
+
+            forest_path = os.path.join(tmp, f"{name}_forest.npz")
+            save_forest(model, forest_path)
+            t0 = time.perf_counter()
+            forest = FlatForest.load(forest_path)
+            forest_load = time.perf_counter() - t0
+
+            sklearn_fn = model.predict_proba if name == 'failure' else model.predict
+            forest_fn = forest.predict_proba if name == 'failure' else forest.predict
+
+            # Standardized inputs, like the scaled features the backend feeds in
+            X = rng.normal(size=(max(BATCH_SIZES), model.n_features_in_))
+            identical = np.array_equal(sklearn_fn(X), forest_fn(X))
+
+            print(f"\n📊 {name} forest ({len(model.estimators_)} trees)  identical output: {identical}")
+            print(f"   artifact  pickle {os.path.getsize(pickle_path) / 1024 / 1024:7.2f} MB "
+                  f"({pickle_load * 1000:6.1f} ms load)   "
+                  f"flat {os.path.getsize(forest_path) / 1024 / 1024:7.2f} MB ({forest_load * 1000:6.1f} ms load)")
+            for batch_size in BATCH_SIZES:
+                rows = X[:batch_size]
+                repeats = 30 if batch_size <= 100 else 10
+                sk = median_ms(sklearn_fn, rows, repeats)
+                flat = median_ms(forest_fn, rows, repeats)
+                print(f"   batch={batch_size:>5}   sklearn {sk:8.2f} ms   flat {flat:8.2f} ms   {sk / flat:6.1f}x")
+
+    print("\n" + "=" * 80)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--model-dir', default=MODEL_DIR, help='Directory with the trained models')
+    args = parser.parse_args()
+    run(args.model_dir)
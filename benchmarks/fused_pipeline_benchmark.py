@@ -0,0 +1,84 @@
+"""
+Smart Factory Analytics - Fused Pipeline Benchmark
+Compares the per-model path (select features, scale, predict, three times)
+with the fused pipeline from backend/pipeline.py: parity of all three
+outputs and per-request latency by number of machines scored.
+
+Usage: python benchmarks/fused_pipeline_benchmark.py [--model-dir backend/ml/]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+
+from inference import run_inference
+from model_bundle import MODEL_ARTIFACTS, load_model_dir
+from model_registry import ModelRegistry
+from pipeline import FusedPipeline, build_pipeline
+
+MODEL_DIR = "backend/ml/"
+MACHINE_COUNTS = [1, 12, 100, 1000]
+
+
+def latest_rows(models, n_rows, rng):
+    """Feature rows drawn around each scaler's mean, in the backend's mixed dtypes."""
+    data = {}
+    for name in ['failure', 'yield', 'anomaly']:
+        scaler = models[f'{name}_scaler']
+        for column, mean, scale in zip(models[f'{name}_features'], scaler.mean_, scaler.scale_):
+            data[column] = mean + scale * rng.normal(size=n_rows)
+    latest = pd.DataFrame(data)
+    # The backend's latest frame mixes float32 and float64 columns
+    for column in latest.columns[::2]:
+        latest[column] = latest[column].astype(np.float32)
+    return latest
+
+
+def median_ms(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return float(np.median(times)) * 1000
+
+
+def run(model_dir):
+    print("=" * 80)
+    print("🔗 FUSED INFERENCE PIPELINE BENCHMARK")
+    print("=" * 80)
+
+    models = load_model_dir(ModelRegistry(model_dir).current_dir(), MODEL_ARTIFACTS)
+    t0 = time.perf_counter()
+    pipeline = FusedPipeline(build_pipeline(models))
+    kinds = ', '.join(f"{name}={stage['kind']}" for name, stage in pipeline.stages.items())
+    print(f"\n📦 Pipeline built in {time.perf_counter() - t0:.2f}s "
+          f"({len(pipeline.columns)} shared columns; {kinds})")
+
+    rng = np.random.default_rng(42)
+    latest = latest_rows(models, max(MACHINE_COUNTS), rng)
+    identical = [np.array_equal(a, b) for a, b in zip(run_inference(latest, models), pipeline.predict(latest))]
+    print(f"   identical output (failure, yield, anomaly): {identical}\n")
+
+    for machines in MACHINE_COUNTS:
+        rows = latest.iloc[:machines]
+        repeats = 30 if machines <= 100 else 10
+        separate = median_ms(lambda: run_inference(rows, models), repeats)
+        fused = median_ms(lambda: pipeline.predict(rows), repeats)
+        print(f"   machines={machines:>5}   separate {separate:8.2f} ms   fused {fused:8.2f} ms   "
+              f"{separate / fused:5.1f}x")
+
+    print("\n" + "=" * 80)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--model-dir', default=MODEL_DIR, help='Directory with the trained models')
+    args = parser.parse_args()
+    run(args.model_dir)
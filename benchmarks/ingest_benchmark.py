@@ -0,0 +1,82 @@
+"""
+Smart Factory Analytics - Ingestion Throughput Benchmark
+Measures how many readings/second the `/ingest` path (bulk validation, store
+append and feature-state update) sustains at different batch sizes.
+
+Usage: python benchmarks/ingest_benchmark.py [--readings 20000]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+
+from data_store import SensorDataStore
+from ingest import parse_readings
+
+DATA_PATH = "data/factory_sensors.csv"
+BATCH_SIZES = [1, 10, 100, 1000]
+
+
+def make_ndjson(n, num_machines, start):
+    """Build an NDJSON body of `n` random readings."""
+    rng = np.random.default_rng(42)
+    lines = []
+    for i in range(n):
+        lines.append(json.dumps({
+            'machine_id': f'M{i % num_machines + 1:03d}',
+            'timestamp': (start + timedelta(seconds=i)).isoformat(),
+            'temperature': round(float(rng.normal(72, 3)), 2),
+            'vibration': round(float(rng.normal(1.0, 0.1)), 3),
+            'pressure': round(float(rng.normal(100, 5)), 2),
+            'speed': round(float(rng.normal(1500, 50)), 2),
+            'runtime_hours': round(10000 + i / 720, 2),
+        }).encode())
+    return lines
+
+
+def run(data_path, total_readings):
+    print("=" * 80)
+    print("📥 INGESTION THROUGHPUT BENCHMARK")
+    print("=" * 80)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for batch_size in BATCH_SIZES:
+            path = os.path.join(tmp, 'factory_sensors.csv')
+            shutil.copy(data_path, path)
+            store = SensorDataStore(path)
+            df = store.load()
+            num_machines = df['machine_id'].nunique()
+            start = df['timestamp'].max().to_pydatetime() + timedelta(minutes=5)
+
+            n = min(total_readings, batch_size * 2000)
+            lines = make_ndjson(n, num_machines, start)
+            bodies = [b"\n".join(lines[i:i + batch_size]) for i in range(0, n, batch_size)]
+
+            t0 = time.perf_counter()
+            for body in bodies:
+                store.append(parse_readings(body, "application/x-ndjson"))
+            elapsed = time.perf_counter() - t0
+
+            # Make sure the appended history is consistent with what was sent
+            assert len(store.get()) == len(df) + n
+            print(f"   batch={batch_size:>5}  readings={n:>6,}  "
+                  f"{n / elapsed:>10,.0f} readings/s  {elapsed / len(bodies) * 1000:8.2f} ms/batch")
+
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--data', default=DATA_PATH, help='Sensor CSV to seed the store with')
+    parser.add_argument('--readings', type=int, default=20000, help='Readings per batch size')
+    args = parser.parse_args()
+    run(args.data, args.readings)
@@ -0,0 +1,87 @@
+"""
+Smart Factory Analytics - Report Memory Benchmark
+Peak memory and wall time of generate_reports.py loading the whole history
+at once versus --stream (a few machines at a time, running aggregates only),
+on a simulated history, each run in a fresh interpreter. Also checks that
+both modes write byte-identical CSVs.
+
+Usage: python benchmarks/report_memory_benchmark.py [--machines 24] [--days 90]
+                                                    [--machines-per-chunk 8] [--model-dir backend/ml/]
+"""
+
+import argparse
+import filecmp
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+MODEL_DIR = "backend/ml/"
+REPORTS = ['failure_predictions', 'yield_performance', 'anomaly_clusters', 'machine_health_overview']
+
+# Runs the report script in a fresh interpreter and reports its peak RSS
+RUNNER = """
+import json, resource, runpy, sys, time
+sys.argv = {argv!r}
+started = time.perf_counter()
+runpy.run_path({script!r}, run_name='__main__')
+seconds = time.perf_counter() - started
+print(json.dumps({{'seconds': seconds, 'peak_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}}))
+"""
+
+
+def simulate(machines, days, output):
+    subprocess.run(
+        [sys.executable, os.path.join(ROOT_DIR, 'simulate_sensor_data.py'), '--machines', str(machines),
+         '--days', str(days), '--start', '2024-01-01', '--output', output, '--workers', '0'],
+        check=True, capture_output=True, cwd=ROOT_DIR
+    )
+
+
+def run_reports(data, model_dir, output_dir, extra):
+    script = os.path.join(ROOT_DIR, 'generate_reports.py')
+    argv = [script, '--data', data, '--model-dir', model_dir, '--output-dir', output_dir, *extra]
+    result = subprocess.run([sys.executable, '-c', RUNNER.format(argv=argv, script=script)],
+                            capture_output=True, text=True, check=True, cwd=ROOT_DIR)
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def same_reports(a_dir, b_dir):
+    return all(filecmp.cmp(os.path.join(a_dir, f"{name}.csv"), os.path.join(b_dir, f"{name}.csv"), shallow=False)
+               for name in REPORTS)
+
+
+def run(machines, days, machines_per_chunk, model_dir):
+    print("=" * 80)
+    print("🧮 REPORT MEMORY BENCHMARK: IN-MEMORY vs STREAMING")
+    print("=" * 80)
+
+    model_dir = os.path.abspath(model_dir)
+    with tempfile.TemporaryDirectory(prefix='reports-') as tmp:
+        data = os.path.join(tmp, 'factory_sensors.csv')
+        simulate(machines, days, data)
+        print(f"\n📊 {machines} machines x {days} days: {os.path.getsize(data) / 1024 / 1024:.0f} MB of CSV")
+
+        # A stream chunk holds whole machine histories, so its size follows --days x --machines-per-chunk
+        cases = [('in-memory', []), ('--stream', ['--stream', '--machines-per-chunk', str(machines_per_chunk)])]
+        print(f"\n   {'mode':<12} {'seconds':>8} {'peak RSS MB':>12}")
+        for label, extra in cases:
+            result = run_reports(data, model_dir, os.path.join(tmp, label), extra)
+            print(f"   {label:<12} {result['seconds']:8.1f} {result['peak_mb']:12.0f}")
+
+        ok = same_reports(*(os.path.join(tmp, label) for label, _ in cases))
+        print(f"\n   Byte-identical CSVs: {'✅' if ok else '❌'}")
+
+    print("\n" + "=" * 80)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--machines', type=int, default=24, help='Machines to simulate')
+    parser.add_argument('--days', type=int, default=90, help='Days of history per machine')
+    parser.add_argument('--machines-per-chunk', type=int, default=8, help='Machines per chunk in --stream mode')
+    parser.add_argument('--model-dir', default=MODEL_DIR, help='Model registry (or model directory) to score with')
+    args = parser.parse_args()
+    run(args.machines, args.days, args.machines_per_chunk, args.model_dir)
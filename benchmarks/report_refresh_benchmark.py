@@ -0,0 +1,109 @@
+"""
+Smart Factory Analytics - Report Refresh Benchmark
+Wall time of an incremental generate_reports.py run after five minutes of
+new readings (one per machine) versus a --full recompute, on a simulated
+history, and whether both write the same four CSVs (to a relative 1e-12:
+new readings get the same features and scores, but the incremental run
+merges its aggregates in a different order, which moves the last bits).
+tests/test_generate_reports.py checks the same on a small history.
+
+Usage: python benchmarks/report_refresh_benchmark.py [--machines 24] [--days 90]
+                                                     [--model-dir backend/ml/]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT_DIR, 'backend'))
+
+from sensor_storage import append_sensors, read_sensors, resolve_source
+
+MODEL_DIR = "backend/ml/"
+REPORTS = ['failure_predictions', 'yield_performance', 'anomaly_clusters', 'machine_health_overview']
+TOLERANCE = 1e-12
+
+
+def simulate(machines, days, output):
+    subprocess.run(
+        [sys.executable, os.path.join(ROOT_DIR, 'simulate_sensor_data.py'), '--machines', str(machines),
+         '--days', str(days), '--start', '2024-01-01', '--output', output, '--workers', '0'],
+        check=True, capture_output=True, cwd=ROOT_DIR
+    )
+
+
+def append_next_readings(data):
+    """Append one reading per machine, five minutes after its latest one."""
+    source = resolve_source(data)
+    latest = read_sensors(source).groupby('machine_id').tail(1)
+    latest = latest.assign(timestamp=latest['timestamp'] + pd.Timedelta(minutes=5),
+                           runtime_hours=latest['runtime_hours'] + 5 / 60)
+    append_sensors(latest, source)
+    return len(latest)
+
+
+def run_reports(data, model_dir, output_dir, *extra):
+    started = time.perf_counter()
+    subprocess.run(
+        [sys.executable, os.path.join(ROOT_DIR, 'generate_reports.py'), '--data', data, '--model-dir', model_dir,
+         '--output-dir', output_dir, *extra],
+        check=True, capture_output=True, cwd=ROOT_DIR
+    )
+    return time.perf_counter() - started
+
+
+def same_reports(a_dir, b_dir):
+    for name in REPORTS:
+        a = pd.read_csv(os.path.join(a_dir, f"{name}.csv"))
+        b = pd.read_csv(os.path.join(b_dir, f"{name}.csv"))
+        if list(a.columns) != list(b.columns) or len(a) != len(b):
+            return False
+        for col in a.columns:
+            if a[col].dtype.kind == 'f':
+                if not np.allclose(a[col], b[col], rtol=TOLERANCE, atol=0, equal_nan=True):
+                    return False
+            elif not a[col].equals(b[col]):
+                return False
+    return True
+
+
+def run(machines, days, model_dir):
+    print("=" * 80)
+    print("🔁 REPORT REFRESH BENCHMARK: INCREMENTAL vs FULL RECOMPUTE")
+    print("=" * 80)
+
+    model_dir = os.path.abspath(model_dir)
+    with tempfile.TemporaryDirectory(prefix='reports-') as tmp:
+        data = os.path.join(tmp, 'factory_sensors.csv')
+        incremental_dir, full_dir = os.path.join(tmp, 'incremental'), os.path.join(tmp, 'full')
+        simulate(machines, days, data)
+        print(f"\n📊 {machines} machines x {days} days")
+
+        first = run_reports(data, model_dir, incremental_dir, '--full')
+        new_rows = append_next_readings(data)
+        incremental = run_reports(data, model_dir, incremental_dir)
+        full = run_reports(data, model_dir, full_dir, '--full')
+
+        print(f"\n   {'run':<34} {'seconds':>8}")
+        print(f"   {'first run (builds the state)':<34} {first:8.1f}")
+        print(f"   {f'incremental, {new_rows} new readings':<34} {incremental:8.1f}")
+        print(f"   {'--full recompute':<34} {full:8.1f}   {full / incremental:5.1f}x slower")
+        print(f"\n   Same four CSVs: {'✅' if same_reports(incremental_dir, full_dir) else '❌'}")
+
+    print("\n" + "=" * 80)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--machines', type=int, default=24, help='Machines to simulate')
+    parser.add_argument('--days', type=int, default=90, help='Days of history per machine')
+    parser.add_argument('--model-dir', default=MODEL_DIR, help='Model registry (or model directory) to score with')
+    args = parser.parse_args()
+    run(args.machines, args.days, args.model_dir)
@@ -0,0 +1,85 @@
+"""
+Smart Factory Analytics - Report Scaling Benchmark
+Wall time of `generate_reports.py --stream` on a simulated history as the
+process pool grows (--workers 1, 2, 4, 8 by default), with the speedup and
+parallel efficiency over one worker. Each machine is scored in one
+partition and cluster stats are merged in machine order, so every worker
+count must write byte-identical CSVs; that is checked too (and in
+tests/test_generate_reports.py). Speedup is capped by the cores available
+(printed first).
+
+Usage: python benchmarks/report_scaling_benchmark.py [--machines 48] [--days 60]
+                                                     [--workers 1 2 4 8] [--model-dir backend/ml/]
+"""
+
+import argparse
+import filecmp
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+MODEL_DIR = "backend/ml/"
+WORKER_COUNTS = [1, 2, 4, 8]
+MACHINES_PER_CHUNK = 4
+REPORTS = ['failure_predictions', 'yield_performance', 'anomaly_clusters', 'machine_health_overview']
+
+
+def simulate(machines, days, output):
+    subprocess.run(
+        [sys.executable, os.path.join(ROOT_DIR, 'simulate_sensor_data.py'), '--machines', str(machines),
+         '--days', str(days), '--start', '2024-01-01', '--output', output, '--workers', '0'],
+        check=True, capture_output=True, cwd=ROOT_DIR
+    )
+
+
+def run_reports(data, model_dir, output_dir, workers):
+    started = time.perf_counter()
+    subprocess.run(
+        [sys.executable, os.path.join(ROOT_DIR, 'generate_reports.py'), '--data', data, '--model-dir', model_dir,
+         '--output-dir', output_dir, '--stream', '--machines-per-chunk', str(MACHINES_PER_CHUNK),
+         '--workers', str(workers)],
+        check=True, capture_output=True, cwd=ROOT_DIR
+    )
+    return time.perf_counter() - started
+
+
+def run(machines, days, worker_counts, model_dir):
+    print("=" * 80)
+    print("⚙️  REPORT SCALING BENCHMARK: PARTITIONS ACROSS A PROCESS POOL")
+    print("=" * 80)
+
+    model_dir = os.path.abspath(model_dir)
+    with tempfile.TemporaryDirectory(prefix='reports-') as tmp:
+        data = os.path.join(tmp, 'factory_sensors.csv')
+        simulate(machines, days, data)
+        # The dataset written next to the CSV is what the workers read their partitions from
+        print(f"\n📊 {machines} machines x {days} days, {MACHINES_PER_CHUNK} machines per partition, "
+              f"{os.cpu_count()} cores")
+
+        print(f"\n   {'workers':>7} {'seconds':>8} {'speedup':>8} {'efficiency':>11} {'same CSVs':>10}")
+        baseline = None
+        for workers in worker_counts:
+            output_dir = os.path.join(tmp, f"workers-{workers}")
+            seconds = run_reports(data, model_dir, output_dir, workers)
+            if baseline is None:
+                baseline = (seconds, workers, output_dir)
+            speedup = baseline[0] / seconds
+            same = all(filecmp.cmp(os.path.join(baseline[2], f"{name}.csv"), os.path.join(output_dir, f"{name}.csv"),
+                                   shallow=False) for name in REPORTS)
+            print(f"   {workers:>7} {seconds:8.1f} {speedup:7.2f}x {speedup * baseline[1] / workers:10.0%} "
+                  f"{'✅' if same else '❌':>9}")
+
+    print("\n" + "=" * 80)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--machines', type=int, default=48, help='Machines to simulate')
+    parser.add_argument('--days', type=int, default=60, help='Days of history per machine')
+    parser.add_argument('--workers', type=int, nargs='+', default=WORKER_COUNTS, help='Worker counts to time')
+    parser.add_argument('--model-dir', default=MODEL_DIR, help='Model registry (or model directory) to score with')
+    args = parser.parse_args()
+    run(args.machines, args.days, args.workers, args.model_dir)
@@ -1,100 +1,389 @@
 """
 Smart Factory Analytics - Power BI Report Generator
 Generates CSV reports for Power BI integration and analysis.
+
+By default the whole history is loaded at once. With --stream it is read a
+few machines at a time and only running per-machine and per-cluster
+aggregates are kept, so memory stays bounded however long the history is.
+With --workers the machine partitions are scored in a process pool and
+their aggregates merged. Every mode writes byte-identical CSVs.
+
+Runs are incremental: the aggregates are saved with each machine's
+high-water mark (its newest folded reading), and the next run only reads,
+scores and folds the readings past it. --full rebuilds from scratch, as
+happens by itself when the models or the history itself have changed.
+
+Usage: python generate_reports.py [--full] [--stream] [--machines-per-chunk 8] [--workers 1]
 """
 
+import argparse
+import copy
 import pandas as pd
 import numpy as np
-import joblib
 import os
+import pickle
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from sklearn.preprocessing import StandardScaler
+from threadpoolctl import threadpool_limits
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+from features import ROLLING_WINDOWS, feature_engineering
+from inference import read_models, run_inference
+from model_bundle import BUNDLE_FILE
+from model_registry import ModelRegistry
+from sensor_storage import history_checkpoint, list_machines, only_appended, read_sensors, resolve_source
 
 # Paths
 DATA_PATH = "data/factory_sensors.csv"
 MODEL_DIR = "backend/ml/"
 OUTPUT_DIR = "reports/"
 
-# Ensure output directory exists
-os.makedirs(OUTPUT_DIR, exist_ok=True)
+# Machines per partition in --stream and --workers modes (each machine's history stays in one partition)
+MACHINES_PER_CHUNK = 8
+
+# Columns aggregated per machine and per anomaly cluster
+MACHINE_COLUMNS = [
+    'failure_probability', 'predicted_yield', 'temperature', 'vibration',
+    'pressure', 'speed', 'runtime_hours', 'is_failure'
+]
+CLUSTER_COLUMNS = ['temperature', 'vibration', 'pressure', 'speed', 'is_failure']
+
+# Incremental refresh state, saved in the output directory
+STATE_FILE = '.report_state.pkl'
+STATE_FORMAT = 2
+
+# Readings a machine needs before its rolling features stop being back-filled
+WINDOW_ROWS = max(ROLLING_WINDOWS)
 
-def load_models():
-    """Load trained ML models and scalers."""
+# Readings before a machine's high-water mark re-read as lag/rolling history:
+# two windows, so new readings get the same rolling features as in a full
+# run (see `features.rolling_mean_std`)
+HISTORY_ROWS = 2 * WINDOW_ROWS
+HISTORY = pd.Timedelta(minutes=5 * HISTORY_ROWS)
+
+class RunningStats:
+    """Per-group count, sum, max, mean and sample variance of some columns, updated chunk by chunk.
+    
+    Each chunk is aggregated with `groupby` and merged into the running
+    totals; means and variances are combined with the parallel form of
+    Welford's algorithm (Chan et al.), so no rows are kept and the result
+    matches one pass over all of them up to rounding (a few ulps). A group
+    seen in a single chunk keeps that chunk's values exactly.
+    """
+    
+    def __init__(self, columns):
+        self.columns = list(columns)
+        self.stats = None
+    
+    def update(self, keys, df):
+        grouped = df[self.columns].groupby(keys)
+        chunk = {
+            'count': grouped.count(), 'sum': grouped.sum(), 'max': grouped.max(),
+            'mean': grouped.mean(), 'var': grouped.var()
+        }
+        self.stats = chunk if self.stats is None else self._merge(self.stats, chunk)
+    
+    def merge(self, other):
+        """Fold in the stats another instance gathered over other rows."""
+        if other.stats is not None:
+            self.stats = other.stats if self.stats is None else self._merge(self.stats, other.stats)
+    
+    @staticmethod
+    def _merge(a, b):
+        levels = list(range(a['count'].index.nlevels))
+        merged = {
+            'count': pd.concat([a['count'], b['count']]).groupby(level=levels).sum(),
+            'sum': pd.concat([a['sum'], b['sum']]).groupby(level=levels).sum(),
+            'max': pd.concat([a['max'], b['max']]).groupby(level=levels).max(),
+        }
+        index = merged['count'].index
+        na = a['count'].reindex(index, fill_value=0)
+        nb = b['count'].reindex(index, fill_value=0)
+        mean_a, mean_b = a['mean'].reindex(index), b['mean'].reindex(index)
+        # Sums of squared deviations; a group with fewer than two rows contributes none
+        m2_a = (a['var'].reindex(index) * (na - 1)).fillna(0)
+        m2_b = (b['var'].reindex(index) * (nb - 1)).fillna(0)
+        
+        n = na + nb
+        delta = mean_b - mean_a
+        mean = mean_a + delta * nb / n
+        var = (m2_a + m2_b + delta ** 2 * na * nb / n) / (n - 1)
+        # Groups from only one side keep that side's values
+        both = (na > 0) & (nb > 0)
+        merged['mean'] = mean.where(both, mean_a.fillna(mean_b))
+        merged['var'] = var.where(both & (n > 1), a['var'].reindex(index).fillna(b['var'].reindex(index)))
+        return merged
+    
+    def merged_over(self, level):
+        """Stats per value of the other index level, merging the groups of each `level` value in index order.
+        
+        The result only depends on the per-group stats, not on how the rows
+        were split into chunks.
+        """
+        merged = None
+        for key in sorted(self.stats['count'].index.unique(level=level)):
+            part = {stat: frame.xs(key, level=level) for stat, frame in self.stats.items()}
+            merged = part if merged is None else self._merge(merged, part)
+        return merged
+    
+    def __getitem__(self, stat):
+        return self.stats[stat]
+
+class ReportAggregates:
+    """What the four reports are built from: running stats per machine and per
+    anomaly cluster, plus the latest scored reading of each machine.
+    
+    Aggregates of disjoint rows merge into the aggregates of all of them.
+    Cluster stats are kept per machine and cluster, and merged over the
+    machines in machine order only when the report is built: every machine's
+    rows are scored in one partition, so the reports come out the same bits
+    however the machines were partitioned.
+    """
+    
+    def __init__(self):
+        self.machines = RunningStats(MACHINE_COLUMNS)
+        self.clusters = RunningStats(CLUSTER_COLUMNS)
+        self.latest = None
+    
+    def update(self, df):
+        """Fold in scored rows."""
+        self.machines.update(df['machine_id'], df)
+        self.clusters.update([df['machine_id'], df['cluster']], df)
+        self._update_latest(df.groupby('machine_id').tail(1))
+    
+    def merge(self, other):
+        self.machines.merge(other.machines)
+        self.clusters.merge(other.clusters)
+        if other.latest is not None:
+            self._update_latest(other.latest)
+    
+    def _update_latest(self, latest):
+        if self.latest is not None:
+            # Each machine's newest reading, in machine order
+            latest = pd.concat([self.latest, latest]).sort_values(['machine_id', 'timestamp'], kind='stable')
+            latest = latest.drop_duplicates('machine_id', keep='last')
+        self.latest = latest.reset_index(drop=True)
+    
+    @property
+    def rows(self):
+        return 0 if self.machines.stats is None else int(self.machines['count']['is_failure'].sum())
+    
+    def high_water_marks(self):
+        """Timestamp of the newest folded reading of each machine."""
+        if self.latest is None:
+            return {}
+        return dict(zip(self.latest['machine_id'], self.latest['timestamp']))
+    
+    def folded_rows(self):
+        """Number of folded readings of each machine."""
+        if self.machines.stats is None:
+            return {}
+        return self.machines['count']['is_failure'].to_dict()
+
+def load_models(model_dir=None):
+    """Load trained ML models and scalers (the fused pipeline when the bundle has one)."""
     print("📦 Loading trained models...")
     
-    models = {
-        'failure_model': joblib.load(f"{MODEL_DIR}failure_model.pkl"),
-        'failure_scaler': joblib.load(f"{MODEL_DIR}failure_scaler.pkl"),
-        'failure_features': joblib.load(f"{MODEL_DIR}failure_features.pkl"),
-        'yield_model': joblib.load(f"{MODEL_DIR}yield_model.pkl"),
-        'yield_scaler': joblib.load(f"{MODEL_DIR}yield_scaler.pkl"),
-        'yield_features': joblib.load(f"{MODEL_DIR}yield_features.pkl"),
-        'anomaly_model': joblib.load(f"{MODEL_DIR}anomaly_model.pkl"),
-        'anomaly_scaler': joblib.load(f"{MODEL_DIR}anomaly_scaler.pkl"),
-        'anomaly_features': joblib.load(f"{MODEL_DIR}anomaly_features.pkl"),
-    }
+    # The registry's active version, or unversioned models in MODEL_DIR
+    registry = ModelRegistry(MODEL_DIR)
+    timings = {}
+    started = time.perf_counter()
+    models = read_models(model_dir or registry.current_dir(), timings)
     
-    print("✅ Models loaded successfully")
+    print(f"✅ Models loaded successfully ({registry.current() or 'unversioned'}, "
+          f"{(time.perf_counter() - started) * 1000:.1f} ms)")
+    for name, seconds in timings.items():
+        print(f"   {name:<20} {seconds * 1000:8.1f} ms")
     return models
 
-def feature_engineering(df):
-    """Create features matching the training pipeline."""
+def prepare_features(df, offsets=None):
+    """Create features matching the training pipeline.
+    
+    `offsets` maps machines whose history `df` only holds the tail of to the
+    number of their readings before it.
+    """
     print("🔧 Engineering features...")
     
     df['timestamp'] = pd.to_datetime(df['timestamp'])
     df = df.sort_values(['machine_id', 'timestamp']).reset_index(drop=True)
-    
-    # Time-based features
-    df['hour'] = df['timestamp'].dt.hour
-    df['day_of_week'] = df['timestamp'].dt.dayofweek
-    df['day_of_month'] = df['timestamp'].dt.day
-    
-    # Lag features
-    for col in ['temperature', 'vibration', 'pressure', 'speed']:
-        df[f'{col}_lag1'] = df.groupby('machine_id')[col].shift(1)
-        df[f'{col}_change'] = df.groupby('machine_id')[col].diff()
-    
-    # Rolling statistics
-    for col in ['temperature', 'vibration', 'pressure']:
-        df[f'{col}_rolling_mean'] = df.groupby('machine_id')[col].rolling(12).mean().reset_index(0, drop=True)
-        df[f'{col}_rolling_std'] = df.groupby('machine_id')[col].rolling(12).std().reset_index(0, drop=True)
-    
-    # Interaction features
-    df['temp_vibration_interaction'] = df['temperature'] * df['vibration']
-    df['pressure_speed_ratio'] = df['pressure'] / (df['speed'] + 1)
-    
-    # Fill NaN
-    df = df.fillna(method='bfill').fillna(0)
-    
+    return feature_engineering(df, offsets=offsets)
+
+def score(df, models):
+    """Add each row's failure probability, predicted yield and anomaly cluster."""
+    df['failure_probability'], df['predicted_yield'], df['cluster'] = run_inference(df, models)
     return df
 
-def generate_failure_predictions_report(df, models):
+def fold(df, models, high_water_marks=None):
+    """Score the engineered rows past each machine's high-water mark and aggregate them.
+    
+    Returns `(settled, provisional)` aggregates. Rows at or before
+    `high_water_marks[machine]` were folded by an earlier run and only serve
+    as lag/rolling history. Machines with less than a rolling window of
+    readings are provisional: their first rows are back-filled from readings
+    still to come, so they are reported but not saved for the next run.
+    """
+    settled, provisional = ReportAggregates(), ReportAggregates()
+    marks = pd.to_datetime(df['machine_id'].map(high_water_marks or {}))
+    new = marks.isna() | (df['timestamp'] > marks)
+    young = marks.isna() & (df.groupby('machine_id')['machine_id'].transform('size') < WINDOW_ROWS)
+    if not new.all():
+        df, young = df[new], young[new]
+    if df.empty:
+        return settled, provisional
+    
+    df = score(df, models)
+    if young.any():
+        provisional.update(df[young])
+        df = df[~young]
+    if len(df):
+        settled.update(df)
+    return settled, provisional
+
+def machine_partitions(machine_ids, machines_per_chunk=MACHINES_PER_CHUNK):
+    return [machine_ids[start:start + machines_per_chunk] for start in range(0, len(machine_ids), machines_per_chunk)]
+
+def split_by_machine(df, machines_per_chunk=MACHINES_PER_CHUNK):
+    """Split readings sorted by machine into frames of `machines_per_chunk` machines."""
+    firsts = [group[0] for group in machine_partitions(df['machine_id'].unique(), machines_per_chunk)]
+    bounds = [*df['machine_id'].searchsorted(firsts), len(df)]
+    return [df.iloc[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
+
+def load_partition(partition):
+    """Readings of a partition `(source, machine_ids, high_water_marks, folded_rows)`, and their offsets.
+    
+    `source` is either the readings themselves or the sensor source to read
+    `machine_ids` from. With high-water marks (one per machine) only
+    HISTORY before the earliest mark is read; machines that turn out to
+    have fewer than HISTORY_ROWS - 1 readings there, after a gap in their
+    data, are read in full. The offsets map each machine read from part way
+    through to how many of its readings were skipped: its folded rows less
+    those re-read (for `prepare_features`).
+    """
+    source, machine_ids, marks, folded = partition
+    if isinstance(source, pd.DataFrame):
+        return source, {}
+    if not marks:
+        return read_sensors(source, machine_ids=machine_ids), {}
+    
+    df = read_sensors(source, machine_ids=machine_ids, start=min(marks.values()) - HISTORY)
+    history = (df['timestamp'] <= df['machine_id'].map(marks)).groupby(df['machine_id']).sum()
+    offsets = {m: folded.get(m, 0) - history.get(m, 0) for m in machine_ids}
+    short = [m for m in machine_ids if history.get(m, 0) < HISTORY_ROWS - 1 or offsets[m] < 0]
+    if short:
+        df = pd.concat([df[~df['machine_id'].isin(short)], read_sensors(source, machine_ids=short)])
+    return df, {m: offset for m, offset in offsets.items() if m not in short}
+
+def aggregate_partition(partition, models):
+    """Engineer, score and aggregate one partition: `(settled, provisional)` aggregates."""
+    df, offsets = load_partition(partition)
+    if df.empty:
+        return ReportAggregates(), ReportAggregates()
+    return fold(prepare_features(df, offsets), models, partition[2])
+
+def aggregate(partitions, models):
+    """`aggregate_partition()` over every partition in turn, merged."""
+    settled, provisional = ReportAggregates(), ReportAggregates()
+    for number, partition in enumerate(partitions, start=1):
+        if len(partitions) > 1:
+            print(f"   Partition {number}/{len(partitions)}")
+        partition_settled, partition_provisional = aggregate_partition(partition, models)
+        settled.merge(partition_settled)
+        provisional.merge(partition_provisional)
+    return settled, provisional
+
+# Models loaded once per process-pool worker by `_load_worker_models`
+_worker_models = None
+
+def _load_worker_models(model_dir):
+    global _worker_models
+    _worker_models = read_models(model_dir)
+    # The pool supplies the parallelism; each worker scores on one core
+    for model in _worker_models.values():
+        if hasattr(model, 'n_jobs'):
+            model.n_jobs = 1
+
+def _aggregate_in_worker(partition):
+    with threadpool_limits(limits=1):
+        return aggregate_partition(partition, _worker_models)
+
+def aggregate_parallel(partitions, model_dir, workers):
+    """`aggregate()` over machine partitions in a process pool.
+    
+    Each worker loads the models once, then engineers features, scores and
+    aggregates whole partitions; only the per-partition aggregates come
+    back. They are merged in partition order, and each machine's rows are
+    aggregated in one partition, so the reports do not depend on the number
+    of workers (see `ReportAggregates`).
+    """
+    settled, provisional = ReportAggregates(), ReportAggregates()
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_load_worker_models, initargs=(model_dir,)
+    ) as pool:
+        for partition_settled, partition_provisional in pool.map(_aggregate_in_worker, partitions):
+            settled.merge(partition_settled)
+            provisional.merge(partition_provisional)
+    return settled, provisional
+
+def models_signature(model_dir):
+    """Name, size and mtime of each model file in `model_dir`."""
+    return sorted(
+        (entry.name, entry.stat().st_size, entry.stat().st_mtime_ns) for entry in os.scandir(model_dir)
+        if entry.is_file() and (entry.name == BUNDLE_FILE or entry.name.endswith('.pkl'))
+    )
+
+def load_state(path, source, model_dir):
+    """The settled aggregates saved by the last run, or None if they cannot be extended.
+    
+    They are discarded when the format, the source, the models or the
+    rolling windows differ from this run's, when the history has been
+    rewritten rather than appended to since, or when no machine was settled
+    (every machine had less than a rolling window of readings).
+    """
+    try:
+        with open(path, 'rb') as f:
+            state = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        return None
+    current = {
+        'format': STATE_FORMAT, 'source': os.path.abspath(source),
+        'models': models_signature(model_dir), 'windows': list(ROLLING_WINDOWS),
+    }
+    if any(state.get(key) != value for key, value in current.items()):
+        return None
+    if not only_appended(source, state['checkpoint']):
+        return None
+    if not state['aggregates'].high_water_marks():
+        return None
+    return state['aggregates']
+
+def save_state(path, source, model_dir, checkpoint, aggregates):
+    state = {
+        'format': STATE_FORMAT, 'source': os.path.abspath(source),
+        'models': models_signature(model_dir), 'windows': list(ROLLING_WINDOWS),
+        'checkpoint': checkpoint, 'aggregates': aggregates,
+    }
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+def generate_failure_predictions_report(machine_stats):
     """Generate failure prediction report for Power BI."""
     print("\n📊 Generating Failure Predictions Report...")
     
-    # Prepare features
-    X = df[models['failure_features']]
-    X_scaled = models['failure_scaler'].transform(X)
-    
-    # Predict
-    df['failure_probability'] = models['failure_model'].predict_proba(X_scaled)[:, 1]
-    
     # Aggregate by machine
-    failure_report = df.groupby('machine_id').agg({
-        'failure_probability': 'mean',
-        'runtime_hours': 'max',
-        'temperature': 'mean',
-        'vibration': 'mean',
-        'pressure': 'mean',
-        'speed': 'mean',
-        'is_failure': 'sum'
-    }).reset_index()
-    
-    failure_report.columns = [
-        'machine_id', 'failure_probability', 'runtime_hours',
-        'avg_temperature', 'avg_vibration', 'avg_pressure', 'avg_speed',
-        'total_failures'
-    ]
+    mean = machine_stats['mean']
+    failure_report = pd.DataFrame({
+        'failure_probability': mean['failure_probability'],
+        'runtime_hours': machine_stats['max']['runtime_hours'],
+        'avg_temperature': mean['temperature'],
+        'avg_vibration': mean['vibration'],
+        'avg_pressure': mean['pressure'],
+        'avg_speed': mean['speed'],
+        'total_failures': machine_stats['sum']['is_failure']
+    }).rename_axis('machine_id').reset_index()
     
     # Risk categorization
     failure_report['risk_level'] = pd.cut(
@@ -133,31 +422,20 @@ def generate_failure_predictions_report(df, models):
     
     return failure_report
 
-def generate_yield_performance_report(df, models):
+def generate_yield_performance_report(machine_stats):
     """Generate yield performance report for Power BI."""
     print("\n📈 Generating Yield Performance Report...")
     
-    # Prepare features
-    X = df[models['yield_features']]
-    X_scaled = models['yield_scaler'].transform(X)
-    
-    # Predict
-    df['predicted_yield'] = models['yield_model'].predict(X_scaled)
-    
     # Aggregate by machine
-    yield_report = df.groupby('machine_id').agg({
-        'predicted_yield': 'mean',
-        'temperature': 'mean',
-        'vibration': 'mean',
-        'pressure': 'mean',
-        'speed': 'mean',
-        'runtime_hours': 'max'
-    }).reset_index()
-    
-    yield_report.columns = [
-        'machine_id', 'predicted_yield', 'avg_temperature',
-        'avg_vibration', 'avg_pressure', 'avg_speed', 'runtime_hours'
-    ]
+    mean = machine_stats['mean']
+    yield_report = pd.DataFrame({
+        'predicted_yield': mean['predicted_yield'],
+        'avg_temperature': mean['temperature'],
+        'avg_vibration': mean['vibration'],
+        'avg_pressure': mean['pressure'],
+        'avg_speed': mean['speed'],
+        'runtime_hours': machine_stats['max']['runtime_hours']
+    }).rename_axis('machine_id').reset_index()
     
     # Calculate efficiency percentage
     yield_report['yield_efficiency_%'] = np.clip(yield_report['predicted_yield'], 0, 100).round(2)
@@ -199,35 +477,20 @@ def generate_yield_performance_report(df, models):
     
     return yield_report
 
-def generate_anomaly_clusters_report(df, models):
+def generate_anomaly_clusters_report(cluster_stats):
     """Generate anomaly detection report for Power BI."""
     print("\n🔍 Generating Anomaly Clusters Report...")
     
-    # Prepare features
-    X = df[models['anomaly_features']]
-    X_scaled = models['anomaly_scaler'].transform(X)
-    
-    # Predict clusters
-    df['cluster'] = models['anomaly_model'].predict(X_scaled)
-    
     # Cluster-level statistics
-    anomaly_report = df.groupby('cluster').agg({
-        'temperature': ['mean', 'std'],
-        'vibration': ['mean', 'std'],
-        'pressure': ['mean', 'std'],
-        'speed': ['mean', 'std'],
-        'is_failure': 'mean',
-        'machine_id': 'count'
-    })
-    
-    # Flatten column names
-    anomaly_report.columns = [
-        'avg_temperature', 'std_temperature',
-        'avg_vibration', 'std_vibration',
-        'avg_pressure', 'std_pressure',
-        'avg_speed', 'std_speed',
-        'failure_rate', 'machines_in_cluster'
-    ]
+    mean, std = cluster_stats['mean'], np.sqrt(cluster_stats['var'])
+    anomaly_report = pd.DataFrame({
+        'avg_temperature': mean['temperature'], 'std_temperature': std['temperature'],
+        'avg_vibration': mean['vibration'], 'std_vibration': std['vibration'],
+        'avg_pressure': mean['pressure'], 'std_pressure': std['pressure'],
+        'avg_speed': mean['speed'], 'std_speed': std['speed'],
+        'failure_rate': mean['is_failure'],
+        'machines_in_cluster': cluster_stats['count']['is_failure']
+    }).rename_axis('cluster')
     
     anomaly_report = anomaly_report.reset_index()
     
@@ -265,28 +528,10 @@ def generate_anomaly_clusters_report(df, models):
     
     return anomaly_report
 
-def generate_machine_health_report(df, models):
-    """Generate comprehensive machine health report."""
+def generate_machine_health_report(latest_readings):
+    """Generate comprehensive machine health report from each machine's latest scored reading."""
     print("\n⚙️  Generating Machine Health Report...")
     
-    # Get latest reading per machine
-    latest_readings = df.groupby('machine_id').tail(1).reset_index(drop=True)
-    
-    # Prepare features for all models
-    X_failure = latest_readings[models['failure_features']]
-    X_failure_scaled = models['failure_scaler'].transform(X_failure)
-    
-    X_yield = latest_readings[models['yield_features']]
-    X_yield_scaled = models['yield_scaler'].transform(X_yield)
-    
-    X_anomaly = latest_readings[models['anomaly_features']]
-    X_anomaly_scaled = models['anomaly_scaler'].transform(X_anomaly)
-    
-    # Predictions
-    latest_readings['failure_probability'] = models['failure_model'].predict_proba(X_failure_scaled)[:, 1]
-    latest_readings['predicted_yield'] = models['yield_model'].predict(X_yield_scaled)
-    latest_readings['cluster'] = models['anomaly_model'].predict(X_anomaly_scaled)
-    
     # Calculate health score (0-100)
     latest_readings['health_score'] = (
         (1 - latest_readings['failure_probability']) * 50 +  # 50% weight
@@ -322,29 +567,73 @@ def generate_machine_health_report(df, models):
     
     return health_report
 
-def main():
+def main(stream=False, machines_per_chunk=MACHINES_PER_CHUNK, workers=1, full=False):
     """Main report generation pipeline."""
+    workers = workers or os.cpu_count() or 1
     print("="*80)
     print("📊 SMART FACTORY ANALYTICS - POWER BI REPORT GENERATOR")
     print("="*80)
     print(f"⏰ Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
     
-    # Load data
-    print("📂 Loading sensor data...")
-    df = pd.read_csv(DATA_PATH)
-    print(f"✅ Loaded {len(df):,} samples")
-    
-    # Feature engineering
-    df = feature_engineering(df)
-    
-    # Load models
-    models = load_models()
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    
+    # Models, and the aggregates of the last run if they can be extended
+    source = resolve_source(DATA_PATH)
+    registry = ModelRegistry(MODEL_DIR)
+    model_dir = registry.current_dir()
+    state_path = os.path.join(OUTPUT_DIR, STATE_FILE)
+    checkpoint = history_checkpoint(source)
+    state = None if full else load_state(state_path, source, model_dir)
+    
+    # Partitions to read: only readings past the high-water marks, or everything
+    if state is not None:
+        marks, folded = state.high_water_marks(), state.folded_rows()
+        print(f"🔁 Incremental refresh: {state.rows:,} samples already folded, "
+              f"high-water mark {max(marks.values())}")
+        machine_ids = list_machines(source)
+        known = [m for m in machine_ids if m in marks]
+        new = [m for m in machine_ids if m not in marks]
+        partitions = [(source, group, {m: marks[m] for m in group}, {m: folded[m] for m in group})
+                      for group in machine_partitions(known, machines_per_chunk)]
+        partitions += [(source, group, {}, {}) for group in machine_partitions(new, machines_per_chunk)]
+    elif stream:
+        print(f"📂 Streaming sensor data, {machines_per_chunk} machines per partition...")
+        partitions = [(source, group, {}, {}) for group in machine_partitions(list_machines(source), machines_per_chunk)]
+    else:
+        print("📂 Loading sensor data...")
+        df = read_sensors(source)
+        print(f"✅ Loaded {len(df):,} samples")
+        frames = [df] if workers == 1 else split_by_machine(df, machines_per_chunk)
+        partitions = [(frame, None, {}, {}) for frame in frames]
+        del df, frames
+    
+    # Engineer features, score the new readings and aggregate per machine and per cluster
+    if workers == 1:
+        models = load_models(model_dir)
+        print("🧮 Scoring readings...")
+        settled, provisional = aggregate(partitions, models)
+    else:
+        print(f"🧮 Scoring {len(partitions)} partitions on {workers} workers "
+              f"(models {registry.current() or 'unversioned'})...")
+        settled, provisional = aggregate_parallel(partitions, model_dir, workers)
+    print(f"✅ Scored {settled.rows + provisional.rows:,} samples")
+    
+    if state is not None:
+        state.merge(settled)
+        settled = state
+    aggregates = copy.deepcopy(settled)
+    aggregates.merge(provisional)
+    machine_stats, cluster_stats = aggregates.machines, aggregates.clusters.merged_over('machine_id')
+    latest_readings = aggregates.latest
     
     # Generate all reports
-    failure_report = generate_failure_predictions_report(df, models)
-    yield_report = generate_yield_performance_report(df, models)
-    anomaly_report = generate_anomaly_clusters_report(df, models)
-    health_report = generate_machine_health_report(df, models)
+    failure_report = generate_failure_predictions_report(machine_stats)
+    yield_report = generate_yield_performance_report(machine_stats)
+    anomaly_report = generate_anomaly_clusters_report(cluster_stats)
+    health_report = generate_machine_health_report(latest_readings)
+    
+    # Saved after the reports, so a failed run leaves the previous state in place
+    save_state(state_path, source, model_dir, checkpoint, settled)
     
     print("\n" + "="*80)
     print("🎉 ALL REPORTS GENERATED SUCCESSFULLY!")
@@ -360,4 +649,21 @@ def main():
     print("="*80)
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Generate the Power BI CSV reports.")
+    parser.add_argument('--data', default=DATA_PATH, help='Sensor CSV (or dataset) to report on')
+    parser.add_argument('--model-dir', default=MODEL_DIR, help='Model registry (or model directory) to score with')
+    parser.add_argument('--output-dir', default=OUTPUT_DIR, help='Directory the CSV reports are written to')
+    parser.add_argument('--full', action='store_true',
+                        help='Recompute every report from the whole history instead of only new readings')
+    parser.add_argument('--stream', action='store_true',
+                        help='Read the history a few machines at a time and keep only running aggregates')
+    parser.add_argument('--machines-per-chunk', type=int, default=MACHINES_PER_CHUNK,
+                        help='Machines per partition in --stream and --workers modes')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Score machine partitions in N processes (0 = all cores)')
+    args = parser.parse_args()
+    
+    DATA_PATH = args.data
+    MODEL_DIR = os.path.join(args.model_dir, '')
+    OUTPUT_DIR = os.path.join(args.output_dir, '')
+    main(args.stream, args.machines_per_chunk, args.workers, args.full)
@@ -0,0 +1,226 @@
+"""
+Smart Factory Analytics - Real-Time Sensor Replay
+Emits sensor readings at real or accelerated wall-clock rates to a local sink
+(file tail, Unix socket or the backend's /ingest endpoint) for load-testing
+data freshness and API latency under a realistic arrival pattern.
+
+Usage:
+    python replay_sensor_data.py --machines 200 --speed 100
+    python replay_sensor_data.py --replay data/factory_sensors.csv --sink file:data/live.ndjson
+    python replay_sensor_data.py --profile burst --burst-ticks 6 --sink unix:/tmp/sensors.sock
+"""
+
+import argparse
+import os
+import socket
+import sys
+import time
+import urllib.request
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from simulate_sensor_data import SEED, machine_frame, machine_seeds, make_timestamps
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+from sensor_storage import read_sensors, resolve_source
+
+# Configuration
+NUM_MACHINES = 12
+HORIZON_DAYS = 1
+SPEED = 1.0
+SINK = "http://localhost:8000/ingest"
+PROFILES = ['steady', 'jitter', 'burst']
+
+# Simulated seconds between two readings of the same machine
+SAMPLE_INTERVAL = 5 * 60
+
+
+class FileSink:
+    """Append NDJSON lines to a file, for consumers that tail it."""
+
+    def __init__(self, path):
+        self.file = open(path, 'ab')
+
+    def send(self, body):
+        self.file.write(body + b"\n")
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class UnixSocketSink:
+    """Stream NDJSON lines over a Unix domain socket."""
+
+    def __init__(self, path):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(path)
+
+    def send(self, body):
+        self.sock.sendall(body + b"\n")
+
+    def close(self):
+        self.sock.close()
+
+
+class IngestSink:
+    """POST NDJSON batches to the backend's /ingest endpoint."""
+
+    def __init__(self, url):
+        self.url = url
+
+    def send(self, body):
+        request = urllib.request.Request(
+            self.url, data=body, method='POST',
+            headers={'Content-Type': 'application/x-ndjson'}
+        )
+        with urllib.request.urlopen(request) as response:
+            response.read()
+
+    def close(self):
+        pass
+
+
+def open_sink(spec):
+    """Build a sink from `file:PATH`, `unix:PATH` or an http(s) URL."""
+    if spec.startswith('file:'):
+        return FileSink(spec[len('file:'):])
+    if spec.startswith('unix:'):
+        return UnixSocketSink(spec[len('unix:'):])
+    if spec.startswith(('http://', 'https://')):
+        return IngestSink(spec)
+    raise ValueError(f"Unknown sink '{spec}' (use file:PATH, unix:PATH or an http URL)")
+
+
+def live_readings(num_machines, horizon_days, seed, start_time):
+    """Simulate a fresh fleet starting at `start_time`, ordered by timestamp."""
+    timestamps = make_timestamps(start_time, horizon_days)
+    frames = [
+        machine_frame(machine_number, seed_seq, timestamps)
+        for machine_number, seed_seq in enumerate(machine_seeds(num_machines, seed), start=1)
+    ]
+    return pd.concat(frames, ignore_index=True).sort_values(['timestamp', 'machine_id'], kind='stable')
+
+
+def recorded_readings(path, start_time):
+    """Load recorded history and shift it so the first reading is at `start_time`."""
+    df = read_sensors(resolve_source(path))
+    df = df.sort_values(['timestamp', 'machine_id'], kind='stable')
+    df['timestamp'] = df['timestamp'] - df['timestamp'].min() + pd.Timestamp(start_time)
+    return df
+
+
+def schedule(df, profile, burst_ticks, rng):
+    """Yield `(offset_seconds, batch)` in send order, offsets in simulated time.
+
+    - steady: every reading of a tick is sent together at the tick time
+    - jitter: readings arrive spread uniformly over the tick interval
+    - burst:  machines buffer `burst_ticks` ticks and flush them together
+    """
+    offsets = (df['timestamp'] - df['timestamp'].min()).dt.total_seconds().to_numpy()
+
+    if profile == 'jitter':
+        offsets = offsets + rng.uniform(0, SAMPLE_INTERVAL, len(offsets))
+        # Group arrivals into 1-second micro-batches of simulated time
+        offsets = np.floor(offsets)
+    elif profile == 'burst':
+        block = SAMPLE_INTERVAL * burst_ticks
+        offsets = (offsets // block + 1) * block - SAMPLE_INTERVAL
+
+    order = np.argsort(offsets, kind='stable')
+    df = df.iloc[order]
+    offsets = offsets[order]
+    boundaries = np.flatnonzero(np.diff(offsets)) + 1
+    for chunk in np.split(np.arange(len(df)), boundaries):
+        if len(chunk):
+            yield offsets[chunk[0]], df.iloc[chunk]
+
+
+def to_ndjson(batch):
+    return batch.to_json(orient='records', lines=True, date_format='iso').strip().encode()
+
+
+def replay(df, sink, speed=SPEED, profile='steady', burst_ticks=6, duration=None, seed=SEED):
+    """Send `df` to `sink`, pacing batches at `speed` x real time."""
+    rng = np.random.default_rng(seed)
+    latencies = []
+    lags = []
+    readings = 0
+
+    started = time.monotonic()
+    for offset, batch in schedule(df, profile, burst_ticks, rng):
+        due = started + offset / speed
+        if duration is not None and due - started > duration:
+            break
+        delay = due - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        lags.append(max(0.0, -delay))
+
+        body = to_ndjson(batch)
+        t0 = time.perf_counter()
+        sink.send(body)
+        latencies.append(time.perf_counter() - t0)
+        readings += len(batch)
+
+    elapsed = time.monotonic() - started
+    return {
+        'batches': len(latencies),
+        'readings': readings,
+        'elapsed': elapsed,
+        'rate': readings / elapsed if elapsed else 0.0,
+        'latency_p50_ms': float(np.percentile(latencies, 50) * 1000) if latencies else 0.0,
+        'latency_p99_ms': float(np.percentile(latencies, 99) * 1000) if latencies else 0.0,
+        'max_lag_ms': max(lags) * 1000 if lags else 0.0,
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Replay sensor readings in real time.")
+    parser.add_argument('--machines', type=int, default=NUM_MACHINES, help='Fleet size for live simulation')
+    parser.add_argument('--days', type=float, default=HORIZON_DAYS, help='Simulated days to emit')
+    parser.add_argument('--replay', metavar='PATH', help='Replay recorded history instead of simulating')
+    parser.add_argument('--speed', type=float, default=SPEED, help='Time acceleration (100 = 100x real time)')
+    parser.add_argument('--sink', default=SINK, help='file:PATH, unix:PATH or an /ingest URL')
+    parser.add_argument('--profile', choices=PROFILES, default='steady', help='Arrival pattern')
+    parser.add_argument('--burst-ticks', type=int, default=6, help='Ticks buffered per flush in burst profile')
+    parser.add_argument('--duration', type=float, help='Stop after this many wall-clock seconds')
+    parser.add_argument('--seed', type=int, default=SEED, help='Seed for reproducible output')
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    print("=" * 80)
+    print("📡 SMART FACTORY ANALYTICS - REAL-TIME SENSOR REPLAY")
+    print("=" * 80)
+
+    start_time = datetime.now()
+    if args.replay:
+        df = recorded_readings(args.replay, start_time)
+        print(f"📂 Replaying {len(df):,} readings from {args.replay}")
+    else:
+        days = max(1, int(np.ceil(args.days)))
+        df = live_readings(args.machines, days, args.seed, start_time)
+        df = df[df['timestamp'] < pd.Timestamp(start_time) + timedelta(days=args.days)]
+        print(f"🏭 Simulating {args.machines} machines for {args.days} day(s) ({len(df):,} readings)")
+
+    print(f"⏩ Speed: {args.speed}x  |  Profile: {args.profile}  |  Sink: {args.sink}")
+
+    sink = open_sink(args.sink)
+    try:
+        stats = replay(df, sink, args.speed, args.profile, args.burst_ticks, args.duration, args.seed)
+    except KeyboardInterrupt:
+        print("\n⏹️  Interrupted")
+        sys.exit(1)
+    finally:
+        sink.close()
+
+    print(f"\n✅ Sent {stats['readings']:,} readings in {stats['batches']:,} batches "
+          f"over {stats['elapsed']:.1f}s ({stats['rate']:,.0f} readings/s)")
+    print(f"   Send latency p50: {stats['latency_p50_ms']:.2f} ms  p99: {stats['latency_p99_ms']:.2f} ms")
+    print(f"   Max schedule lag: {stats['max_lag_ms']:.2f} ms")
+    print("=" * 80)
@@ -6,7 +6,15 @@ Generates realistic industrial IoT sensor data for testing and demonstration.
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+import argparse
 import os
+import shutil
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+from sensor_storage import create_dataset, dataset_path_for, write_sensors
 
 # Configuration
 NUM_MACHINES = 12
@@ -14,103 +22,227 @@ DAYS_OF_DATA = 30
 SAMPLES_PER_DAY = 288  # Every 5 minutes
 FAILURE_RATE = 0.05  # 5% failure probability
 OUTPUT_PATH = "data/factory_sensors.csv"
+SEED = 42
+
+# Samples evaluated at once while searching for the next failure/reset
+FAILURE_LOOKAHEAD = 64
+
+def draw_wear_parameters(rng):
+    """Draw the parameters that are reset whenever a machine is maintained."""
+    degradation_rate = rng.uniform(0.001, 0.003)
+    base_temp = rng.uniform(65, 75)
+    base_vibration = rng.uniform(0.5, 1.5)
+    return degradation_rate, base_temp, base_vibration
+
+def simulate_machine(rng, timestamps, samples_per_day=SAMPLES_PER_DAY):
+    """Simulate one machine over `timestamps` and return its readings as arrays.
+
+    Noise is drawn for the whole series at once. The only sequential part is
+    the failure reset (maintenance re-draws base_temp, base_vibration and
+    degradation_rate), which is handled segment by segment: each step
+    evaluates a block of samples under the current parameters, finds the
+    first failure, and restarts from the following sample.
+    """
+    n = len(timestamps)
+
+    # Each machine has baseline characteristics
+    base_temp = rng.uniform(65, 75)
+    base_vibration = rng.uniform(0.5, 1.5)
+    base_pressure = rng.uniform(90, 110)
+    base_speed = rng.uniform(1200, 1800)
+    runtime_start = rng.uniform(5000, 15000)
+
+    # Simulate degradation over time
+    degradation_rate = rng.uniform(0.001, 0.003)
+
+    # Add realistic noise and patterns
+    day = np.arange(n) // samples_per_day
+    day_cycle = np.sin(2 * np.pi * timestamps.hour.to_numpy() / 24)  # Daily cycle
+    temp_noise = rng.normal(0, 2, n) + day_cycle * 3
+    vibration_noise = rng.normal(0, 0.1, n)
+
+    # Pressure and speed never change with maintenance
+    pressure = base_pressure + rng.normal(0, 5, n) - day_cycle * 2
+    speed = base_speed + rng.normal(0, 50, n)
+    failure_draw = rng.random(n)
+
+    # Runtime hours increment by 5 minutes per sample
+    runtime_hours = runtime_start + np.arange(1, n + 1) * (5 / 60)
+
+    temperature = np.empty(n)
+    vibration = np.empty(n)
+    is_failure = np.zeros(n, dtype=np.int8)
+
+    pos = 0
+    while pos < n:
+        end = min(n, pos + FAILURE_LOOKAHEAD)
+
+        # Progressive degradation
+        degradation_factor = 1 + day[pos:end] * degradation_rate
+        temp = base_temp * degradation_factor + temp_noise[pos:end]
+        vib = base_vibration * degradation_factor + vibration_noise[pos:end]
+
+        # Failure logic: higher probability with degradation and anomalies
+        anomalous = (temp > 85) | (vib > 2.5) | (pressure[pos:end] < 80)
+        failure_risk = degradation_factor * 0.02 * np.where(anomalous, 3, 1)
+        failures = np.flatnonzero(failure_draw[pos:end] < failure_risk)
+
+        stop = failures[0] + 1 if len(failures) else end - pos
+        temperature[pos:pos + stop] = temp[:stop]
+        vibration[pos:pos + stop] = vib[:stop]
+        pos += stop
+
+        # If failure occurs, reset the machine (maintenance)
+        if len(failures):
+            is_failure[pos - 1] = 1
+            degradation_rate, base_temp, base_vibration = draw_wear_parameters(rng)
+
+    return {
+        'temperature': np.round(temperature, 2),
+        'vibration': np.round(vibration, 3),
+        'pressure': np.round(pressure, 2),
+        'speed': np.round(speed, 2),
+        'runtime_hours': np.round(runtime_hours, 2),
+        'is_failure': is_failure
+    }
+
+def make_timestamps(start_time, days_of_data, samples_per_day=SAMPLES_PER_DAY):
+    """Timestamps for every sample, 5 minutes apart within each day."""
+    start = pd.Timestamp(start_time).floor('s')
+    day = np.repeat(np.arange(days_of_data), samples_per_day)
+    sample = np.tile(np.arange(samples_per_day), days_of_data)
+    return pd.DatetimeIndex(
+        start + pd.to_timedelta(day, unit='D') + pd.to_timedelta(sample * 5, unit='min')
+    )
+
+def machine_seeds(num_machines, seed):
+    """Independent, reproducible seed sequences, one per machine."""
+    return np.random.SeedSequence(seed).spawn(num_machines)
+
+def machine_frame(machine_number, seed_seq, timestamps):
+    """Simulate one machine and return its readings as a DataFrame."""
+    readings = simulate_machine(np.random.default_rng(seed_seq), timestamps)
+    return pd.DataFrame({
+        'machine_id': f'M{machine_number:03d}',
+        'timestamp': timestamps,
+        **readings
+    })
+
+def _make_output_dir(output_path):
+    """Create the directory `output_path` is written to and return it ('.' for a bare file name)."""
+    output_dir = os.path.dirname(output_path) or '.'
+    os.makedirs(output_dir, exist_ok=True)
+    return output_dir
+
+def generate_sensor_data(num_machines=NUM_MACHINES, days_of_data=DAYS_OF_DATA,
+                         seed=SEED, start_time=None, output_path=OUTPUT_PATH):
+    """Generate synthetic sensor data for smart factory simulation.
+
+    Machine k is driven by its own child of `SeedSequence(seed)`, so the same
+    seed (and `start_time`) always yields the same data for that machine,
+    regardless of how many machines are generated.
+    """
+
+    print(f"🏭 Generating synthetic sensor data for {num_machines} machines...")
+    print(f"📊 Time range: {days_of_data} days with {SAMPLES_PER_DAY} samples/day")
+
+    if start_time is None:
+        start_time = datetime.now() - timedelta(days=days_of_data)
+    timestamps = make_timestamps(start_time, days_of_data)
+
+    frames = [
+        machine_frame(machine_number, seed_seq, timestamps)
+        for machine_number, seed_seq in enumerate(machine_seeds(num_machines, seed), start=1)
+    ]
 
-np.random.seed(42)
-
-def generate_sensor_data():
-    """Generate synthetic sensor data for smart factory simulation."""
-    
-    print(f"🏭 Generating synthetic sensor data for {NUM_MACHINES} machines...")
-    print(f"📊 Time range: {DAYS_OF_DATA} days with {SAMPLES_PER_DAY} samples/day")
-    
-    data = []
-    start_time = datetime.now() - timedelta(days=DAYS_OF_DATA)
-    
-    for machine_id in range(1, NUM_MACHINES + 1):
-        # Each machine has baseline characteristics
-        base_temp = np.random.uniform(65, 75)
-        base_vibration = np.random.uniform(0.5, 1.5)
-        base_pressure = np.random.uniform(90, 110)
-        base_speed = np.random.uniform(1200, 1800)
-        runtime_hours = np.random.uniform(5000, 15000)
-        
-        # Simulate degradation over time
-        degradation_rate = np.random.uniform(0.001, 0.003)
-        
-        for day in range(DAYS_OF_DATA):
-            for sample in range(SAMPLES_PER_DAY):
-                timestamp = start_time + timedelta(days=day, minutes=sample * 5)
-                
-                # Progressive degradation
-                degradation_factor = 1 + (day * degradation_rate)
-                
-                # Add realistic noise and patterns
-                hour_of_day = timestamp.hour
-                day_cycle = np.sin(2 * np.pi * hour_of_day / 24)  # Daily cycle
-                
-                # Temperature (increases with degradation and time of day)
-                temperature = base_temp * degradation_factor + np.random.normal(0, 2) + day_cycle * 3
-                
-                # Vibration (increases with degradation)
-                vibration = base_vibration * degradation_factor + np.random.normal(0, 0.1)
-                
-                # Pressure (slight variations)
-                pressure = base_pressure + np.random.normal(0, 5) - day_cycle * 2
-                
-                # Speed (operational variations)
-                speed = base_speed + np.random.normal(0, 50)
-                
-                # Runtime hours increment
-                runtime_hours += 5 / 60  # 5 minutes
-                
-                # Failure logic: higher probability with degradation and anomalies
-                failure_risk = degradation_factor * 0.02
-                if temperature > 85 or vibration > 2.5 or pressure < 80:
-                    failure_risk *= 3
-                
-                is_failure = 1 if np.random.random() < failure_risk else 0
-                
-                # If failure occurs, reset the machine (maintenance)
-                if is_failure:
-                    degradation_rate = np.random.uniform(0.001, 0.003)
-                    base_temp = np.random.uniform(65, 75)
-                    base_vibration = np.random.uniform(0.5, 1.5)
-                
-                data.append({
-                    'machine_id': f'M{machine_id:03d}',
-                    'timestamp': timestamp.strftime('%Y-%m-%d %H:%M:%S'),
-                    'temperature': round(temperature, 2),
-                    'vibration': round(vibration, 3),
-                    'pressure': round(pressure, 2),
-                    'speed': round(speed, 2),
-                    'runtime_hours': round(runtime_hours, 2),
-                    'is_failure': is_failure
-                })
-    
     # Create DataFrame
-    df = pd.DataFrame(data)
-    
+    df = pd.concat(frames, ignore_index=True)
+
     # Ensure output directory exists
-    os.makedirs(os.path.dirname(OUTPUT_PATH), exist_ok=True)
-    
-    # Save to CSV
-    df.to_csv(OUTPUT_PATH, index=False)
-    
+    _make_output_dir(output_path)
+
+    # Save to CSV (export format) and the partitioned Parquet dataset
+    df.to_csv(output_path, index=False, date_format='%Y-%m-%d %H:%M:%S')
+    write_sensors(df, dataset_path_for(output_path))
+
     # Statistics
     total_samples = len(df)
     total_failures = df['is_failure'].sum()
     failure_percentage = (total_failures / total_samples) * 100
-    
+
     print(f"\n✅ Data generation complete!")
-    print(f"📁 Output: {OUTPUT_PATH}")
+    print(f"📁 Output: {output_path} (+ {dataset_path_for(output_path)}/)")
     print(f"📊 Total samples: {total_samples:,}")
     print(f"⚠️  Total failures: {total_failures} ({failure_percentage:.2f}%)")
-    print(f"🔧 Machines: {NUM_MACHINES}")
+    print(f"🔧 Machines: {num_machines}")
     print(f"📅 Date range: {df['timestamp'].min()} to {df['timestamp'].max()}")
-    print(f"💾 File size: {os.path.getsize(OUTPUT_PATH) / 1024 / 1024:.2f} MB\n")
-    
+    print(f"💾 File size: {os.path.getsize(output_path) / 1024 / 1024:.2f} MB\n")
+
     return df
 
+def _simulate_to_disk(task):
+    """Worker: simulate one machine and write it to the dataset and a CSV part file."""
+    machine_number, seed_seq, start_time, days_of_data, dataset, parts_dir = task
+    df = machine_frame(machine_number, seed_seq, make_timestamps(start_time, days_of_data))
+
+    part_path = os.path.join(parts_dir, f'M{machine_number:03d}.csv')
+    df.to_csv(part_path, index=False, header=False, date_format='%Y-%m-%d %H:%M:%S')
+    write_sensors(df, dataset, append=True)
+    return part_path, len(df), int(df['is_failure'].sum())
+
+def generate_sensor_data_parallel(num_machines=NUM_MACHINES, days_of_data=DAYS_OF_DATA,
+                                  seed=SEED, start_time=None, output_path=OUTPUT_PATH,
+                                  workers=None):
+    """Generate sensor data across a process pool, streaming each machine to disk.
+
+    Workers simulate one machine at a time and write it straight to its own
+    dataset partitions plus a CSV part file, which the parent appends to the
+    output CSV in machine order and deletes. Peak memory is one machine's
+    history per worker, independent of fleet size. Uses the same per-machine
+    seeds as `generate_sensor_data()`, so both modes produce identical data.
+    """
+    workers = workers or os.cpu_count()
+    print(f"🏭 Generating synthetic sensor data for {num_machines} machines on {workers} workers...")
+    print(f"📊 Time range: {days_of_data} days with {SAMPLES_PER_DAY} samples/day")
+
+    if start_time is None:
+        start_time = datetime.now() - timedelta(days=days_of_data)
+
+    # Ensure output directory exists and start from an empty dataset
+    output_dir = _make_output_dir(output_path)
+    dataset = dataset_path_for(output_path)
+    # Created here so the workers only append to it
+    create_dataset(dataset)
+    parts_dir = tempfile.mkdtemp(prefix='.sim-parts-', dir=output_dir)
+
+    tasks = [
+        (machine_number, seed_seq, start_time, days_of_data, dataset, parts_dir)
+        for machine_number, seed_seq in enumerate(machine_seeds(num_machines, seed), start=1)
+    ]
+
+    total_samples = 0
+    total_failures = 0
+    try:
+        with open(output_path, 'w') as out, ProcessPoolExecutor(max_workers=workers) as pool:
+            out.write('machine_id,timestamp,temperature,vibration,pressure,speed,runtime_hours,is_failure\n')
+            for part_path, samples, failures in pool.map(_simulate_to_disk, tasks):
+                with open(part_path) as part:
+                    shutil.copyfileobj(part, out)
+                os.remove(part_path)
+                total_samples += samples
+                total_failures += failures
+    finally:
+        shutil.rmtree(parts_dir, ignore_errors=True)
+
+    failure_percentage = (total_failures / total_samples) * 100 if total_samples else 0
+
+    print(f"\n✅ Data generation complete!")
+    print(f"📁 Output: {output_path} (+ {dataset}/)")
+    print(f"📊 Total samples: {total_samples:,}")
+    print(f"⚠️  Total failures: {total_failures} ({failure_percentage:.2f}%)")
+    print(f"🔧 Machines: {num_machines}")
+    print(f"💾 File size: {os.path.getsize(output_path) / 1024 / 1024:.2f} MB\n")
+
 def display_sample_data(df):
     """Display sample statistics and data."""
     print("📈 Sample Statistics:")
@@ -120,14 +252,32 @@ def display_sample_data(df):
     print("\n⚙️  Failure Distribution by Machine:")
     print(df.groupby('machine_id')['is_failure'].agg(['sum', 'mean']))
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate synthetic factory sensor data.")
+    parser.add_argument('--machines', type=int, default=NUM_MACHINES, help='Number of machines')
+    parser.add_argument('--days', type=int, default=DAYS_OF_DATA, help='Days of history per machine')
+    parser.add_argument('--seed', type=int, default=SEED, help='Seed for reproducible output')
+    parser.add_argument('--start', type=pd.Timestamp, default=None,
+                        help='First timestamp (default: now minus --days); fix it for byte-identical reruns')
+    parser.add_argument('--output', default=OUTPUT_PATH, help='CSV output path')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Simulate machines in N processes, streaming each to disk (0 = all cores)')
+    return parser.parse_args()
+
 if __name__ == "__main__":
+    args = parse_args()
+
     print("=" * 80)
     print("🏭 SMART FACTORY ANALYTICS - DATA SIMULATOR")
     print("=" * 80)
-    
-    df = generate_sensor_data()
-    display_sample_data(df)
-    
+
+    if args.workers == 1:
+        df = generate_sensor_data(args.machines, args.days, args.seed, args.start, args.output)
+        display_sample_data(df)
+    else:
+        generate_sensor_data_parallel(args.machines, args.days, args.seed, args.start,
+                                      args.output, args.workers or None)
+
     print("=" * 80)
     print("🎯 Next steps:")
     print("   1. Run: python backend/ml/train_models.py (to train ML models)")
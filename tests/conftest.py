@@ -0,0 +1,23 @@
+"""
+Smart Factory Analytics - Test Fixtures
+"""
+
+import pytest
+
+from support import run_script, simulate_sensors, write_history
+
+
+@pytest.fixture
+def sensors():
+    return simulate_sensors()
+
+
+@pytest.fixture(scope='session')
+def model_dir(tmp_path_factory):
+    """A model registry trained on a small simulated history (binned estimators, for speed)."""
+    tmp = tmp_path_factory.mktemp('models')
+    data = tmp / 'factory_sensors.csv'
+    write_history(simulate_sensors(machines=6, days=4), data)
+    run_script('backend/ml/train_models.py', '--data', data, '--model-dir', tmp / 'ml',
+               '--estimator', 'hist_gradient_boosting')
+    return tmp / 'ml'
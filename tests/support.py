@@ -0,0 +1,42 @@
+"""
+Smart Factory Analytics - Test Support
+Puts the repository root and backend/ on the import path (the layout the
+scripts themselves use) and simulates small sensor histories.
+"""
+
+import os
+import subprocess
+import sys
+
+import pandas as pd
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, 'backend'))
+
+from simulate_sensor_data import machine_frame, machine_seeds, make_timestamps
+
+
+def simulate_sensors(machines=4, days=3, seed=7, start='2024-01-01'):
+    """Readings of `machines` simulated machines, sorted by machine and timestamp.
+
+    Machine k loses its last 7*(k-1) readings, so histories have different
+    lengths and no machine after the first starts on a window boundary.
+    """
+    timestamps = make_timestamps(start, days)
+    frames = []
+    for number, seed_seq in enumerate(machine_seeds(machines, seed), start=1):
+        frame = machine_frame(number, seed_seq, timestamps)
+        frames.append(frame.iloc[:len(frame) - 7 * (number - 1)])
+    return pd.concat(frames, ignore_index=True)
+
+
+def write_history(df, path, append=False):
+    """Write (or append) readings to a sensor CSV the way the simulator does."""
+    df.to_csv(path, index=False, date_format='%Y-%m-%d %H:%M:%S', mode='a' if append else 'w', header=not append)
+
+
+def run_script(script, *args):
+    """Run one of the repository's scripts in a fresh interpreter from the repository root."""
+    return subprocess.run([sys.executable, os.path.join(ROOT_DIR, script), *map(str, args)],
+                          check=True, capture_output=True, text=True, cwd=ROOT_DIR)
@@ -0,0 +1,180 @@
+"""
+Smart Factory Analytics - API Tests
+Clients are created without the context manager, so the startup warm-up
+and registry watcher do not run; the endpoints load what they need on use.
+"""
+
+import asyncio
+import os
+import queue
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from jobs import JobManager
+from model_registry import ModelRegistry
+from support import simulate_sensors, write_history
+from worker_pool import WorkerPool
+
+
+@pytest.fixture
+def api(model_dir, tmp_path, monkeypatch):
+    """A client for the app serving a small history and the test model registry."""
+    data = tmp_path / 'factory_sensors.csv'
+    write_history(simulate_sensors(machines=3, days=1), data)
+    monkeypatch.setattr(main, 'DATA_PATH', str(data))
+    monkeypatch.setattr(main, 'MODEL_DIR', os.path.join(str(model_dir), ''))
+    monkeypatch.setattr(main, 'registry', ModelRegistry(str(model_dir)))
+    for name, value in [('ml_backend', None), ('models', {}), ('models_version', 0),
+                        ('models_version_id', None), ('failed_versions', set())]:
+        monkeypatch.setattr(main, name, value)
+    yield TestClient(main.app)
+    if main.ml_backend is not None and main.ml_backend.scorer:
+        main.ml_backend.scorer.shutdown()
+
+
+def without_timestamp(payload):
+    return {key: value for key, value in payload.items() if key != 'timestamp'}
+
+
+@pytest.mark.parametrize('body', [b'not json', b'[{"machine_id": "M001", "temperature": 70.1'])
+def test_ingest_rejects_malformed_body_with_422(body):
+    response = TestClient(main.app).post('/ingest', content=body, headers={'content-type': 'application/json'})
+    assert response.status_code == 422
+    assert response.json()['detail'][0]['type'] == 'json_invalid'
+
+
+def test_ingest_rejects_failure_labels_other_than_0_and_1():
+    reading = {'machine_id': 'M001', 'temperature': 70.1, 'vibration': 0.4, 'pressure': 101.2,
+               'speed': 1500.0, 'runtime_hours': 12000.5, 'is_failure': 300}
+    response = TestClient(main.app).post('/ingest', json=[reading])
+    assert response.status_code == 422
+    assert response.json()['detail'][0]['loc'] == [0, 'is_failure']
+
+
+def test_saturated_pool_answers_503_with_retry_after(api, monkeypatch):
+    pool = WorkerPool(workers=1, max_queue=0, retry_after=7)
+    monkeypatch.setattr(main, 'worker_pool', pool)
+    release = threading.Event()
+    # The pool's one thread is busy and nothing may queue behind it
+    blocker = threading.Thread(target=asyncio.run, args=(pool.run(release.wait),))
+    blocker.start()
+    try:
+        while pool.stats()['admitted'] < 1:
+            time.sleep(0.01)
+        response = api.get('/predict_failure')
+        assert response.status_code == 503
+        assert response.headers['retry-after'] == '7'
+        release.set()
+        blocker.join()
+        assert api.get('/predict_failure').status_code == 200
+    finally:
+        release.set()
+        blocker.join()
+        pool.shutdown()
+
+
+def test_process_scorer_serves_the_same_predictions(api, monkeypatch):
+    in_thread = without_timestamp(api.get('/machine_health').json())
+
+    monkeypatch.setattr(main, 'INFERENCE_POOL', 'process')
+    monkeypatch.setattr(main, 'INFERENCE_WORKERS', 1)
+    for name, value in [('ml_backend', None), ('models', {}), ('models_version', 0), ('models_version_id', None)]:
+        monkeypatch.setattr(main, name, value)
+    response = api.get('/machine_health')
+    assert response.status_code == 200
+    assert main.ml_backend.scorer is not None
+    assert without_timestamp(response.json()) == in_thread
+
+
+def staged_pipeline(fail_at=None):
+    """A refresh stand-in that stops at each stage until released, optionally failing at one."""
+    entered, release = queue.Queue(), threading.Semaphore(0)
+
+    def run(job_id, set_stage):
+        for stage in main.REFRESH_STAGES:
+            set_stage(stage)
+            entered.put(stage)
+            release.acquire()
+            if stage == fail_at:
+                raise RuntimeError(f"{stage} failed: simulated")
+        return {"model_version": "test"}
+    return run, entered, release
+
+
+def finished_job(client, status_url, timeout=10):
+    deadline = time.monotonic() + timeout
+    while True:
+        job = client.get(status_url).json()
+        if job['status'] in ('succeeded', 'failed') or time.monotonic() > deadline:
+            return job
+        time.sleep(0.01)
+
+
+def test_refresh_job_reports_its_stages_and_conflicts(monkeypatch):
+    run, entered, release = staged_pipeline()
+    monkeypatch.setattr(main, 'jobs', JobManager())
+    monkeypatch.setattr(main, 'refresh_pipeline', run)
+    client = TestClient(main.app)
+
+    response = client.post('/refresh_data')
+    assert response.status_code == 202
+    job_id, status_url = response.json()['job_id'], response.json()['status_url']
+    assert status_url == f'/jobs/{job_id}'
+
+    for number, stage in enumerate(main.REFRESH_STAGES):
+        assert entered.get(timeout=10) == stage
+        job = client.get(status_url).json()
+        assert (job['status'], job['stage'], job['progress']) == (
+            'running', stage, round(number / len(main.REFRESH_STAGES), 2))
+        conflict = client.post('/refresh_data')
+        assert conflict.status_code == 409
+        assert conflict.json()['detail']['job_id'] == job_id
+        release.release()
+
+    job = finished_job(client, status_url)
+    assert (job['status'], job['progress'], job['result'], job['error']) == (
+        'succeeded', 1.0, {"model_version": "test"}, None)
+    assert client.get('/jobs/unknown').status_code == 404
+
+
+def test_failed_refresh_job_reports_its_error(monkeypatch):
+    run, entered, release = staged_pipeline(fail_at='train')
+    monkeypatch.setattr(main, 'jobs', JobManager())
+    monkeypatch.setattr(main, 'refresh_pipeline', run)
+    client = TestClient(main.app)
+
+    status_url = client.post('/refresh_data').json()['status_url']
+    for _ in range(2):
+        entered.get(timeout=10)
+        release.release()
+
+    job = finished_job(client, status_url)
+    assert (job['status'], job['stage'], job['error']) == ('failed', 'train', 'train failed: simulated')
+    # A failed job no longer blocks the next one
+    monkeypatch.setattr(main, 'refresh_pipeline', lambda job_id, set_stage: None)
+    assert client.post('/refresh_data').status_code == 202
+
+
+def test_etag_answers_304_until_data_or_models_change(api):
+    response = api.get('/predict_failure')
+    etag = response.headers['etag']
+    not_modified = api.get('/machine_health', headers={'If-None-Match': etag})
+    assert not_modified.status_code == 304
+    assert not_modified.headers['etag'] == etag
+
+    reading = {'machine_id': 'M001', 'temperature': 70.1, 'vibration': 0.4, 'pressure': 101.2,
+               'speed': 1500.0, 'runtime_hours': 12000.5, 'timestamp': '2024-01-05T00:00:00'}
+    assert api.post('/ingest', json=[reading]).status_code == 200
+    after_ingest = api.get('/predict_failure', headers={'If-None-Match': etag})
+    assert after_ingest.status_code == 200
+    assert after_ingest.headers['etag'] != etag
+
+    # The hot-swap path: the active version is loaded and installed again
+    assert main.load_models()
+    after_swap = api.get('/predict_failure', headers={'If-None-Match': after_ingest.headers['etag']})
+    assert after_swap.status_code == 200
+    assert after_swap.headers['etag'] not in (etag, after_ingest.headers['etag'])
@@ -0,0 +1,63 @@
+"""
+Smart Factory Analytics - Incremental Feature State Tests
+"""
+
+import pandas as pd
+import pytest
+
+from data_store import SensorDataStore
+from feature_state import IncrementalFeatureEngine, OutOfOrderReadings
+from features import ROLLING_WINDOW, feature_engineering
+from sensor_storage import read_sensors
+from support import write_history
+
+
+def batch_latest(df):
+    df = df.sort_values(['machine_id', 'timestamp'], kind='stable').reset_index(drop=True)
+    return feature_engineering(df).groupby('machine_id').tail(1).reset_index(drop=True)
+
+
+def test_latest_matches_batch_features_after_updates(sensors):
+    # M004 first arrives in updates; M009 never has a full window. The batch
+    # path back-fills a short machine's NaNs from the rows after it, so
+    # parity with the engine's zeros needs that machine to sort last.
+    seed = sensors[sensors['machine_id'] != 'M004'].groupby('machine_id').head(-30)
+    updates = sensors.drop(seed.index)
+    short = sensors[sensors['machine_id'] == 'M001'].iloc[-(ROLLING_WINDOW - 5):].assign(machine_id='M009')
+
+    engine = IncrementalFeatureEngine.from_history(seed)
+    engine.update_many(updates.iloc[:len(updates) // 2])
+    engine.update_many(updates.iloc[len(updates) // 2:])
+    for _, reading in short.iterrows():
+        engine.update(reading['machine_id'], reading['timestamp'], reading.to_dict())
+
+    latest = engine.latest()
+    expected = batch_latest(pd.concat([sensors, short]))
+    assert latest['machine_id'].tolist() == ['M001', 'M002', 'M003', 'M004', 'M009']
+    pd.testing.assert_frame_equal(latest, expected[latest.columns], check_exact=False, rtol=1e-9)
+
+
+def test_late_readings_are_rejected_without_changing_the_state(sensors):
+    engine = IncrementalFeatureEngine.from_history(sensors)
+    before = engine.latest().copy()
+    late = sensors[sensors['machine_id'] == 'M002'].iloc[[-3]]
+    new = sensors.iloc[[-1]].assign(machine_id='M009')
+
+    with pytest.raises(OutOfOrderReadings) as excinfo:
+        engine.update_many(pd.concat([new, late]))
+    assert list(excinfo.value.late) == ['M002']
+    with pytest.raises(OutOfOrderReadings):
+        engine.update('M002', late['timestamp'].iloc[0], late.iloc[0].to_dict())
+    pd.testing.assert_frame_equal(engine.latest(), before)
+
+
+def test_store_stores_nothing_from_a_batch_with_late_readings(sensors, tmp_path):
+    path = tmp_path / 'factory_sensors.csv'
+    write_history(sensors, path)
+    store = SensorDataStore(str(path))
+    late = sensors[sensors['machine_id'] == 'M001'].iloc[[0]]
+
+    with pytest.raises(OutOfOrderReadings):
+        store.append(late)
+    assert len(read_sensors(str(path))) == len(sensors)
+    assert len(store.get()) == len(sensors)
@@ -0,0 +1,33 @@
+"""
+Smart Factory Analytics - Feature Engineering Tests
+"""
+
+import pandas as pd
+import pytest
+
+from features import ROLLING_WINDOW, feature_engineering
+
+
+def test_machine_features_do_not_depend_on_other_machines(sensors):
+    full = feature_engineering(sensors)
+    for machine_id, alone in sensors.groupby('machine_id', sort=False):
+        pd.testing.assert_frame_equal(feature_engineering(alone), full.loc[alone.index], check_exact=True)
+
+
+@pytest.mark.parametrize('cut', [1, 11, 12, 13, 100])
+def test_history_tail_with_offsets_matches_full_history(sensors, cut):
+    machine = sensors[sensors['machine_id'] == 'M002']
+    full = feature_engineering(machine)
+    tail = feature_engineering(machine.iloc[cut:], offsets={'M002': cut})
+    settled = tail.iloc[2 * ROLLING_WINDOW - 1:]
+    pd.testing.assert_frame_equal(settled, full.loc[settled.index], check_exact=True)
+
+
+
+def test_unsorted_input_gives_the_features_of_sorted_input(sensors):
+    shuffled = sensors.sample(frac=1, random_state=3)
+    by_time = sensors.sort_values('timestamp', kind='stable')
+    expected = feature_engineering(sensors)
+    for unsorted in (shuffled, by_time):
+        features = feature_engineering(unsorted)
+        pd.testing.assert_frame_equal(features, expected.loc[unsorted.index], check_exact=True)
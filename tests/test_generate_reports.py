@@ -0,0 +1,80 @@
+"""
+Smart Factory Analytics - Report Generator Tests
+"""
+
+import io
+
+import pandas as pd
+import pytest
+
+from support import run_script, simulate_sensors, write_history
+
+REPORTS = ['failure_predictions', 'yield_performance', 'anomaly_clusters', 'machine_health_overview']
+
+
+def run_reports(data, model_dir, output_dir, *options):
+    run_script('generate_reports.py', '--data', data, '--model-dir', model_dir, '--output-dir', output_dir, *options)
+    return {name: (output_dir / f'{name}.csv').read_bytes() for name in REPORTS}
+
+
+@pytest.fixture(scope='module')
+def history(tmp_path_factory):
+    path = tmp_path_factory.mktemp('history') / 'factory_sensors.csv'
+    write_history(simulate_sensors(machines=7, days=3, seed=11), path)
+    return path
+
+
+@pytest.fixture(scope='module')
+def full_reports(history, model_dir, tmp_path_factory):
+    return run_reports(history, model_dir, tmp_path_factory.mktemp('full'), '--full')
+
+
+@pytest.mark.parametrize('options', [
+    ['--workers', 2, '--machines-per-chunk', 3],
+    ['--workers', 3, '--machines-per-chunk', 1],
+])
+def test_worker_counts_write_byte_identical_reports(history, model_dir, full_reports, tmp_path, options):
+    assert run_reports(history, model_dir, tmp_path, '--full', *options) == full_reports
+
+
+@pytest.mark.parametrize('machines_per_chunk', [1, 3, 8])
+def test_stream_writes_byte_identical_reports(history, model_dir, full_reports, tmp_path, machines_per_chunk):
+    assert run_reports(history, model_dir, tmp_path, '--full', '--stream',
+                       '--machines-per-chunk', machines_per_chunk) == full_reports
+
+
+def assert_same_reports(a, b):
+    """Same CSVs, except that floats may differ in the last bits: merged means are summed in another order."""
+    for name in REPORTS:
+        pd.testing.assert_frame_equal(pd.read_csv(io.BytesIO(a[name])), pd.read_csv(io.BytesIO(b[name])),
+                                      check_exact=False, rtol=1e-12, atol=0, obj=name)
+
+
+def test_incremental_refresh_matches_full_recompute(model_dir, tmp_path):
+    sensors = simulate_sensors(machines=5, days=3, seed=5)
+    timestamps = sensors['timestamp'].sort_values().unique()
+    newcomer = sensors['machine_id'] == 'M005'
+    batches = [
+        # M005 only shows up in the second batch, with too few readings to be settled
+        sensors[~newcomer & (sensors['timestamp'] < timestamps[500])],
+        sensors[~newcomer & (sensors['timestamp'] >= timestamps[500]) & (sensors['timestamp'] < timestamps[507])],
+        sensors[(~newcomer & (sensors['timestamp'] >= timestamps[507])) | (newcomer & (sensors['timestamp'] < timestamps[5]))],
+        sensors[newcomer & (sensors['timestamp'] >= timestamps[5])],
+    ]
+    data = tmp_path / 'factory_sensors.csv'
+    for number, batch in enumerate(batches):
+        write_history(batch, data, append=number > 0)
+        incremental = run_reports(data, model_dir, tmp_path / 'incremental')
+        full = run_reports(data, model_dir, tmp_path / f'full-{number}', '--full')
+        assert_same_reports(incremental, full)
+
+
+def test_refresh_after_a_run_that_settled_no_machine(model_dir, tmp_path):
+    # Fewer readings per machine than a rolling window, as in a history built only from ingest
+    sensors = simulate_sensors(machines=3, days=1, seed=5).groupby('machine_id').head(5)
+    data = tmp_path / 'factory_sensors.csv'
+    write_history(sensors.groupby('machine_id').head(3), data)
+    run_reports(data, model_dir, tmp_path / 'incremental')
+    write_history(sensors.groupby('machine_id').tail(2), data, append=True)
+    incremental = run_reports(data, model_dir, tmp_path / 'incremental')
+    assert_same_reports(incremental, run_reports(data, model_dir, tmp_path / 'full', '--full'))
@@ -0,0 +1,71 @@
+"""
+Smart Factory Analytics - Model Inference Tests
+"""
+
+import numpy as np
+import pandas as pd
+from sklearn.cluster import KMeans
+from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+from sklearn.preprocessing import StandardScaler
+
+from forest import FlatForest, flatten_forest
+from inference import run_inference
+from pipeline import FusedPipeline, build_pipeline
+
+
+def scratch_data(rows=2000, features=5, seed=3):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(rows, features)) * [1, 10, 100, 0.1, 1000]
+    y_class = (X[:, 0] + X[:, 1] / 10 + rng.normal(size=rows) > 0).astype(int)
+    y_value = X[:, 2] / 100 - X[:, 3] * 10 + rng.normal(size=rows)
+    return X, y_class, y_value
+
+
+def test_flat_forest_matches_predict_proba():
+    X, y, _ = scratch_data()
+    model = RandomForestClassifier(n_estimators=25, max_depth=8, n_jobs=2, random_state=0).fit(X, y)
+    forest = FlatForest(flatten_forest(model))
+    np.testing.assert_allclose(forest.predict_proba(X), model.predict_proba(X), rtol=0, atol=1e-12)
+    np.testing.assert_array_equal(forest.predict(X), model.predict(X))
+
+
+def test_flat_forest_matches_regressor_predict():
+    X, _, y = scratch_data()
+    model = RandomForestRegressor(n_estimators=25, max_depth=8, n_jobs=2, random_state=0).fit(X, y)
+    forest = FlatForest(flatten_forest(model))
+    np.testing.assert_allclose(forest.predict(X), model.predict(X), rtol=1e-12, atol=1e-12)
+
+
+def test_fused_pipeline_matches_scaled_models_at_split_thresholds():
+    X, y_class, y_value = scratch_data()
+    columns = ['a', 'b', 'c', 'd', 'e']
+    df = pd.DataFrame(X, columns=columns)
+    features = {'failure': ['a', 'b', 'c'], 'yield': ['b', 'c', 'd', 'e'], 'anomaly': ['a', 'e']}
+    estimators = {
+        'failure': (RandomForestClassifier(n_estimators=10, max_depth=8, random_state=0), y_class),
+        'yield': (RandomForestRegressor(n_estimators=10, max_depth=8, random_state=0), y_value),
+        'anomaly': (KMeans(n_clusters=4, n_init=3, random_state=0), None),
+    }
+    models = {}
+    for name, (model, target) in estimators.items():
+        scaler = StandardScaler().fit(df[features[name]])
+        models.update({f'{name}_model': model.fit(scaler.transform(df[features[name]]), target),
+                       f'{name}_scaler': scaler, f'{name}_features': features[name]})
+    pipeline = FusedPipeline(build_pipeline(models))
+
+    # Every fused split, hit exactly at its raw threshold and one ulp above it
+    edges = []
+    for name in ['failure', 'yield']:
+        forest = pipeline.stages[name]['forest']
+        split = np.flatnonzero(forest.feature >= 0)
+        for threshold in [forest.threshold[split], np.nextafter(forest.threshold[split], np.inf)]:
+            rows = X[np.arange(len(split)) % len(X)].copy()
+            rows[np.arange(len(split)), forest.feature[split]] = threshold
+            edges.append(rows)
+    latest = pd.DataFrame(np.concatenate([X, *edges]), columns=pipeline.columns)
+
+    failure_probability, predicted_yield, cluster = pipeline.predict(latest)
+    expected = run_inference(latest, models)
+    np.testing.assert_allclose(failure_probability, expected[0], rtol=0, atol=1e-12)
+    np.testing.assert_allclose(predicted_yield, expected[1], rtol=1e-12, atol=1e-12)
+    np.testing.assert_array_equal(cluster, expected[2])
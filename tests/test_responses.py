@@ -0,0 +1,161 @@
+"""
+Smart Factory Analytics - Response Builder Tests
+The vectorized builders against the per-row loops they replaced.
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from inference import InferenceSnapshot
+from responses import CLUSTER_NAMES, RESPONSE_BUILDERS
+
+SENSOR_COLUMNS = ['temperature', 'vibration', 'pressure', 'speed', 'runtime_hours']
+
+
+def loop_failure(latest, probabilities, yields, clusters):
+    predictions = []
+    for idx, row in latest.iterrows():
+        prob = float(probabilities[idx])
+        risk = "High" if prob > 0.7 else "Medium" if prob > 0.4 else "Low"
+        rec = {"High": "URGENT: Schedule immediate maintenance",
+               "Medium": "WARNING: Plan maintenance within 48 hours",
+               "Low": "NORMAL: Continue regular monitoring"}[risk]
+        predictions.append({
+            "machine_id": row['machine_id'],
+            "failure_probability": round(prob, 4),
+            "risk_level": risk,
+            "recommendation": rec,
+            "temperature": round(row['temperature'], 2),
+            "vibration": round(row['vibration'], 3),
+            "pressure": round(row['pressure'], 2),
+            "runtime_hours": round(row['runtime_hours'], 2)
+        })
+    return {
+        "total_machines": len(predictions),
+        "high_risk": sum(1 for p in predictions if p['risk_level'] == 'High'),
+        "medium_risk": sum(1 for p in predictions if p['risk_level'] == 'Medium'),
+        "low_risk": sum(1 for p in predictions if p['risk_level'] == 'Low'),
+        "predictions": predictions
+    }
+
+
+def loop_yield(latest, probabilities, yields, clusters):
+    predictions = []
+    for idx, row in latest.iterrows():
+        yield_val = float(yields[idx])
+        efficiency = np.clip(yield_val, 0, 100)
+        level = "Excellent" if efficiency >= 85 else "Good" if efficiency >= 70 else "Poor"
+        predictions.append({
+            "machine_id": row['machine_id'],
+            "predicted_yield": round(yield_val, 2),
+            "efficiency_percentage": round(efficiency, 2),
+            "performance_level": level,
+            "temperature": round(row['temperature'], 2),
+            "pressure": round(row['pressure'], 2),
+            "speed": round(row['speed'], 2)
+        })
+    return {
+        "total_machines": len(predictions),
+        "average_efficiency": round(np.mean([p['efficiency_percentage'] for p in predictions]), 2),
+        "predictions": predictions
+    }
+
+
+def loop_anomaly(latest, probabilities, yields, clusters):
+    results = []
+    for idx, row in latest.iterrows():
+        cluster = int(clusters[idx])
+        results.append({
+            "machine_id": row['machine_id'],
+            "cluster": cluster,
+            "cluster_name": CLUSTER_NAMES.get(cluster, f'Cluster {cluster}'),
+            "is_anomalous": cluster >= 2,
+            "temperature": round(row['temperature'], 2),
+            "vibration": round(row['vibration'], 3),
+            "pressure": round(row['pressure'], 2),
+            "speed": round(row['speed'], 2)
+        })
+    return {
+        "total_machines": len(results),
+        "anomalous_machines": sum(1 for r in results if r['is_anomalous']),
+        "cluster_distribution": {
+            name: sum(1 for r in results if r['cluster'] == cluster)
+            for cluster, name in CLUSTER_NAMES.items()
+        },
+        "results": results
+    }
+
+
+def loop_health(latest, probabilities, yields, clusters):
+    health_data = []
+    for idx, row in latest.iterrows():
+        failure_prob = float(probabilities[idx])
+        yield_val = float(yields[idx])
+        cluster = int(clusters[idx])
+        health_score = ((1 - failure_prob) * 50 + (np.clip(yield_val, 0, 100) / 100) * 50) * 100
+        status = "Good" if health_score >= 75 else "Fair" if health_score >= 50 else "Critical"
+        health_data.append({
+            "machine_id": row['machine_id'],
+            "health_score": round(health_score, 2),
+            "health_status": status,
+            "failure_probability": round(failure_prob, 4),
+            "yield_efficiency": round(np.clip(yield_val, 0, 100), 2),
+            "cluster": cluster,
+            "is_anomalous": cluster >= 2,
+            "temperature": round(row['temperature'], 2),
+            "vibration": round(row['vibration'], 3),
+            "pressure": round(row['pressure'], 2),
+            "speed": round(row['speed'], 2),
+            "runtime_hours": round(row['runtime_hours'], 2),
+            "last_update": row['timestamp'].isoformat()
+        })
+    return {
+        "total_machines": len(health_data),
+        "average_health_score": round(np.mean([h['health_score'] for h in health_data]), 2),
+        "good_health": sum(1 for h in health_data if h['health_status'] == 'Good'),
+        "fair_health": sum(1 for h in health_data if h['health_status'] == 'Fair'),
+        "critical_health": sum(1 for h in health_data if h['health_status'] == 'Critical'),
+        "machines": health_data
+    }
+
+
+LOOP_BUILDERS = {'failure': loop_failure, 'yield': loop_yield, 'anomaly': loop_anomaly, 'health': loop_health}
+
+
+def scored_latest(rows=400, seed=2):
+    """Latest rows and model outputs: random values, then .5 ties and NaNs at every rounding precision."""
+    rng = np.random.default_rng(seed)
+    latest = pd.DataFrame({
+        'machine_id': [f'M{i:03d}' for i in range(1, rows + 1)],
+        'timestamp': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 10**6, rows), unit='s'),
+        'temperature': rng.uniform(60, 95, rows),
+        'vibration': rng.uniform(0.3, 3, rows),
+        'pressure': rng.uniform(75, 120, rows),
+        'speed': rng.uniform(1100, 1900, rows),
+        'runtime_hours': rng.uniform(5000, 16000, rows),
+    })
+    probabilities = rng.uniform(0, 1, rows)
+    yields = rng.uniform(-10, 110, rows)
+    clusters = rng.integers(0, 5, rows)
+
+    ties = [70.125, 2.675, 1.005, 0.0625, 0.5, 84.995, 99.995, 0.00005, 0.12345, np.nan]
+    for i, value in enumerate(ties):
+        latest.loc[i, SENSOR_COLUMNS] = value
+        probabilities[i] = value if value <= 1 else value / 100
+        yields[i] = value
+    return latest, probabilities, yields, clusters
+
+
+@pytest.mark.parametrize('dtype', ['float32', 'float64'])
+@pytest.mark.parametrize('endpoint', list(RESPONSE_BUILDERS))
+def test_builders_match_the_per_row_loops(endpoint, dtype):
+    latest, probabilities, yields, clusters = scored_latest()
+    latest = latest.astype({col: dtype for col in SENSOR_COLUMNS})
+    snapshot = InferenceSnapshot(latest, probabilities, yields, clusters, key=0)
+
+    built = RESPONSE_BUILDERS[endpoint](snapshot)
+    expected = LOOP_BUILDERS[endpoint](latest, probabilities, yields, clusters)
+    assert json.dumps(built) == json.dumps(expected)
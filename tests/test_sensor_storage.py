@@ -0,0 +1,107 @@
+"""
+Smart Factory Analytics - Sensor Storage Tests
+"""
+
+import json
+import os
+
+import pandas as pd
+
+from data_store import SensorDataStore
+from ingest import parse_readings
+from sensor_storage import (
+    COMPACT_FILES, VALUE_COLUMNS, append_sensors, dataset_path_for, history_checkpoint, only_appended,
+    read_sensors, write_sensors
+)
+from support import write_history
+
+
+def next_readings(df, machine_id, count=1, start=None):
+    """`count` readings of `machine_id` five minutes apart, after `start` (default: the newest in `df`)."""
+    last = df.iloc[[-1] * count].reset_index(drop=True)
+    start = df['timestamp'].max() if start is None else start
+    return last.assign(machine_id=machine_id,
+                       timestamp=start + pd.to_timedelta(5 * (1 + last.index), unit='min'),
+                       runtime_hours=15468.88)
+
+
+def test_appends_in_narrow_dtypes_read_back_at_full_precision(sensors, tmp_path):
+    dataset = tmp_path / 'factory_sensors'
+    write_sensors(sensors, dataset)
+    # Sorts before every existing machine, so its file is the first one a reader sees
+    narrow = next_readings(sensors, 'A001').astype({**{col: 'float32' for col in VALUE_COLUMNS}, 'is_failure': 'int8'})
+    append_sensors(narrow, dataset)
+
+    df = read_sensors(dataset)
+    assert (df[VALUE_COLUMNS].dtypes == 'float64').all() and df['is_failure'].dtype == 'int64'
+    stored = df[df['machine_id'] != 'A001'].reset_index(drop=True)
+    pd.testing.assert_frame_equal(stored[VALUE_COLUMNS], sensors[VALUE_COLUMNS], check_exact=True)
+
+
+def test_store_appends_readings_at_full_precision(sensors, tmp_path):
+    path = tmp_path / 'factory_sensors.csv'
+    write_sensors(sensors, dataset_path_for(str(path)))
+    store = SensorDataStore(str(path))
+    store.append(next_readings(sensors, 'A001'))
+
+    appended = read_sensors(dataset_path_for(str(path)), machine_ids=['A001'])
+    assert appended['runtime_hours'].tolist() == [15468.88]
+    assert store.get()['runtime_hours'].dtype == 'float32'
+
+
+def test_appends_to_a_partition_are_compacted(sensors, tmp_path):
+    dataset = tmp_path / 'factory_sensors'
+    write_sensors(sensors, dataset)
+    checkpoint = history_checkpoint(dataset)
+    batches = [next_readings(sensors, 'M001', 3, sensors['timestamp'].max() + pd.Timedelta(minutes=15 * i))
+               for i in range(COMPACT_FILES + 4)]
+    for batch in batches:
+        append_sensors(batch, dataset)
+
+    partition = os.path.dirname(next(
+        os.path.join(root, name) for root, _, names in os.walk(dataset) for name in names
+        if name.endswith('.parquet') and 'M001' in root and batches[0]['timestamp'].iloc[0].strftime('%Y-%m-%d') in root
+    ))
+    assert len([name for name in os.listdir(partition) if name.endswith('.parquet')]) <= COMPACT_FILES
+    expected = pd.concat([sensors, *batches]).sort_values(['machine_id', 'timestamp'], kind='stable')
+    df = read_sensors(dataset)
+    pd.testing.assert_frame_equal(df[VALUE_COLUMNS], expected[VALUE_COLUMNS].reset_index(drop=True), check_exact=True)
+    # Compaction keeps the readings, so incremental reports can still extend their state
+    assert only_appended(dataset, checkpoint)
+
+
+def test_rewritten_dataset_is_not_only_appended(sensors, tmp_path):
+    dataset = tmp_path / 'factory_sensors'
+    write_sensors(sensors, dataset)
+    checkpoint = history_checkpoint(dataset)
+    append_sensors(next_readings(sensors, 'M001'), dataset)
+    assert only_appended(dataset, checkpoint)
+    write_sensors(sensors, dataset)
+    assert not only_appended(dataset, checkpoint)
+
+
+def test_store_appends_untimestamped_readings_to_a_csv(sensors, tmp_path):
+    path = tmp_path / 'factory_sensors.csv'
+    write_history(sensors, path)
+    store = SensorDataStore(str(path))
+    reading = {'machine_id': 'M001', 'temperature': 71.5, 'vibration': 0.42, 'pressure': 101.3,
+               'speed': 1480.0, 'runtime_hours': 15468.88}
+    store.append(parse_readings(json.dumps([reading]).encode()))
+
+    # Stamped with the current time, written in the simulator's format
+    with open(path) as f:
+        stamp = f.read().splitlines()[-1].split(',')[1]
+    assert pd.Timestamp(stamp).strftime('%Y-%m-%d %H:%M:%S') == stamp
+    df = read_sensors(str(path))
+    assert len(df) == len(sensors) + 1
+    assert SensorDataStore(str(path)).get()['timestamp'].max() == pd.Timestamp(stamp)
+
+
+def test_csv_with_fractional_timestamps_is_readable(sensors, tmp_path):
+    path = tmp_path / 'factory_sensors.csv'
+    write_history(sensors, path)
+    late = next_readings(sensors, 'M001').assign(timestamp=lambda df: df['timestamp'] + pd.Timedelta('0.5s'))
+    late.to_csv(path, mode='a', header=False, index=False)
+
+    df = read_sensors(str(path), machine_ids=['M001'])
+    assert df['timestamp'].iloc[-1] == late['timestamp'].iloc[0]
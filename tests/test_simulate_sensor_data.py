@@ -0,0 +1,34 @@
+"""
+Smart Factory Analytics - Sensor Simulator Tests
+"""
+
+import pandas as pd
+
+from sensor_storage import DATASET_ID_FILE, dataset_path_for, read_sensors
+from support import run_script
+
+
+def simulate(path, *options):
+    run_script('simulate_sensor_data.py', '--machines', 4, '--days', 2, '--start', '2024-01-01',
+               '--output', path, *options)
+    return path.read_bytes(), read_sensors(dataset_path_for(str(path)))
+
+
+def test_same_seed_gives_the_same_dataset(tmp_path):
+    csv, dataset = simulate(tmp_path / 'a.csv', '--seed', 9)
+    again_csv, again_dataset = simulate(tmp_path / 'b.csv', '--seed', 9)
+    other_csv, _ = simulate(tmp_path / 'c.csv', '--seed', 10)
+
+    assert csv == again_csv
+    pd.testing.assert_frame_equal(dataset, again_dataset, check_exact=True)
+    assert csv != other_csv
+
+
+def test_workers_give_the_same_rows_as_serial_mode(tmp_path):
+    csv, dataset = simulate(tmp_path / 'serial.csv', '--seed', 9)
+    parallel_csv, parallel_dataset = simulate(tmp_path / 'parallel.csv', '--seed', 9, '--workers', 3)
+
+    assert parallel_csv == csv
+    pd.testing.assert_frame_equal(parallel_dataset, dataset, check_exact=True)
+    # Written once by the parent, before the workers append
+    assert (tmp_path / 'parallel' / DATASET_ID_FILE).read_text()